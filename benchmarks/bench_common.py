@@ -0,0 +1,110 @@
+"""Общие функции бенчмарков: статистика латентности и сохранение результатов"""
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+RESULTS_DIR = PROJECT_ROOT / "benchmarks" / "results"
+
+# Бенчмарки импортируют модули приложения как src.*
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Перцентиль с линейной интерполяцией по отсортированному списку"""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * q
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    fraction = position - lower
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * fraction
+
+
+def summarize(latencies: list[float], elapsed: float, errors: int = 0) -> dict:
+    """Сводка по латентностям в секундах: перцентили в миллисекундах и пропускная способность"""
+    values = sorted(latencies)
+    return {
+        "count": len(values),
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "rps": round(len(values) / elapsed, 2) if elapsed > 0 else 0.0,
+        "mean_ms": round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+        "p50_ms": round(percentile(values, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(values, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(values, 0.99) * 1000, 3),
+        "max_ms": round(values[-1] * 1000, 3) if values else 0.0,
+    }
+
+
+def synthetic_messages(count: int, seed: int = 42) -> list[str]:
+    """Корпус сообщений: примерно треть с контактами, остальные - обычный текст"""
+    rng = random.Random(seed)
+    words = (
+        "продам куплю аренда квартира услуги доставка скидка работа вакансия "
+        "звоните пишите опыт гарантия недорого срочно москва спб удалённо"
+    ).split()
+    messages = []
+    for i in range(count):
+        text = " ".join(rng.choice(words) for _ in range(rng.randint(10, 60)))
+        roll = rng.random()
+        if roll < 0.15:
+            text += f" пишите на user{i}@example.com"
+        elif roll < 0.30:
+            text += f" тел. +7 (9{rng.randint(10, 99)}) {rng.randint(100, 999)}-{rng.randint(10, 99)}-{rng.randint(10, 99)}"
+        elif roll < 0.35:
+            text += f" 8 912 {rng.randint(1000000, 9999999)} или sales{i}@shop.ru"
+        messages.append(text)
+    return messages
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=PROJECT_ROOT,
+            text=True,
+            stderr=subprocess.DEVNULL
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def save_results(suite: str, results: dict, params: dict) -> Path:
+    """Сохраняет результаты в benchmarks/results/<suite>-<время>-<коммит>.json"""
+    RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+    commit = _git_commit()
+    now = datetime.now(timezone.utc)
+
+    payload = {
+        "suite": suite,
+        "commit": commit,
+        "created_at": now.isoformat(),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "params": params,
+        "results": results,
+    }
+
+    path = RESULTS_DIR / f"{suite}-{now.strftime('%Y%m%dT%H%M%S')}-{commit}.json"
+    path.write_text(json.dumps(payload, indent=2, ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+def print_table(results: dict) -> None:
+    header = f"{'сценарий':<28}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ошибки':>8}"
+    print(header)
+    print("-" * len(header))
+    for name, stats in results.items():
+        print(
+            f"{name:<28}{stats['rps']:>10}{stats['p50_ms']:>10}"
+            f"{stats['p95_ms']:>10}{stats['p99_ms']:>10}{stats['errors']:>8}"
+        )
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""
+Сравнение двух прогонов бенчмарка (например, до и после изменения):
+    python benchmarks/bench_compare.py results/http-A.json results/http-B.json
+"""
+import argparse
+import json
+from pathlib import Path
+
+
+METRICS = ("rps", "p50_ms", "p95_ms", "p99_ms")
+
+
+def _delta(before: float, after: float) -> str:
+    if not before:
+        return "n/a"
+    return f"{(after - before) / before * 100:+.1f}%"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("before", type=Path)
+    parser.add_argument("after", type=Path)
+    args = parser.parse_args()
+
+    before = json.loads(args.before.read_text(encoding="utf-8"))
+    after = json.loads(args.after.read_text(encoding="utf-8"))
+    print(f"{before['suite']}: {before['commit']} -> {after['commit']}\n")
+
+    header = f"{'сценарий':<28}" + "".join(f"{metric:>22}" for metric in METRICS)
+    print(header)
+    print("-" * len(header))
+
+    for name, stats_after in after["results"].items():
+        stats_before = before["results"].get(name)
+        if stats_before is None:
+            continue
+        cells = "".join(
+            f"{stats_before[m]:>8} -> {stats_after[m]:<6}{_delta(stats_before[m], stats_after[m]):>7}"
+            for m in METRICS
+        )
+        print(f"{name:<28}{cells}")
+
+
+if __name__ == "__main__":
+    main()
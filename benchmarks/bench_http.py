@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Нагрузочный бенчмарк HTTP API: /auth/login, /auth/refresh, /auth/me, GET /users.
+
+Поднимает приложение src.main:app через uvicorn с настройками из .env
+(локальные PostgreSQL и Redis) и гоняет каждый сценарий заданное время
+с заданной конкурентностью. Используйте отдельную БД: бенчмарк создаёт
+пользователей и не удаляет их.
+
+Запуск из корня проекта:
+    pip install -r benchmarks/requirements.txt
+    python benchmarks/bench_http.py --concurrency 16 --duration 10
+"""
+import argparse
+import asyncio
+import os
+import secrets
+import subprocess
+import sys
+import time
+from typing import Awaitable, Callable
+
+import httpx
+
+from bench_common import PROJECT_ROOT, print_table, save_results, summarize
+
+
+PASSWORD = "bench-password-123"
+
+# Лимиты попыток входа с одного IP сделали бы бенчмарк /auth/login бессмысленным
+SERVER_ENV_OVERRIDES = {
+    "LOGIN_IP_MAX_ATTEMPTS": str(10**9),
+    "DB_ECHO": "false",
+}
+
+
+def start_server(port: int) -> subprocess.Popen:
+    env = {**os.environ, **SERVER_ENV_OVERRIDES}
+    return subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "src.main:app",
+            "--host", "127.0.0.1",
+            "--port", str(port),
+            "--log-level", "warning",
+            "--no-access-log",
+        ],
+        cwd=PROJECT_ROOT,
+        env=env,
+    )
+
+
+async def wait_until_ready(client: httpx.AsyncClient, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            # Ждём завершения прогрева, чтобы не измерять холодный старт
+            response = await client.get("/health/ready")
+            if response.status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.5)
+    raise RuntimeError("Сервер не поднялся за отведённое время")
+
+
+async def create_user(client: httpx.AsyncClient, prefix: str) -> str:
+    username = f"{prefix}_{secrets.token_hex(6)}"
+    response = await client.post(
+        "/users",
+        json={"username": username, "password": PASSWORD, "email": f"{username}@bench.local"},
+    )
+    response.raise_for_status()
+    return username
+
+
+async def login(client: httpx.AsyncClient, username: str) -> dict:
+    response = await client.post("/auth/login", json={"username": username, "password": PASSWORD})
+    response.raise_for_status()
+    return response.json()
+
+
+async def run_scenario(
+    name: str,
+    make_worker: Callable[[int], Awaitable[Callable[[], Awaitable[httpx.Response]]]],
+    concurrency: int,
+    duration: float,
+    warmup: float
+) -> dict:
+    """Запускает concurrency воркеров; первые warmup секунд не учитываются"""
+    calls = [await make_worker(i) for i in range(concurrency)]
+    latencies: list[float] = []
+    errors = 0
+    started = time.monotonic()
+    measure_from = started + warmup
+    deadline = measure_from + duration
+
+    async def worker(call):
+        nonlocal errors
+        while True:
+            call_started = time.monotonic()
+            if call_started >= deadline:
+                return
+            try:
+                response = await call()
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            finished = time.monotonic()
+            if call_started < measure_from:
+                continue
+            if failed:
+                errors += 1
+            else:
+                latencies.append(finished - call_started)
+
+    await asyncio.gather(*(worker(call) for call in calls))
+    print(f"  {name}: {len(latencies)} запросов, {errors} ошибок")
+    return summarize(latencies, duration, errors)
+
+
+async def run(args: argparse.Namespace) -> dict:
+    base_url = args.url or f"http://127.0.0.1:{args.port}"
+    limits = httpx.Limits(max_connections=args.concurrency * 2)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+        await wait_until_ready(client)
+
+        print("Подготовка данных...")
+        main_user = await create_user(client, "bench")
+        semaphore = asyncio.Semaphore(8)
+
+        async def seed():
+            async with semaphore:
+                await create_user(client, "bench_seed")
+
+        await asyncio.gather(*(seed() for _ in range(args.seed_users)))
+        tokens = await login(client, main_user)
+        auth_headers = {"Authorization": f"Bearer {tokens['access_token']}"}
+
+        async def login_worker(_):
+            return lambda: client.post("/auth/login", json={"username": main_user, "password": PASSWORD})
+
+        async def refresh_worker(_):
+            # У каждого воркера своя цепочка refresh токенов: старый токен отзывается при обновлении
+            state = await login(client, main_user)
+
+            async def call():
+                response = await client.post("/auth/refresh", json={"refresh_token": state["refresh_token"]})
+                if response.status_code == 200:
+                    state.update(response.json())
+                return response
+
+            return call
+
+        async def me_worker(_):
+            return lambda: client.get("/auth/me", headers=auth_headers)
+
+        async def list_users_worker(_):
+            return lambda: client.get("/users", params={"limit": 100}, headers=auth_headers)
+
+        scenarios = {
+            "auth_login": login_worker,
+            "auth_refresh": refresh_worker,
+            "auth_me": me_worker,
+            "users_list": list_users_worker,
+        }
+
+        results = {}
+        for name, make_worker in scenarios.items():
+            if args.only and name not in args.only:
+                continue
+            results[name] = await run_scenario(
+                name, make_worker, args.concurrency, args.duration, args.warmup
+            )
+        return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="Не поднимать сервер, а использовать уже запущенный")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="Секунд измерения на сценарий")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Секунд прогрева на сценарий")
+    parser.add_argument("--seed-users", type=int, default=100, help="Пользователей для GET /users")
+    parser.add_argument(
+        "--only", nargs="*",
+        choices=["auth_login", "auth_refresh", "auth_me", "users_list"],
+        help="Запустить только указанные сценарии"
+    )
+    args = parser.parse_args()
+
+    server = None if args.url else start_server(args.port)
+    try:
+        results = asyncio.run(run(args))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=10)
+
+    print()
+    print_table(results)
+    path = save_results(
+        "http",
+        results,
+        {
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "seed_users": args.seed_users,
+        },
+    )
+    print(f"\nРезультаты сохранены: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк загрузки лидов без Telegram: ingest_chat читает корпус через
+ReplayMessageSource и пишет в PostgreSQL из .env.
+
+Сценарии:
+    clean        - без сбоев, максимальная скорость источника
+    flood_wait   - FloodWaitError на части страниц
+    disconnects  - обрывы соединения на части страниц
+    crash_resume - процесс «падает» посреди чата, второй запуск продолжает
+                   с чекпоинта (проверка отсутствия пропусков и двойного счёта)
+
+В каждом сценарии число лидов в БД сверяется с ожидаемым по корпусу.
+Используйте отдельную БД: бенчмарк создаёт пользователя, задачу и лиды.
+
+Запуск из корня проекта:
+    python benchmarks/bench_ingestion.py --messages 20000
+    python benchmarks/bench_ingestion.py --corpus-dir corpora/ --chats some_chat
+"""
+import argparse
+import asyncio
+import random
+import secrets
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from bench_common import save_results, synthetic_messages
+
+from sqlalchemy import func, select
+
+from src.database.engine import async_session
+from src.leads.leads_models import Lead
+from src.parsing.parsing_crud import create_parse_job, get_parse_job_checkpoints
+from src.parsing.parsing_sources import ReplayMessageSource, SourceMessage, read_corpus, write_corpus
+from src.parsing.services.extraction_service import extract_contacts, leads_from_contacts
+from src.parsing.services.ingestion_service import ingest_chat
+from src.users.services.password_service import hash_password
+from src.users.users_crud import create_user
+from src.users.users_schemas import UserCreate
+
+
+class CrashingReplaySource(ReplayMessageSource):
+    """Имитирует падение процесса после заданного числа страниц"""
+
+    def __init__(self, *args, crash_after_pages: int, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.crash_after_pages = crash_after_pages
+        self.pages = 0
+
+    def _inject_faults(self) -> None:
+        self.pages += 1
+        if self.pages > self.crash_after_pages:
+            raise RuntimeError("Падение процесса (имитация)")
+        super()._inject_faults()
+
+
+def generate_corpus(
+    directory: Path,
+    chat: str,
+    count: int,
+    seed: int,
+    repost_ratio: float = 0.0
+) -> list[SourceMessage]:
+    """
+    Синтетический чат с уникальным chat_id, чтобы сценарии не пересекались в БД
+
+    Доля repost_ratio сообщений повторяет текст одного из предыдущих (репосты объявлений)
+    """
+    rng = random.Random(seed)
+    chat_id = -rng.randint(10**12, 10**13)
+    started = datetime.now(timezone.utc) - timedelta(days=30)
+    texts = synthetic_messages(count, seed)
+    for index in range(1, count):
+        if rng.random() < repost_ratio:
+            texts[index] = texts[rng.randrange(index)]
+    messages = [
+        SourceMessage(chat_id, index + 1, started + timedelta(seconds=index * 7), text)
+        for index, text in enumerate(texts)
+    ]
+    write_corpus(directory, chat, messages)
+    return messages
+
+
+def expected_leads(messages: list[SourceMessage]) -> int:
+    unique = set()
+    for message in messages:
+        if message.text:
+            contacts = extract_contacts(message.text)
+            for lead in leads_from_contacts(message.chat_id, message.id, message.date, contacts):
+                unique.add((lead.chat_id, lead.message_id, lead.contact_type, lead.contact_value))
+    return len(unique)
+
+
+async def count_leads(chat_id: int) -> int:
+    async with async_session() as db:
+        result = await db.execute(select(func.count()).select_from(Lead).where(Lead.chat_id == chat_id))
+        return int(result.scalar())
+
+
+async def run_scenario(
+    name: str,
+    source: ReplayMessageSource,
+    chat: str,
+    messages: list[SourceMessage],
+    job_id=None
+) -> dict:
+    await source.connect()
+    leads_before = await count_leads(messages[0].chat_id)
+    started = time.perf_counter()
+    crashed = False
+
+    async with async_session() as db:
+        try:
+            processed, found = await ingest_chat(db, source, chat, len(messages), job_id=job_id)
+        except RuntimeError:
+            await db.rollback()
+            crashed = True
+
+    if crashed:
+        # Второй запуск, как после перезапуска воркера: продолжаем с чекпоинта
+        resumed = ReplayMessageSource(source.directory)
+        await resumed.connect()
+        async with async_session() as db:
+            checkpoint = (await get_parse_job_checkpoints(db, job_id)).get(chat)
+            processed, found = await ingest_chat(
+                db, resumed, chat, len(messages), job_id=job_id, checkpoint=checkpoint
+            )
+
+    elapsed = time.perf_counter() - started
+    expected = expected_leads(messages)
+    stored = await count_leads(messages[0].chat_id) - leads_before
+    result = {
+        "messages": processed,
+        "leads": found,
+        "elapsed_s": round(elapsed, 3),
+        "messages_per_s": round(processed / elapsed, 1) if elapsed > 0 else 0.0,
+        "flood_waits": source.flood_waits,
+        "disconnects": source.disconnects,
+        # Повторный прогон записанного корпуса (--corpus-dir) новых лидов не вставит - сверяем итог в БД
+        "correct": processed == len(messages) and found == stored and leads_before + stored == expected,
+    }
+    print(
+        f"  {name}: {processed} сообщений, {found} лидов (ожидалось {expected}), "
+        f"{result['messages_per_s']} сообщ/с, FloodWait {source.flood_waits}, "
+        f"обрывов {source.disconnects}, {'OK' if result['correct'] else 'РАСХОЖДЕНИЕ'}"
+    )
+    return result
+
+
+async def create_bench_job(chats: list[str], message_limit: int):
+    async with async_session() as db:
+        username = f"bench_ingest_{secrets.token_hex(6)}"
+        user = await create_user(
+            db,
+            UserCreate(username=username, password="bench-password-123", email=f"{username}@bench.local"),
+            hash_password("bench-password-123", rounds=4)
+        )
+        job = await create_parse_job(
+            db, user.id, chats, message_limit, message_limit * len(chats),
+            is_interactive=False, virtual_start=0.0, virtual_finish=0.0
+        )
+        return job.id
+
+
+async def run(args: argparse.Namespace) -> dict:
+    workdir = Path(args.corpus_dir) if args.corpus_dir else Path(tempfile.mkdtemp(prefix="ingest-corpus-"))
+    scenarios = {
+        "clean": {},
+        "flood_wait": {"flood_wait_rate": args.fault_rate, "flood_wait_seconds": args.flood_wait_seconds},
+        "disconnects": {"disconnect_rate": args.fault_rate},
+        "crash_resume": {},
+    }
+
+    results = {}
+    for index, (name, faults) in enumerate(scenarios.items()):
+        if args.only and name not in args.only:
+            continue
+
+        if args.corpus_dir:
+            chat = args.chats[index % len(args.chats)]
+            messages = read_corpus(workdir, chat)
+        else:
+            chat = f"synthetic_{name}_{secrets.token_hex(4)}"
+            messages = generate_corpus(
+                workdir, chat, args.messages, seed=args.seed + index, repost_ratio=args.repost_ratio
+            )
+
+        job_id = await create_bench_job([chat], len(messages)) if name == "crash_resume" else None
+        if name == "crash_resume":
+            pages = max(len(messages) // 100, 2)
+            source = CrashingReplaySource(workdir, rate=args.rate, crash_after_pages=pages // 2, seed=args.seed)
+        else:
+            source = ReplayMessageSource(workdir, rate=args.rate, seed=args.seed, **faults)
+
+        results[name] = await run_scenario(name, source, chat, messages, job_id)
+
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=20000, help="Сообщений в синтетическом чате")
+    parser.add_argument("--repost-ratio", type=float, default=0.3, help="Доля репостов в синтетическом чате")
+    parser.add_argument("--corpus-dir", help="Каталог с записанными корпусами вместо синтетики")
+    parser.add_argument("--chats", nargs="*", default=[], help="Чаты из --corpus-dir")
+    parser.add_argument("--rate", type=float, default=0.0, help="Сообщений в секунду, 0 - без ограничения")
+    parser.add_argument("--fault-rate", type=float, default=0.02, help="Вероятность сбоя на страницу")
+    parser.add_argument("--flood-wait-seconds", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--only", nargs="*",
+        choices=["clean", "flood_wait", "disconnects", "crash_resume"],
+        help="Запустить только указанные сценарии"
+    )
+    args = parser.parse_args()
+    if args.corpus_dir and not args.chats:
+        parser.error("Для --corpus-dir укажите --chats")
+
+    results = asyncio.run(run(args))
+    path = save_results(
+        "ingestion",
+        results,
+        {
+            "messages": args.messages,
+            "repost_ratio": args.repost_ratio,
+            "corpus_dir": args.corpus_dir,
+            "rate": args.rate,
+            "fault_rate": args.fault_rate,
+            "flood_wait_seconds": args.flood_wait_seconds,
+            "seed": args.seed,
+        },
+    )
+    print(f"\nРезультаты сохранены: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Микробенчмарки горячих путей без HTTP: verify_token, hash_password,
+verify_password, извлечение контактов из сообщений и поиск по дереву
+префиксов телефонов.
+
+Запуск из корня проекта (нужен .env и JWT ключи):
+    python benchmarks/bench_micro.py --iterations 2000
+"""
+import argparse
+import time
+from datetime import datetime, timezone
+from uuid import uuid4
+
+from bench_common import print_table, save_results, summarize, synthetic_messages
+
+from src.auth.auth_jwt_utils import create_access_token, verify_token
+from src.leads.services.enrichment_service import get_phone_trie
+from src.parsing.services.extraction_service import extract_leads
+from src.users.services.password_service import (
+    configure_bcrypt_rounds,
+    get_bcrypt_rounds,
+    hash_password,
+    verify_password,
+)
+
+
+def _measure(func, iterations: int) -> dict:
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        call_started = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - call_started)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def bench_verify_token(iterations: int) -> dict:
+    token = create_access_token(uuid4(), "bench")
+    return _measure(lambda: verify_token(token, token_type="access"), iterations)
+
+
+def bench_hash_password(iterations: int) -> dict:
+    return _measure(lambda: hash_password("bench-password-123"), iterations)
+
+
+def bench_verify_password(iterations: int) -> dict:
+    hashed = hash_password("bench-password-123")
+    return _measure(lambda: verify_password("bench-password-123", hashed), iterations)
+
+
+def bench_extraction(iterations: int) -> dict:
+    messages = synthetic_messages(iterations)
+    message_date = datetime.now(timezone.utc)
+    position = iter(range(len(messages)))
+
+    def extract_next():
+        i = next(position)
+        extract_leads(-100123, i, message_date, messages[i])
+
+    return _measure(extract_next, len(messages))
+
+
+def bench_phone_lookup(iterations: int) -> dict:
+    trie = get_phone_trie()
+    phones = [f"+7{900 + i % 100}{i:07d}" for i in range(iterations)]
+    position = iter(range(len(phones)))
+    return _measure(lambda: trie.lookup(phones[next(position)]), len(phones))
+
+
+BENCHMARKS = {
+    "verify_token": (bench_verify_token, 1.0),
+    # bcrypt на порядки медленнее, поэтому итераций меньше
+    "hash_password": (bench_hash_password, 0.01),
+    "verify_password": (bench_verify_password, 0.01),
+    "extract_leads": (bench_extraction, 5.0),
+    "phone_lookup": (bench_phone_lookup, 50.0),
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000, help="Базовое число итераций")
+    parser.add_argument("--only", nargs="*", choices=list(BENCHMARKS), help="Запустить только указанные")
+    parser.add_argument("--bcrypt-rounds", type=int, help="Стоимость bcrypt (по умолчанию - как в приложении)")
+    args = parser.parse_args()
+
+    if args.bcrypt_rounds:
+        configure_bcrypt_rounds(args.bcrypt_rounds)
+
+    results = {}
+    for name, (bench, scale) in BENCHMARKS.items():
+        if args.only and name not in args.only:
+            continue
+        results[name] = bench(max(int(args.iterations * scale), 5))
+
+    print_table(results)
+    path = save_results(
+        "micro",
+        results,
+        {"iterations": args.iterations, "bcrypt_rounds": get_bcrypt_rounds()},
+    )
+    print(f"\nРезультаты сохранены: {path}")
+
+
+if __name__ == "__main__":
+    main()
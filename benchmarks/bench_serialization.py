@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Стоимость сериализации страницы списка пользователей на одну строку.
+
+Сравнивает прежний путь (ORM объекты -> response_model с EmailStr по строке ->
+jsonable_encoder -> stdlib json)
+с быстрым (строки колонок -> пакетная валидация TypeAdapter -> dump_json)
+и с ORJSONResponse. БД и .env не нужны: данные синтетические.
+
+    python benchmarks/bench_serialization.py --rows 100 --iterations 500
+"""
+import argparse
+import json
+import time
+from collections import namedtuple
+from datetime import datetime, timezone
+from uuid import UUID, uuid4
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, EmailStr
+
+from bench_common import print_table, save_results, summarize
+
+from src.auth.auth_models import RefreshToken  # noqa: F401 - нужен для настройки связей User
+from src.users.users_models import User
+from src.users.users_schemas import USER_LIST_ADAPTER
+
+
+class LegacyUserResponse(BaseModel):
+    """UserResponse до перехода на TypeAdapter: email повторно проверяется как EmailStr"""
+    id: UUID
+    username: str
+    email: EmailStr
+    phone_number: str | None
+    is_active: bool
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+UserRow = namedtuple(
+    "UserRow",
+    ["id", "username", "email", "phone_number", "is_active", "created_at", "updated_at"],
+)
+
+
+def _raw_users(count: int) -> list[dict]:
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "id": uuid4(),
+            "username": f"user_{i}",
+            "email": f"user_{i}@example.com",
+            "phone_number": f"+7912000{i:04d}",
+            "is_active": True,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(count)
+    ]
+
+
+def _stdlib_json(content) -> bytes:
+    # Так рендерит starlette.responses.JSONResponse
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def orm_response_model_json(raw: list[dict]) -> bytes:
+    """Прежний путь: ORM объекты, UserResponse с EmailStr на каждую строку, jsonable_encoder, stdlib json"""
+    users = [User(password="x", **item) for item in raw]
+    validated = [LegacyUserResponse.model_validate(user) for user in users]
+    return _stdlib_json(jsonable_encoder(validated))
+
+
+def rows_orjson(raw: list[dict]) -> bytes:
+    """Строки колонок, пакетная валидация, ORJSONResponse"""
+    rows = [UserRow(**item) for item in raw]
+    validated = USER_LIST_ADAPTER.validate_python(rows, from_attributes=True)
+    return orjson.dumps(USER_LIST_ADAPTER.dump_python(validated, mode="json"))
+
+
+def rows_adapter_dump_json(raw: list[dict]) -> bytes:
+    """Новый путь GET /users: строки колонок, пакетная валидация, dump_json в pydantic-core"""
+    rows = [UserRow(**item) for item in raw]
+    validated = USER_LIST_ADAPTER.validate_python(rows, from_attributes=True)
+    return USER_LIST_ADAPTER.dump_json(validated)
+
+
+VARIANTS = {
+    "orm_response_model_json": orm_response_model_json,
+    "rows_orjson": rows_orjson,
+    "rows_adapter_dump_json": rows_adapter_dump_json,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100, help="Строк на страницу")
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    raw = _raw_users(args.rows)
+    results = {}
+
+    for name, variant in VARIANTS.items():
+        for _ in range(20):
+            variant(raw)
+
+        latencies = []
+        started = time.perf_counter()
+        for _ in range(args.iterations):
+            call_started = time.perf_counter()
+            variant(raw)
+            latencies.append(time.perf_counter() - call_started)
+        stats = summarize(latencies, time.perf_counter() - started)
+        stats["per_row_us"] = round(stats["mean_ms"] * 1000 / args.rows, 3)
+        results[name] = stats
+
+    print_table(results)
+    print()
+    for name, stats in results.items():
+        print(f"{name:<28}{stats['per_row_us']:>10} мкс/строка")
+
+    path = save_results("serialization", results, {"rows": args.rows, "iterations": args.iterations})
+    print(f"\nРезультаты сохранены: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+CREATE TABLE IF NOT EXISTS leads (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id UUID REFERENCES users(id) ON DELETE SET NULL,
+    chat_id BIGINT NOT NULL,
+    message_id BIGINT NOT NULL,
+    contact_type TEXT NOT NULL,
+    contact_value TEXT NOT NULL,
+    message_date TIMESTAMPTZ NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    CONSTRAINT uq_leads_message_contact UNIQUE (chat_id, message_id, contact_type, contact_value)
+);
+
+CREATE INDEX IF NOT EXISTS idx_leads_user_id ON leads(user_id);
+CREATE INDEX IF NOT EXISTS idx_leads_contact_value ON leads(contact_value);
+CREATE INDEX IF NOT EXISTS idx_leads_message_date ON leads(message_date);
+
+-- Предагрегированная статистика: обновляется дельтами в той же транзакции, что и вставка лидов
+CREATE TABLE IF NOT EXISTS lead_stats_daily (
+    chat_id BIGINT NOT NULL,
+    day DATE NOT NULL,
+    contact_type TEXT NOT NULL,
+    leads_count BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (chat_id, day, contact_type)
+);
+
+CREATE INDEX IF NOT EXISTS idx_lead_stats_daily_day ON lead_stats_daily(day);
+
+-- Заполняем статистику по уже существующим лидам
+INSERT INTO lead_stats_daily (chat_id, day, contact_type, leads_count)
+SELECT chat_id, (message_date AT TIME ZONE 'UTC')::date, contact_type, COUNT(*)
+FROM leads
+GROUP BY 1, 2, 3
+ON CONFLICT (chat_id, day, contact_type) DO NOTHING;
@@ -0,0 +1,38 @@
+CREATE TABLE IF NOT EXISTS parse_jobs (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    chats TEXT[] NOT NULL,
+    message_limit INTEGER NOT NULL,
+    estimated_messages INTEGER NOT NULL,
+    is_interactive BOOLEAN NOT NULL DEFAULT FALSE,
+    virtual_start DOUBLE PRECISION NOT NULL,
+    virtual_finish DOUBLE PRECISION NOT NULL,
+    status TEXT NOT NULL DEFAULT 'queued',
+    messages_processed INTEGER NOT NULL DEFAULT 0,
+    leads_found INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    started_at TIMESTAMPTZ,
+    finished_at TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS idx_parse_jobs_user_id_created_at ON parse_jobs(user_id, created_at);
+CREATE INDEX IF NOT EXISTS idx_parse_jobs_queued ON parse_jobs(is_interactive DESC, virtual_finish) WHERE status = 'queued';
+CREATE INDEX IF NOT EXISTS idx_parse_jobs_running ON parse_jobs(user_id) WHERE status = 'running';
+
+-- Индивидуальные веса и квоты; при отсутствии строки действуют значения из настроек
+CREATE TABLE IF NOT EXISTS user_parse_quotas (
+    user_id UUID PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+    weight DOUBLE PRECISION NOT NULL DEFAULT 1.0,
+    max_concurrent_jobs INTEGER,
+    daily_message_quota INTEGER,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- Системное виртуальное время планировщика (одна строка)
+CREATE TABLE IF NOT EXISTS parse_scheduler_state (
+    id INTEGER PRIMARY KEY,
+    virtual_time DOUBLE PRECISION NOT NULL DEFAULT 0
+);
+
+INSERT INTO parse_scheduler_state (id, virtual_time) VALUES (1, 0) ON CONFLICT (id) DO NOTHING;
@@ -0,0 +1,12 @@
+-- Прогресс задачи парсинга по каждому чату: сообщения с id < offset_id ещё не прочитаны.
+-- Обновляется в одной транзакции с пачкой лидов, поэтому после сбоя чтение продолжается без пропусков
+CREATE TABLE IF NOT EXISTS parse_job_checkpoints (
+    job_id UUID NOT NULL REFERENCES parse_jobs(id) ON DELETE CASCADE,
+    chat TEXT NOT NULL,
+    offset_id BIGINT NOT NULL DEFAULT 0,
+    messages_processed INTEGER NOT NULL DEFAULT 0,
+    leads_found INTEGER NOT NULL DEFAULT 0,
+    completed BOOLEAN NOT NULL DEFAULT FALSE,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (job_id, chat)
+);
@@ -0,0 +1,8 @@
+-- Страна, регион и оператор телефона по таблице нумерации (NULL - не определены или ещё не обогащены)
+ALTER TABLE leads ADD COLUMN IF NOT EXISTS country TEXT;
+ALTER TABLE leads ADD COLUMN IF NOT EXISTS region TEXT;
+ALTER TABLE leads ADD COLUMN IF NOT EXISTS operator TEXT;
+
+-- Для дозаполнения существующих лидов: только телефоны без страны
+CREATE INDEX IF NOT EXISTS idx_leads_phone_not_enriched ON leads(id) WHERE contact_type = 'phone' AND country IS NULL;
+CREATE INDEX IF NOT EXISTS idx_leads_country ON leads(country) WHERE country IS NOT NULL;
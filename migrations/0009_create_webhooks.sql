@@ -0,0 +1,29 @@
+CREATE TABLE IF NOT EXISTS webhook_subscriptions (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    url TEXT NOT NULL,
+    -- Секрет подписи HMAC, зашифрован Fernet (FERNET_KEY)
+    secret_encrypted TEXT NOT NULL,
+    is_active BOOLEAN NOT NULL DEFAULT TRUE,
+    max_concurrency INTEGER NOT NULL DEFAULT 2,
+    max_batch_size INTEGER NOT NULL DEFAULT 100,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_webhook_subscriptions_user_id ON webhook_subscriptions(user_id) WHERE is_active;
+
+-- Исходящие события: пишутся в одной транзакции с лидами, доставленные удаляются.
+-- status: pending - ждёт доставки (next_attempt_at), dead - попытки исчерпаны
+CREATE TABLE IF NOT EXISTS webhook_outbox (
+    id BIGSERIAL PRIMARY KEY,
+    subscription_id UUID NOT NULL REFERENCES webhook_subscriptions(id) ON DELETE CASCADE,
+    payload JSONB NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    last_error TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_webhook_outbox_due ON webhook_outbox(subscription_id, next_attempt_at, id) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_webhook_outbox_dead ON webhook_outbox(subscription_id, id) WHERE status = 'dead';
@@ -0,0 +1,8 @@
+-- Пачка доставки: delivery_id общий у событий, отправляемых одним запросом (и при повторах),
+-- leased_until - до какого момента пачка считается отправляемой. Число пачек с неистёкшей
+-- арендой - число запросов к endpoint в полёте, общее для всех процессов доставки.
+ALTER TABLE webhook_outbox ADD COLUMN IF NOT EXISTS delivery_id TEXT;
+ALTER TABLE webhook_outbox ADD COLUMN IF NOT EXISTS leased_until TIMESTAMPTZ;
+
+CREATE INDEX IF NOT EXISTS idx_webhook_outbox_leased ON webhook_outbox(subscription_id, leased_until) WHERE leased_until IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_webhook_outbox_delivery_id ON webhook_outbox(delivery_id) WHERE delivery_id IS NOT NULL;
@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Дозаполняет страну, регион и оператора у уже сохранённых телефонных лидов.
+Работает пачками, каждая пачка - отдельная транзакция; можно прерывать и запускать повторно.
+
+Запуск из корня проекта:
+    python scripts/backfill_lead_enrichment.py --chunk-size 5000
+"""
+import argparse
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.database.engine import async_session  # noqa: E402
+from src.leads.services.enrichment_service import (  # noqa: E402
+    BACKFILL_CHUNK_SIZE,
+    backfill_lead_enrichment,
+)
+
+
+async def run(chunk_size: int) -> None:
+    async with async_session() as db:
+        enriched = await backfill_lead_enrichment(db, chunk_size)
+    print(f"Обогащено лидов: {enriched}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunk-size", type=int, default=BACKFILL_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    asyncio.run(run(args.chunk_size))
+
+
+if __name__ == "__main__":
+    main()
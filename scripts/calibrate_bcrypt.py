@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+"""
+Скрипт для подбора стоимости bcrypt под текущее железо
+Запускайте на узле того же типа, что и продакшен, и задайте результат в BCRYPT_ROUNDS
+"""
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.users.services.password_service import (  # noqa: E402
+    BCRYPT_MAX_ROUNDS,
+    BCRYPT_MIN_ROUNDS,
+    calibrate_bcrypt_rounds,
+    measure_bcrypt_ms,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Подбор стоимости bcrypt")
+    parser.add_argument("--target-ms", type=float, default=250.0, help="Целевое время хэширования, мс")
+    parser.add_argument("--table", action="store_true", help="Показать время для всех стоимостей")
+    args = parser.parse_args()
+
+    if args.table:
+        print("rounds    время, мс")
+        for rounds in range(BCRYPT_MIN_ROUNDS, BCRYPT_MAX_ROUNDS + 1):
+            elapsed = measure_bcrypt_ms(rounds)
+            print(f"{rounds:>6}    {elapsed:>9.1f}")
+            if elapsed > args.target_ms * 4:
+                break
+        print()
+
+    rounds = calibrate_bcrypt_rounds(args.target_ms)
+    print(f"✅ Рекомендуемая стоимость: BCRYPT_ROUNDS={rounds} (~{measure_bcrypt_ms(rounds):.0f} мс на хэш)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Записывает последние сообщения чатов в корпус для ReplayMessageSource
+(<каталог>/<чат>.jsonl). Нужны API_ID, API_HASH и TELEGRAM_SESSION в .env.
+Сообщения всегда читаются из Telegram, даже при PARSE_MESSAGE_SOURCE=replay.
+
+Запуск из корня проекта:
+    python scripts/record_chat_corpus.py corpora/ some_chat other_chat --limit 50000
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from src.parsing.parsing_sources import write_corpus  # noqa: E402
+from src.parsing.parsing_worker import create_telethon_source  # noqa: E402
+
+
+async def record(directory: Path, chats: list[str], limit: int) -> None:
+    source = create_telethon_source()
+    await source.connect()
+    try:
+        for chat in chats:
+            entity = await source.resolve_chat(chat)
+            messages = [message async for message in source.iter_messages(entity, limit)]
+            path = write_corpus(directory, chat, messages)
+            print(f"{chat}: {len(messages)} сообщений -> {path}")
+    finally:
+        await source.disconnect()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("directory", type=Path)
+    parser.add_argument("chats", nargs="+")
+    parser.add_argument("--limit", type=int, default=10000)
+    args = parser.parse_args()
+    asyncio.run(record(args.directory, args.chats, args.limit))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Локальная замена CRM для проверки доставки webhook.
+Проверяет подпись X-Webhook-Signature, по желанию отвечает ошибками и с задержкой,
+считает принятые пачки и лиды (GET /stats, сброс - DELETE /stats).
+
+Запуск из корня проекта:
+    python scripts/webhook_stub_server.py --secret <секрет подписки> --failure-rate 0.2 --latency-ms 50
+Затем создайте подписку на http://<хост>:8900/hook и запустите python -m src.webhooks.webhooks_worker;
+для адреса в локальной сети API и воркеру нужен WEBHOOK_ALLOW_PRIVATE_TARGETS=true.
+"""
+import argparse
+import asyncio
+import hashlib
+import hmac
+import random
+import time
+from collections import Counter
+
+import orjson
+import uvicorn
+from fastapi import FastAPI, Request, Response
+
+
+def create_app(secret: str | None, failure_rate: float, latency_ms: float) -> FastAPI:
+    app = FastAPI()
+    stats: Counter[str] = Counter()
+    lead_ids: set[str] = set()
+    started = time.monotonic()
+
+    @app.post("/hook")
+    async def hook(request: Request):
+        body = await request.body()
+        stats["requests"] += 1
+
+        if secret is not None:
+            expected = "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+            if not hmac.compare_digest(expected, request.headers.get("X-Webhook-Signature", "")):
+                stats["bad_signature"] += 1
+                return Response(status_code=401)
+
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        if random.random() < failure_rate:
+            stats["injected_failures"] += 1
+            return Response(status_code=503)
+
+        leads = orjson.loads(body)["leads"]
+        stats["batches"] += 1
+        stats["leads"] += len(leads)
+        for lead in leads:
+            if lead["id"] in lead_ids:
+                stats["duplicates"] += 1
+            lead_ids.add(lead["id"])
+        return Response(status_code=204)
+
+    @app.get("/stats")
+    async def get_stats():
+        elapsed = time.monotonic() - started
+        return {
+            **stats,
+            "unique_leads": len(lead_ids),
+            "leads_per_second": round(stats["leads"] / elapsed, 1) if elapsed else 0.0,
+            "avg_batch_size": round(stats["leads"] / stats["batches"], 1) if stats["batches"] else 0.0,
+        }
+
+    @app.delete("/stats", status_code=204)
+    async def reset_stats():
+        nonlocal started
+        stats.clear()
+        lead_ids.clear()
+        started = time.monotonic()
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--secret", help="секрет подписки; без него подпись не проверяется")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="доля запросов, отвечаемых 503")
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    uvicorn.run(create_app(args.secret, args.failure_rate, args.latency_ms), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
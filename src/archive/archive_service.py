@@ -0,0 +1,171 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable
+
+from sqlalchemy import delete, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import InstrumentedAttribute
+
+from src.archive.archive_storage import ArchiveStore
+from src.config import get_settings
+from src.leads.leads_models import Lead
+from src.parsing.parsing_models import ParseJob
+
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# Ключ advisory lock: архивацию в каждый момент выполняет один процесс
+ARCHIVE_LOCK_KEY = 740_043_001
+# Естественный ключ лида (uq_leads_message_contact): id у повторно вставленной строки был бы новым
+LEAD_KEY_FIELDS = ("chat_id", "message_id", "contact_type", "contact_value")
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """Через сколько дней строки типа данных переезжают из таблицы в архив (0 - никогда)"""
+    data_type: str
+    model: type
+    date_column: InstrumentedAttribute
+    retention_days: int
+    # Поле, значения которого индексируются по дням для выборочного чтения архива
+    index_field: str | None = None
+    # Поля, по которым при чтении архива отбрасываются повторы
+    key_fields: tuple[str, ...] = ("id",)
+    # Дополнительное условие: архивировать можно только завершённые записи и т.п.
+    conditions: tuple = field(default_factory=tuple)
+
+
+def retention_policies() -> list[RetentionPolicy]:
+    return [
+        RetentionPolicy(
+            data_type="leads",
+            model=Lead,
+            date_column=Lead.message_date,
+            retention_days=settings.LEADS_RETENTION_DAYS,
+            index_field="chat_id",
+            key_fields=LEAD_KEY_FIELDS,
+        ),
+        RetentionPolicy(
+            data_type="parse_jobs",
+            model=ParseJob,
+            date_column=ParseJob.finished_at,
+            retention_days=settings.PARSE_JOBS_RETENTION_DAYS,
+            index_field="user_id",
+            conditions=(ParseJob.status.in_(("done", "failed")),),
+        ),
+    ]
+
+
+@lru_cache
+def get_archive_store(
+    data_type: str,
+    index_field: str | None = None,
+    key_fields: tuple[str, ...] = ("id",)
+) -> ArchiveStore:
+    return ArchiveStore(Path(settings.ARCHIVE_DIR), data_type, index_field, key_fields)
+
+
+def retention_cutoff(retention_days: int) -> datetime | None:
+    """Строки старше этого момента архивируются; None - срок хранения не ограничен"""
+    if retention_days <= 0:
+        return None
+    return datetime.now(timezone.utc) - timedelta(days=retention_days)
+
+
+def _day(value: datetime) -> date:
+    return value.astimezone(timezone.utc).date()
+
+
+async def archive_expired(
+    db: AsyncSession,
+    policy: RetentionPolicy,
+    batch_size: int | None = None
+) -> int:
+    """
+    Переносит строки старше срока хранения в архив пачками
+
+    Пачка сначала дописывается в файлы (с fsync), затем удаляется из
+    таблицы в той же транзакции, где взята блокировка. Прерывание между
+    этими шагами оставляет в архиве повтор, который отбрасывается при
+    чтении по key_fields, но не теряет строк.
+
+    Returns:
+        Количество перенесённых строк
+    """
+    batch_size = batch_size or settings.ARCHIVE_BATCH_SIZE
+    store = get_archive_store(policy.data_type, policy.index_field, policy.key_fields)
+    table = policy.model.__table__
+    cutoff = retention_cutoff(policy.retention_days)
+    loop = asyncio.get_running_loop()
+    archived = 0
+
+    while True:
+        locked = await db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": ARCHIVE_LOCK_KEY})
+        if not locked.scalar():
+            await db.rollback()
+            logger.info("Архивация %s уже выполняется другим процессом", policy.data_type)
+            return archived
+
+        result = await db.execute(
+            select(*table.columns)
+            .where(policy.date_column < cutoff, *policy.conditions)
+            .order_by(policy.date_column)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        rows = [dict(row._mapping) for row in result]
+        if not rows:
+            await db.commit()
+            return archived
+
+        partitions: dict[date, list[dict[str, Any]]] = {}
+        for row in rows:
+            partitions.setdefault(_day(row[policy.date_column.key]), []).append(row)
+        await loop.run_in_executor(None, store.append, partitions)
+
+        await db.execute(delete(table).where(table.c.id.in_([row["id"] for row in rows])))
+        await db.commit()
+
+        archived += len(rows)
+        logger.info("Архивация %s: перенесено %s", policy.data_type, archived)
+
+
+async def run_retention(db: AsyncSession) -> dict[str, int]:
+    """Применяет все политики хранения; возвращает число перенесённых строк по типам"""
+    return {
+        policy.data_type: await archive_expired(db, policy)
+        for policy in retention_policies()
+        if policy.retention_days > 0
+    }
+
+
+def read_archived(
+    store: ArchiveStore,
+    date_field: str,
+    limit: int,
+    predicate: Callable[[dict], bool] | None = None,
+    index_value: Any = None,
+    date_from: date | None = None,
+    date_to: date | None = None
+) -> list[dict]:
+    """
+    Самые новые limit строк архива по date_field (по убыванию)
+
+    Дни читаются от новых к старым; чтение останавливается на первом
+    дне, после которого набралось limit строк. Синхронная: вызывайте в
+    пуле потоков.
+    """
+    rows: list[dict] = []
+    for day in store.days(date_from, date_to, index_value):
+        rows.extend(store.read_day(day, predicate))
+        if len(rows) >= limit:
+            break
+
+    rows.sort(key=lambda row: row[date_field], reverse=True)
+    return rows[:limit]
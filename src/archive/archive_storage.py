@@ -0,0 +1,123 @@
+import gzip
+import json
+import logging
+import os
+from datetime import date
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+import orjson
+
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "index.json"
+
+
+class ArchiveStore:
+    """
+    Холодное хранилище одного типа данных в локальных файлах
+
+    Строки лежат по дням в <root>/<тип>/<ГГГГ>/<ММ>/<ГГГГ-ММ-ДД>.jsonl.gz;
+    каждое дописывание - отдельный gzip member, поэтому файл не
+    переписывается целиком. index.json хранит по каждому дню число строк
+    и значения ключевого поля (например, chat_id), чтобы при чтении
+    открывать только нужные файлы. key_fields - естественный ключ строки,
+    по которому при чтении отбрасываются повторы.
+    """
+
+    def __init__(
+        self,
+        root: Path,
+        data_type: str,
+        index_field: str | None = None,
+        key_fields: tuple[str, ...] = ("id",)
+    ):
+        self.directory = root / data_type
+        self.index_field = index_field
+        self.key_fields = key_fields
+
+    def _partition_path(self, day: date) -> Path:
+        return self.directory / f"{day:%Y}" / f"{day:%m}" / f"{day.isoformat()}.jsonl.gz"
+
+    def read_index(self) -> dict[str, dict[str, Any]]:
+        try:
+            with open(self.directory / INDEX_FILE, encoding="utf-8") as index:
+                return json.load(index)
+        except FileNotFoundError:
+            return {}
+
+    def _write_index(self, index: dict[str, dict[str, Any]]) -> None:
+        path = self.directory / INDEX_FILE
+        tmp_path = path.with_suffix(".json.tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as tmp:
+                json.dump(index, tmp, ensure_ascii=False, sort_keys=True)
+                tmp.flush()
+                os.fsync(tmp.fileno())
+            os.replace(tmp_path, path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    def append(self, partitions: dict[date, list[dict[str, Any]]]) -> None:
+        """Дописывает строки по дням и обновляет индекс; после возврата данные на диске"""
+        index = self.read_index()
+
+        for day, rows in partitions.items():
+            path = self._partition_path(day)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            payload = b"".join(orjson.dumps(row) + b"\n" for row in rows)
+            with open(path, "ab") as partition:
+                partition.write(gzip.compress(payload))
+                partition.flush()
+                os.fsync(partition.fileno())
+
+            entry = index.setdefault(day.isoformat(), {"rows": 0})
+            entry["rows"] += len(rows)
+            if self.index_field is not None:
+                # Значения хранятся строками: UUID (user_id) не сериализуются в JSON
+                values = {str(value) for value in entry.get(self.index_field, [])}
+                values.update(str(row[self.index_field]) for row in rows)
+                entry[self.index_field] = sorted(values)
+
+        self._write_index(index)
+
+    def days(
+        self,
+        date_from: date | None = None,
+        date_to: date | None = None,
+        index_value: Any = None
+    ) -> list[date]:
+        """Дни с данными от новых к старым; с index_value - только дни, где оно встречается"""
+        days = []
+        for key, entry in self.read_index().items():
+            day = date.fromisoformat(key)
+            if date_from is not None and day < date_from:
+                continue
+            if date_to is not None and day > date_to:
+                continue
+            if index_value is not None and str(index_value) not in map(str, entry.get(self.index_field, ())):
+                continue
+            days.append(day)
+        return sorted(days, reverse=True)
+
+    def read_day(self, day: date, predicate: Callable[[dict], bool] | None = None) -> Iterator[dict]:
+        """Строки дня; повторы (после прерванной архивации) отбрасываются по key_fields"""
+        path = self._partition_path(day)
+        seen: set = set()
+        try:
+            with gzip.open(path, "rb") as partition:
+                for line in partition:
+                    row = orjson.loads(line)
+                    key = tuple(row[key_field] for key_field in self.key_fields)
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                    if predicate is None or predicate(row):
+                        yield row
+        except FileNotFoundError:
+            return
+        except EOFError:
+            # Последний member ещё дописывается другим процессом - он попадёт в следующее чтение
+            logger.debug("Архив %s дочитан до незавершённого блока", path)
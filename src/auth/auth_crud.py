@@ -5,6 +5,7 @@ from sqlalchemy import delete, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.auth.auth_models import RefreshToken
+from src.auth.auth_revocation import get_token_denylist
 
 
 async def create_refresh_token_record(
@@ -54,9 +55,10 @@ async def revoke_all_user_tokens(
     db: AsyncSession,
     user_id: UUID
 ) -> None:
-    """Отзывает все refresh токены пользователя"""
+    """Отзывает все refresh токены пользователя и уже выданные access токены"""
     await db.execute(
         delete(RefreshToken).where(RefreshToken.user_id == user_id)
     )
     await db.commit()
+    await get_token_denylist().revoke_user(str(user_id))
 
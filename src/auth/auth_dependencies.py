@@ -6,35 +6,65 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.auth.auth_jwt_utils import verify_token
-from src.database.dependencies import get_db
+from src.auth.auth_revocation import get_token_denylist
+from src.database.dependencies import get_read_db
 from src.users.users_models import User
 
 security = HTTPBearer()
 
 
-async def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: AsyncSession = Depends(get_db)
-) -> User:
+async def get_current_token_payload(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> dict:
     """
-    Dependency для получения текущего пользователя из access токена
-    
+    Dependency для получения проверенного payload access токена
+
+    Отзыв проверяется по локальной копии списка отозванных токенов, без запросов
+
     Raises:
-        HTTPException: Если токен невалиден или пользователь не найден
+        HTTPException: Если токен невалиден или отозван
     """
-    token = credentials.credentials
-    
     try:
-        payload = verify_token(token, token_type="access")
-        user_id = UUID(payload["sub"])
+        payload = verify_token(credentials.credentials, token_type="access")
+        UUID(payload["sub"])
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Невалидный токен: {str(e)}",
             headers={"WWW-Authenticate": "Bearer"},
         )
+
+    if get_token_denylist().is_revoked(payload):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Токен отозван",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+    return payload
+
+
+async def get_current_user_id(payload: dict = Depends(get_current_token_payload)) -> UUID:
+    """
+    Dependency для маршрутов, которым нужен только id пользователя
+
+    Без запроса к БД: удалённые и деактивированные пользователи отсекаются
+    списком отозванных токенов (revoke_user при удалении и деактивации).
+    """
+    return UUID(payload["sub"])
+
+
+async def get_current_user(
+    payload: dict = Depends(get_current_token_payload),
+    db: AsyncSession = Depends(get_read_db)
+) -> User:
+    """
+    Dependency для получения текущего пользователя из access токена
     
-    result = await db.execute(select(User).where(User.id == user_id))
+    Raises:
+        HTTPException: Если токен невалиден или пользователь не найден
+    """
+    result = await db.execute(select(User).where(User.id == UUID(payload["sub"])))
     user = result.scalar_one_or_none()
     
     if user is None:
@@ -50,4 +80,3 @@ async def get_current_user(
         )
     
     return user
-
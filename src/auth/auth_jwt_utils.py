@@ -1,20 +1,23 @@
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
-from uuid import UUID
+from uuid import UUID, uuid4
 
 import jwt
 from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric import rsa
 
 from src.config import get_settings
+from src.metrics.metrics import CRYPTO_DURATION
 
 
 settings = get_settings()
 
 
+@lru_cache
 def _load_private_key() -> rsa.RSAPrivateKey:
-    """Загружает приватный ключ для подписи токенов"""
+    """Загружает приватный ключ для подписи токенов (разбирается один раз на процесс)"""
     key_path = Path(settings.Auth_JWT.private_key_path)
     if not key_path.exists():
         raise FileNotFoundError(
@@ -29,8 +32,9 @@ def _load_private_key() -> rsa.RSAPrivateKey:
         )
 
 
+@lru_cache
 def _load_public_key() -> rsa.RSAPublicKey:
-    """Загружает публичный ключ для проверки токенов"""
+    """Загружает публичный ключ для проверки токенов (разбирается один раз на процесс)"""
     key_path = Path(settings.Auth_JWT.public_key_path)
     if not key_path.exists():
         raise FileNotFoundError(
@@ -51,16 +55,18 @@ def create_access_token(user_id: UUID, username: str) -> str:
         "sub": str(user_id),
         "username": username,
         "type": "access",
+        "jti": uuid4().hex,
         "iat": int(now.timestamp()),
         "exp": int(expires.timestamp()),
     }
     
     private_key = _load_private_key()
-    token = jwt.encode(
-        payload,
-        private_key,
-        algorithm=settings.Auth_JWT.algorithm
-    )
+    with CRYPTO_DURATION.labels("jwt_sign").time():
+        token = jwt.encode(
+            payload,
+            private_key,
+            algorithm=settings.Auth_JWT.algorithm
+        )
     
     return token
 
@@ -74,16 +80,18 @@ def create_refresh_token(user_id: UUID, username: str) -> str:
         "sub": str(user_id),
         "username": username,
         "type": "refresh",
+        "jti": uuid4().hex,
         "iat": int(now.timestamp()),
         "exp": int(expires.timestamp()),
     }
     
     private_key = _load_private_key()
-    token = jwt.encode(
-        payload,
-        private_key,
-        algorithm=settings.Auth_JWT.algorithm
-    )
+    with CRYPTO_DURATION.labels("jwt_sign").time():
+        token = jwt.encode(
+            payload,
+            private_key,
+            algorithm=settings.Auth_JWT.algorithm
+        )
     
     return token
 
@@ -103,11 +111,12 @@ def verify_token(token: str, token_type: str = "access") -> dict[str, Any]:
     public_key = _load_public_key()
     
     try:
-        payload = jwt.decode(
-            token,
-            public_key,
-            algorithms=[settings.Auth_JWT.algorithm]
-        )
+        with CRYPTO_DURATION.labels("jwt_verify").time():
+            payload = jwt.decode(
+                token,
+                public_key,
+                algorithms=[settings.Auth_JWT.algorithm]
+            )
     except jwt.ExpiredSignatureError:
         raise jwt.ExpiredSignatureError("Токен истёк")
     except jwt.InvalidTokenError as e:
@@ -124,3 +133,7 @@ def get_user_id_from_token(token: str, token_type: str = "access") -> UUID:
     payload = verify_token(token, token_type)
     return UUID(payload["sub"])
 
+
+def warm_up_jwt() -> None:
+    """Загружает ключи и выполняет пробную подпись/проверку, чтобы первый вход не платил за это"""
+    verify_token(create_access_token(uuid4(), "warmup"), token_type="access")
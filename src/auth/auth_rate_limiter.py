@@ -0,0 +1,179 @@
+import hashlib
+import logging
+import math
+import secrets
+import time
+
+from fastapi import HTTPException, Request, status
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.config import get_settings
+from src.database.redis import get_redis
+
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+
+# Проверка блокировки идентификатора и скользящего окна попыток с IP.
+# Попытка засчитывается в окно IP только если вход не отклонён.
+# Возвращает {1, 0} если вход разрешён, иначе {0, через сколько мс повторить}.
+_CHECK_SCRIPT = """
+local lock_ttl = redis.call('PTTL', KEYS[2])
+if lock_ttl > 0 then
+    return {0, lock_ttl}
+end
+
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[3]) then
+    local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+    return {0, tonumber(oldest[2]) + window - now}
+end
+
+redis.call('ZADD', KEYS[1], now, ARGV[4])
+redis.call('PEXPIRE', KEYS[1], window)
+return {1, 0}
+"""
+
+# Учёт неудачной попытки для идентификатора; при превышении лимита
+# в окне идентификатор блокируется на время lockout. Возвращает 1 при блокировке.
+_FAILURE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], '-inf', now - window)
+redis.call('ZADD', KEYS[1], now, ARGV[5])
+redis.call('PEXPIRE', KEYS[1], window)
+
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[3]) then
+    redis.call('SET', KEYS[2], '1', 'PX', ARGV[4])
+    redis.call('DEL', KEYS[1])
+    return 1
+end
+return 0
+"""
+
+
+def get_client_ip(request: Request) -> str:
+    """IP клиента; X-Forwarded-For учитывается только за доверенным прокси"""
+    if settings.LOGIN_TRUST_FORWARDED_FOR:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+
+    return request.client.host if request.client else "unknown"
+
+
+def _identifier_key(identifier: str) -> str:
+    # Хэш ограничивает длину ключа и не хранит логины в Redis в открытом виде
+    return hashlib.sha256(identifier.strip().lower().encode("utf-8")).hexdigest()
+
+
+def _subject_key(identifier: str, account_id: object | None) -> str:
+    """
+    Чьи неудачные попытки считаются: найденного аккаунта или, если аккаунта
+    нет, введённого идентификатора. Вход по username и по email одного
+    аккаунта расходует один общий лимит.
+    """
+    if account_id is not None:
+        return f"user:{account_id}"
+    return _identifier_key(identifier)
+
+
+def _too_many_attempts(retry_after_ms: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Слишком много попыток входа. Повторите позже",
+        headers={"Retry-After": str(max(math.ceil(int(retry_after_ms) / 1000), 1))},
+    )
+
+
+class LoginRateLimiter:
+    """
+    Ограничение попыток входа по IP и по аккаунту
+
+    Окно IP и блокировка несуществующего идентификатора проверяются до
+    обращения к БД; блокировка найденного аккаунта - после поиска
+    пользователя, но до bcrypt. При недоступности Redis ограничение не
+    применяется.
+    """
+
+    def __init__(self, redis: Redis):
+        self.redis = redis
+        self._check = redis.register_script(_CHECK_SCRIPT)
+        self._failure = redis.register_script(_FAILURE_SCRIPT)
+
+    async def check(self, client_ip: str, identifier: str) -> None:
+        """
+        Raises:
+            HTTPException: 429 с Retry-After, если попытка не разрешена
+        """
+        id_key = _identifier_key(identifier)
+
+        try:
+            allowed, retry_after_ms = await self._check(
+                keys=[f"login:ip:{client_ip}", f"login:lock:{id_key}"],
+                args=[
+                    int(time.time() * 1000),
+                    settings.LOGIN_IP_WINDOW_SECONDS * 1000,
+                    settings.LOGIN_IP_MAX_ATTEMPTS,
+                    secrets.token_hex(8),
+                ]
+            )
+        except RedisError:
+            logger.warning("Redis недоступен, ограничение попыток входа пропущено", exc_info=True)
+            return
+
+        if not allowed:
+            raise _too_many_attempts(retry_after_ms)
+
+    async def check_account(self, account_id: object) -> None:
+        """
+        Raises:
+            HTTPException: 429 с Retry-After, если аккаунт заблокирован
+        """
+        try:
+            lock_ttl_ms = await self.redis.pttl(f"login:lock:user:{account_id}")
+        except RedisError:
+            logger.warning("Redis недоступен, блокировка аккаунта не проверена", exc_info=True)
+            return
+
+        if lock_ttl_ms > 0:
+            raise _too_many_attempts(lock_ttl_ms)
+
+    async def record_failure(self, identifier: str, account_id: object | None = None) -> None:
+        subject = _subject_key(identifier, account_id)
+
+        try:
+            await self._failure(
+                keys=[f"login:fail:{subject}", f"login:lock:{subject}"],
+                args=[
+                    int(time.time() * 1000),
+                    settings.LOGIN_ID_WINDOW_SECONDS * 1000,
+                    settings.LOGIN_ID_MAX_FAILURES,
+                    settings.LOGIN_ID_LOCKOUT_SECONDS * 1000,
+                    secrets.token_hex(8),
+                ]
+            )
+        except RedisError:
+            logger.warning("Redis недоступен, неудачная попытка входа не учтена", exc_info=True)
+
+    async def reset(self, identifier: str, account_id: object | None = None) -> None:
+        """Сбрасывает счётчик неудачных попыток после успешного входа"""
+        try:
+            await self.redis.delete(f"login:fail:{_subject_key(identifier, account_id)}")
+        except RedisError:
+            logger.warning("Redis недоступен, счётчик попыток входа не сброшен", exc_info=True)
+
+
+_limiter: LoginRateLimiter | None = None
+
+
+def get_login_rate_limiter() -> LoginRateLimiter:
+    global _limiter
+    if _limiter is None:
+        _limiter = LoginRateLimiter(get_redis())
+    return _limiter
@@ -0,0 +1,233 @@
+import asyncio
+import hashlib
+import logging
+import math
+import time
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.config import get_settings
+from src.database.redis import get_redis
+from src.metrics.metrics import record_cache_access
+
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+DENYLIST_KEY_PREFIX = "auth:denylist:"
+DENYLIST_CHANNEL = "auth:denylist"
+# Как часто пересобирать фильтр Блума, выбрасывая истёкшие записи
+BLOOM_REBUILD_INTERVAL_SECONDS = 300
+RESUBSCRIBE_DELAY_SECONDS = 1.0
+PUBLISH_ATTEMPTS = 3
+PUBLISH_RETRY_DELAY_SECONDS = 0.2
+
+
+class BloomFilter:
+    """Фильтр Блума на bytearray; k индексов из одного blake2b (двойное хэширование)"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hash_count = max(round(self.size / capacity * math.log(2)), 1)
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _indexes(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        for i in range(self.hash_count):
+            yield (first + i * second) % self.size
+
+    def add(self, key: str) -> None:
+        for index in self._indexes(key):
+            self.bits[index >> 3] |= 1 << (index & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self.bits[index >> 3] & (1 << (index & 7)) for index in self._indexes(key))
+
+
+class TokenDenylist:
+    """
+    Отозванные access токены
+
+    Источник истины - ключи в Redis с TTL до истечения токена. Каждый
+    процесс держит локальную копию (словари + фильтр Блума) и получает
+    новые отзывы через pub/sub, поэтому проверка на горячем пути не
+    делает запросов: почти всегда это один отрицательный ответ фильтра.
+
+    Отзываются отдельные токены (по jti) и все токены пользователя,
+    выпущенные до момента отзыва.
+    """
+
+    def __init__(self, redis: Redis, capacity: int, error_rate: float):
+        self.redis = redis
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self._jtis: dict[str, float] = {}  # jti -> exp
+        self._users: dict[str, float] = {}  # user_id -> момент отзыва (unix time)
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._bloom_capacity = capacity
+        self._last_rebuild = time.monotonic()
+        self._listener: asyncio.Task | None = None
+        # Установлено после первой полной загрузки из Redis
+        self.loaded = asyncio.Event()
+
+    def is_revoked(self, payload: dict) -> bool:
+        """O(1) проверка payload access токена по локальной копии"""
+        jti = payload.get("jti")
+        user_id = payload.get("sub")
+        jti_key = f"jti:{jti}"
+        user_key = f"user:{user_id}"
+
+        if jti_key not in self._bloom and user_key not in self._bloom:
+            record_cache_access("token_denylist_bloom", hit=False)
+            return False
+
+        record_cache_access("token_denylist_bloom", hit=True)
+        if jti is not None and jti in self._jtis:
+            return True
+
+        revoked_at = self._users.get(user_id)
+        return revoked_at is not None and payload.get("iat", 0) <= revoked_at
+
+    async def revoke_token(self, jti: str, expires_at: float) -> None:
+        ttl = math.ceil(expires_at - time.time())
+        if ttl <= 0:
+            return
+        self._apply(f"jti:{jti}", expires_at)
+        await self._publish(f"jti:{jti}", expires_at, ttl)
+
+    async def revoke_user(self, user_id: str) -> None:
+        """Отзывает все access токены пользователя, выпущенные до текущего момента"""
+        revoked_at = float(int(time.time()))
+        self._apply(f"user:{user_id}", revoked_at)
+        # Дольше времени жизни access токена запись не нужна
+        await self._publish(
+            f"user:{user_id}",
+            revoked_at,
+            settings.Auth_JWT.access_token_expires_minutes * 60
+        )
+
+    async def _publish(self, entry: str, value: float, ttl: int) -> None:
+        """
+        Сохраняет отзыв в Redis и рассылает другим процессам
+
+        Raises:
+            RedisError: Если Redis недоступен после нескольких попыток - отзыв
+                применён только в этом процессе, вызывающий должен об этом узнать
+        """
+        for attempt in range(1, PUBLISH_ATTEMPTS + 1):
+            try:
+                async with self.redis.pipeline(transaction=True) as pipe:
+                    pipe.set(DENYLIST_KEY_PREFIX + entry, value, ex=ttl)
+                    pipe.publish(DENYLIST_CHANNEL, f"{entry}={value}")
+                    await pipe.execute()
+                return
+            except RedisError:
+                if attempt == PUBLISH_ATTEMPTS:
+                    logger.error("Не удалось опубликовать отзыв токена %s", entry, exc_info=True)
+                    raise
+                await asyncio.sleep(PUBLISH_RETRY_DELAY_SECONDS * attempt)
+
+    def _apply(self, entry: str, value: float) -> None:
+        kind, _, ident = entry.partition(":")
+        if kind == "jti":
+            self._jtis[ident] = value
+        elif kind == "user":
+            self._users[ident] = max(value, self._users.get(ident, 0.0))
+        else:
+            return
+        self._bloom.add(entry)
+        self._maybe_rebuild()
+
+    def _maybe_rebuild(self) -> None:
+        """Фильтр Блума не умеет удалять: периодически пересобираем его без истёкших записей"""
+        now = time.monotonic()
+        entries = len(self._jtis) + len(self._users)
+        if now - self._last_rebuild < BLOOM_REBUILD_INTERVAL_SECONDS and entries < self._bloom_capacity:
+            return
+
+        wall_now = time.time()
+        user_ttl = settings.Auth_JWT.access_token_expires_minutes * 60
+        self._jtis = {jti: exp for jti, exp in self._jtis.items() if exp > wall_now}
+        self._users = {
+            user_id: revoked_at
+            for user_id, revoked_at in self._users.items()
+            if revoked_at + user_ttl > wall_now
+        }
+
+        # При переполнении фильтр растёт, чтобы не превышать заданную долю ложных срабатываний
+        self._bloom_capacity = max(self.capacity, (len(self._jtis) + len(self._users)) * 2)
+        bloom = BloomFilter(self._bloom_capacity, self.error_rate)
+        for jti in self._jtis:
+            bloom.add(f"jti:{jti}")
+        for user_id in self._users:
+            bloom.add(f"user:{user_id}")
+
+        self._bloom = bloom
+        self._last_rebuild = now
+
+    async def _load(self) -> None:
+        """Полная синхронизация локальной копии с Redis"""
+        entries: dict[str, float] = {}
+        keys = [key async for key in self.redis.scan_iter(match=DENYLIST_KEY_PREFIX + "*", count=1000)]
+        for start in range(0, len(keys), 1000):
+            chunk = keys[start:start + 1000]
+            for key, value in zip(chunk, await self.redis.mget(chunk)):
+                if value is not None:
+                    entries[key[len(DENYLIST_KEY_PREFIX):]] = float(value)
+
+        for entry, value in entries.items():
+            self._apply(entry, value)
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async with self.redis.pubsub() as pubsub:
+                    await pubsub.subscribe(DENYLIST_CHANNEL)
+                    # Подписка до загрузки: отзывы, пришедшие во время загрузки, не теряются
+                    await self._load()
+                    self.loaded.set()
+                    async for message in pubsub.listen():
+                        if message["type"] != "message":
+                            continue
+                        # Одно испорченное сообщение не должно останавливать подписку
+                        try:
+                            entry, _, value = message["data"].partition("=")
+                            self._apply(entry, float(value))
+                        except (ValueError, AttributeError):
+                            logger.warning("Некорректное сообщение об отзыве токена: %r", message["data"])
+            except asyncio.CancelledError:
+                raise
+            except (RedisError, OSError):
+                logger.warning("Потеряно соединение с Redis для списка отзыва токенов", exc_info=True)
+                await asyncio.sleep(RESUBSCRIBE_DELAY_SECONDS)
+
+    async def start(self) -> None:
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+
+_denylist: TokenDenylist | None = None
+
+
+def get_token_denylist() -> TokenDenylist:
+    global _denylist
+    if _denylist is None:
+        _denylist = TokenDenylist(
+            get_redis(),
+            capacity=settings.TOKEN_DENYLIST_BLOOM_CAPACITY,
+            error_rate=settings.TOKEN_DENYLIST_BLOOM_ERROR_RATE,
+        )
+    return _denylist
@@ -1,7 +1,7 @@
 from datetime import datetime, timedelta, timezone
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -10,16 +10,33 @@ from src.auth.auth_crud import (
     get_refresh_token_by_token,
     revoke_refresh_token,
 )
-from src.auth.auth_dependencies import get_current_user
+from src.auth.auth_dependencies import get_current_token_payload, get_current_user
 from src.auth.auth_jwt_utils import (
     create_access_token,
     create_refresh_token,
     verify_token,
 )
-from src.auth.auth_schemas import LoginRequest, RefreshTokenRequest, TokenResponse
+from src.auth.auth_rate_limiter import (
+    LoginRateLimiter,
+    get_client_ip,
+    get_login_rate_limiter,
+)
+from src.auth.auth_revocation import get_token_denylist
+from src.auth.auth_schemas import (
+    LoginRequest,
+    LogoutRequest,
+    RefreshTokenRequest,
+    TokenResponse,
+)
 from src.config import get_settings
 from src.database.dependencies import get_db
-from src.users.services.password_service import verify_password
+from src.users.services.password_service import (
+    hash_password_async,
+    needs_rehash,
+    verify_password_async,
+)
+from src.users.users_crud import update_user_password_hash
+from src.users.users_etag import etag_matches, if_none_match, not_modified, set_cache_headers, user_etag
 from src.users.users_models import User
 from src.users.users_schemas import UserResponse
 
@@ -30,9 +47,14 @@ settings = get_settings()
 @router.post("/login", response_model=TokenResponse)
 async def login(
     login_data: LoginRequest,
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    rate_limiter: LoginRateLimiter = Depends(get_login_rate_limiter)
 ):
     """Авторизация пользователя по username/email и паролю"""
+    # Лимиты проверяются до запроса в БД и bcrypt
+    await rate_limiter.check(get_client_ip(request), login_data.username)
+    
     # Ищем пользователя по username или email
     result = await db.execute(
         select(User).where(
@@ -40,8 +62,13 @@ async def login(
         )
     )
     user = result.scalar_one_or_none()
-    
-    if user is None or not verify_password(login_data.password, user.password):
+
+    # Блокировка общая для username и email аккаунта; проверяется до bcrypt
+    if user is not None:
+        await rate_limiter.check_account(user.id)
+
+    if user is None or not await verify_password_async(login_data.password, user.password):
+        await rate_limiter.record_failure(login_data.username, user.id if user is not None else None)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Неверный username/email или password",
@@ -54,6 +81,14 @@ async def login(
             detail="Пользователь деактивирован"
         )
     
+    await rate_limiter.reset(login_data.username, user.id)
+    
+    # Пароль известен только сейчас: перехэшируем под текущую стоимость bcrypt.
+    # Коммитится вместе с записью refresh токена ниже
+    if needs_rehash(user.password):
+        new_hash = await hash_password_async(login_data.password)
+        await update_user_password_hash(db, user.id, user.password, new_hash)
+    
     # Создаём access и refresh токены
     access_token = create_access_token(user.id, user.username)
     refresh_token_str = create_refresh_token(user.id, user.username)
@@ -141,10 +176,38 @@ async def refresh_tokens(
     )
 
 
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    logout_data: LogoutRequest,
+    payload: dict = Depends(get_current_token_payload),
+    db: AsyncSession = Depends(get_db)
+):
+    """Выход: отзыв текущего access токена и, если передан, refresh токена"""
+    # Токены, выданные до появления jti, отозвать по отдельности нельзя - они доживут до exp
+    if "jti" in payload:
+        await get_token_denylist().revoke_token(payload["jti"], payload["exp"])
+
+    if logout_data.refresh_token is not None:
+        refresh_token_record = await get_refresh_token_by_token(db, logout_data.refresh_token)
+        # Чужой refresh токен отозвать нельзя
+        if (
+            refresh_token_record is not None
+            and str(refresh_token_record.user_id) == payload["sub"]
+            and not refresh_token_record.is_revoked
+        ):
+            await revoke_refresh_token(db, refresh_token_record)
+
+
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(
+    request: Request,
+    response: Response,
     current_user: User = Depends(get_current_user)
 ):
-    """Получение информации о текущем пользователе"""
+    """Получение информации о текущем пользователе; If-None-Match с тем же ETag - 304 без тела"""
+    etag = user_etag(current_user.id, current_user.updated_at)
+    if etag_matches(if_none_match(request), etag):
+        return not_modified(etag)
+    set_cache_headers(response, etag)
     return current_user
 
@@ -15,3 +15,6 @@ class TokenResponse(BaseModel):
 class RefreshTokenRequest(BaseModel):
     refresh_token: str
 
+
+class LogoutRequest(BaseModel):
+    refresh_token: str | None = Field(None, description="Refresh токен, который тоже нужно отозвать")
@@ -22,8 +22,14 @@ class Settings(BaseSettings):
     POSTGRES_DB: str
     DB_ECHO: bool
 
-    # API_ID: int
-    # API_HASH: str
+    # Реплики только для чтения: "host1:5432,host2:5432" (пусто - все запросы идут в primary)
+    POSTGRES_REPLICA_HOSTS: str = ""
+    REPLICA_MAX_LAG_SECONDS: float = 5.0
+    REPLICA_LAG_CHECK_INTERVAL_SECONDS: float = 5.0
+
+    API_ID: int | None = None
+    API_HASH: str | None = None
+    TELEGRAM_SESSION: str | None = None  # StringSession аккаунта для парсинга
 
     FERNET_KEY: str
 
@@ -31,7 +37,90 @@ class Settings(BaseSettings):
     REDIS_PORT: str
     REDIS_PASSWORD: str | None
 
-    # Auth_JWT: AuthJWT = AuthJWT()
+    # Ограничение попыток входа (скользящие окна в Redis)
+    LOGIN_IP_MAX_ATTEMPTS: int = 30
+    LOGIN_IP_WINDOW_SECONDS: int = 60
+    LOGIN_ID_MAX_FAILURES: int = 5
+    LOGIN_ID_WINDOW_SECONDS: int = 900
+    LOGIN_ID_LOCKOUT_SECONDS: int = 900
+    LOGIN_TRUST_FORWARDED_FOR: bool = False
+
+    # Условные GET (ETag): сколько клиент может не перепроверять ответ (0 - перепроверять каждый раз)
+    ETAG_MAX_AGE_SECONDS: int = 0
+
+    # Прогрев при старте: сколько ждать каждый шаг, прежде чем пропустить его
+    WARMUP_STEP_TIMEOUT_SECONDS: float = 30.0
+
+    # Локальная копия списка отозванных access токенов: размер фильтра Блума
+    TOKEN_DENYLIST_BLOOM_CAPACITY: int = 100_000
+    TOKEN_DENYLIST_BLOOM_ERROR_RATE: float = 0.001
+
+    # Стоимость bcrypt: явное значение или автокалибровка при старте под BCRYPT_TARGET_MS
+    BCRYPT_ROUNDS: int | None = None
+    BCRYPT_AUTO_CALIBRATE: bool = False
+    BCRYPT_TARGET_MS: float = 250.0
+
+    # Сброс нагрузки на дорогих (bcrypt) маршрутах
+    LOAD_SHED_BCRYPT_CONCURRENCY: int = 4
+    LOAD_SHED_BCRYPT_QUEUE_BUDGET_MS: int = 1000
+
+    # Сэмплирующий профилировщик запросов (по умолчанию выключен)
+    PROFILER_ENABLED: bool = False
+    PROFILER_SAMPLE_RATE: float = 0.0  # доля профилируемых запросов, 0..1
+    PROFILER_TOKEN: str | None = None  # значение заголовка X-Profile-Token для профилирования одного запроса
+    PROFILER_INTERVAL_MS: float = 2.0
+    PROFILER_OUTPUT_DIR: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "profiles")
+    PROFILER_MAX_PROFILES: int = 100
+
+    # Планировщик задач парсинга
+    PARSE_MAX_RUNNING_JOBS: int = 8
+    PARSE_INTERACTIVE_RESERVED_SLOTS: int = 2
+    PARSE_INTERACTIVE_MAX_MESSAGES: int = 500
+    PARSE_USER_MAX_CONCURRENT_JOBS: int = 2
+    PARSE_USER_DAILY_MESSAGE_QUOTA: int = 200_000
+    # Дольше FloodWait не ждём - задача завершается ошибкой
+    PARSE_MAX_FLOOD_WAIT_SECONDS: int = 300
+    PARSE_MAX_RECONNECTS: int = 5
+    # Таймаут задачи в воркере; задача в статусе running дольше таймаута и запаса считается потерянной
+    # (воркер упал) и возвращается в очередь
+    PARSE_JOB_TIMEOUT_SECONDS: int = 6 * 60 * 60
+    PARSE_JOB_STALE_GRACE_SECONDS: int = 600
+
+    # Кэш извлечения контактов по хэшу текста (репосты одного объявления); общий слой в Redis - по желанию
+    EXTRACTION_CACHE_SIZE: int = 100_000
+    EXTRACTION_CACHE_SHARED: bool = False
+    EXTRACTION_CACHE_TTL_SECONDS: int = 86400
+
+    # Обогащение телефонов: таблица нумерации (prefix,country,region,operator) и кэш дерева префиксов
+    PHONE_NUMBERING_PLAN_PATH: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "numbering_plan.csv")
+    PHONE_TRIE_CACHE_PATH: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "data", "cache", "numbering_plan.trie")
+
+    # Холодный архив: строки старше срока хранения переносятся в сжатые файлы по дням (0 - не архивировать)
+    ARCHIVE_DIR: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "archive")
+    ARCHIVE_BATCH_SIZE: int = 5000
+    LEADS_RETENTION_DAYS: int = 180
+    PARSE_JOBS_RETENTION_DAYS: int = 90
+
+    # Доставка новых лидов в webhook подписок (CRM): пачки, повторы с экспоненциальной задержкой, dead letter
+    WEBHOOK_MAX_ATTEMPTS: int = 8
+    WEBHOOK_BACKOFF_BASE_SECONDS: float = 2.0
+    WEBHOOK_BACKOFF_MAX_SECONDS: float = 3600.0
+    WEBHOOK_TIMEOUT_SECONDS: float = 10.0
+    WEBHOOK_POLL_INTERVAL_SECONDS: float = 1.0
+    WEBHOOK_LEASE_SECONDS: float = 60.0  # через сколько недоставленная пачка упавшего воркера снова доступна
+    WEBHOOK_MAX_CONNECTIONS: int = 100
+    # Разрешить адреса внутренней сети (localhost, RFC1918) - только для локальной проверки с заглушкой
+    WEBHOOK_ALLOW_PRIVATE_TARGETS: bool = False
+
+    # Источник сообщений воркера: telethon или replay (корпус из файлов, для нагрузочных тестов без Telegram)
+    PARSE_MESSAGE_SOURCE: str = "telethon"
+    PARSE_REPLAY_DIR: str | None = None
+    PARSE_REPLAY_RATE: float = 0.0  # сообщений в секунду, 0 - без ограничения
+    PARSE_REPLAY_FLOOD_WAIT_RATE: float = 0.0  # вероятность FloodWaitError на страницу
+    PARSE_REPLAY_FLOOD_WAIT_SECONDS: int = 1
+    PARSE_REPLAY_DISCONNECT_RATE: float = 0.0  # вероятность обрыва соединения на страницу
+
+    Auth_JWT: AuthJWT = AuthJWT()
 
     model_config = SettingsConfigDict(
         env_file=os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".env")
@@ -48,6 +137,18 @@ class Settings(BaseSettings):
             f"{self.POSTGRES_HOST}:{self.POSTGRES_PORT}/{self.POSTGRES_DB}"
         )
 
+    @property
+    def REPLICA_DATABASE_URLS(self) -> list[str]:
+        urls = []
+        for host in filter(None, (item.strip() for item in self.POSTGRES_REPLICA_HOSTS.split(","))):
+            if ":" not in host:
+                host = f"{host}:{self.POSTGRES_PORT}"
+            urls.append(
+                f"postgresql+asyncpg://{self.POSTGRES_USER}:{self.POSTGRES_PASSWORD}@"
+                f"{host}/{self.POSTGRES_DB}"
+            )
+        return urls
+
 
 @lru_cache()
 def get_settings():
@@ -1,6 +1,7 @@
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.engine import async_session
+from src.database.replica_router import replica_router
 
 
 async def get_db() -> AsyncSession:
@@ -10,3 +11,12 @@ async def get_db() -> AsyncSession:
         finally:
             await session.close()
 
+
+async def get_read_db() -> AsyncSession:
+    """Сессия для запросов только на чтение: реплика, если она не отстаёт, иначе primary"""
+    async with replica_router.session_factory()() as session:
+        try:
+            yield session
+        finally:
+            await session.close()
+
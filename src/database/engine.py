@@ -4,5 +4,15 @@ from src.config import get_settings
 
 settings = get_settings()
 
-engine = create_async_engine(settings.DATABASE_URL, echo=True)
+engine = create_async_engine(settings.DATABASE_URL, echo=settings.DB_ECHO)
 async_session = async_sessionmaker(engine, expire_on_commit=False)
+
+# Реплики только для чтения (может быть пусто)
+replica_engines = [
+    create_async_engine(url, echo=settings.DB_ECHO)
+    for url in settings.REPLICA_DATABASE_URLS
+]
+replica_sessions = [
+    async_sessionmaker(replica_engine, expire_on_commit=False)
+    for replica_engine in replica_engines
+]
@@ -0,0 +1,17 @@
+from functools import lru_cache
+
+from redis.asyncio import Redis
+
+from src.config import get_settings
+
+
+@lru_cache()
+def get_redis() -> Redis:
+    """Общий клиент Redis (соединения открываются лениво из пула)"""
+    settings = get_settings()
+    return Redis(
+        host=settings.REDIS_HOST,
+        port=int(settings.REDIS_PORT),
+        password=settings.REDIS_PASSWORD,
+        decode_responses=True
+    )
@@ -0,0 +1,108 @@
+import asyncio
+import itertools
+import time
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from src.config import get_settings
+from src.database.engine import async_session, replica_engines, replica_sessions
+
+
+# Отставание реплики в секундах; 0, если всё полученное WAL уже применено.
+# NULL - реплика не получает WAL (приёмник не в состоянии streaming): равенство
+# полученного и применённого LSN тогда ничего не говорит о свежести данных.
+# Статус приёмника виден роли с правами pg_read_all_stats (например, pg_monitor);
+# без них реплика считается отстающей и запросы идут в primary.
+REPLICA_LAG_SQL = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN NOT EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming') THEN NULL
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+LAG_CHECK_TIMEOUT_SECONDS = 2.0
+
+
+class ReplicaRouter:
+    """
+    Выбор сессии для запросов только на чтение
+
+    Реплики перебираются по кругу среди тех, чьё отставание не превышает
+    max_lag. Отставание проверяется в фоне не чаще раза в check_interval;
+    пока проверка не прошла или все реплики отстают, используется primary.
+    """
+
+    def __init__(
+        self,
+        primary: async_sessionmaker[AsyncSession],
+        engines: list[AsyncEngine],
+        sessions: list[async_sessionmaker[AsyncSession]],
+        max_lag: float,
+        check_interval: float
+    ):
+        self.primary = primary
+        self.engines = engines
+        self.sessions = sessions
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._healthy: list[int] = []
+        self._counter = itertools.count()
+        self._last_check = float("-inf")
+        self._refresh_task: asyncio.Task | None = None
+
+    def session_factory(self) -> async_sessionmaker[AsyncSession]:
+        self._schedule_refresh()
+
+        healthy = self._healthy
+        if not healthy:
+            return self.primary
+        return self.sessions[healthy[next(self._counter) % len(healthy)]]
+
+    def _schedule_refresh(self) -> None:
+        if not self.engines:
+            return
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+
+        now = time.monotonic()
+        if now - self._last_check < self.check_interval:
+            return
+
+        self._last_check = now
+        self._refresh_task = asyncio.create_task(self.refresh())
+
+    async def refresh(self) -> None:
+        """Перепроверяет отставание всех реплик"""
+        lags = await asyncio.gather(
+            *(self._replica_lag(replica) for replica in self.engines),
+            return_exceptions=True
+        )
+        self._healthy = [
+            index
+            for index, lag in enumerate(lags)
+            if not isinstance(lag, BaseException) and lag <= self.max_lag
+        ]
+
+    @staticmethod
+    async def _replica_lag(replica: AsyncEngine) -> float:
+        async def query() -> float:
+            async with replica.connect() as conn:
+                result = await conn.execute(text(REPLICA_LAG_SQL))
+                lag = result.scalar()
+                return float("inf") if lag is None else float(lag)
+
+        return await asyncio.wait_for(query(), timeout=LAG_CHECK_TIMEOUT_SECONDS)
+
+
+settings = get_settings()
+
+replica_router = ReplicaRouter(
+    primary=async_session,
+    engines=replica_engines,
+    sessions=replica_sessions,
+    max_lag=settings.REPLICA_MAX_LAG_SECONDS,
+    check_interval=settings.REPLICA_LAG_CHECK_INTERVAL_SECONDS,
+)
@@ -0,0 +1,21 @@
+from fastapi import APIRouter, status
+from fastapi.responses import ORJSONResponse
+
+from src.health.warmup import readiness
+
+router = APIRouter(prefix="/health", tags=["health"])
+
+
+@router.get("/live")
+async def live():
+    """Процесс жив и обслуживает event loop"""
+    return {"status": "ok"}
+
+
+@router.get("/ready")
+async def ready():
+    """Готовность принимать трафик: прогрев завершён и остановка не началась. Без запросов к БД"""
+    return ORJSONResponse(
+        {"status": readiness.status},
+        status_code=status.HTTP_200_OK if readiness.ready else status.HTTP_503_SERVICE_UNAVAILABLE
+    )
@@ -0,0 +1,97 @@
+import asyncio
+import logging
+import time
+from contextlib import AsyncExitStack
+from typing import Awaitable, Callable
+
+from fastapi import FastAPI
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.auth.auth_jwt_utils import warm_up_jwt
+from src.auth.auth_revocation import get_token_denylist
+from src.config import get_settings
+from src.database.engine import engine, replica_engines
+from src.database.replica_router import replica_router
+from src.users.services.password_service import warm_up_bcrypt_pool
+
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+REQUIRED_STEP_RETRY_SECONDS = 1.0
+
+
+class Readiness:
+    """Готовность процесса принимать трафик: после прогрева и до начала остановки"""
+
+    def __init__(self):
+        self.warmed_up = False
+        self.shutting_down = False
+
+    @property
+    def ready(self) -> bool:
+        return self.warmed_up and not self.shutting_down
+
+    @property
+    def status(self) -> str:
+        if self.shutting_down:
+            return "shutting_down"
+        return "ready" if self.warmed_up else "warming_up"
+
+
+readiness = Readiness()
+
+
+async def _warm_up_pool(db_engine: AsyncEngine) -> None:
+    """Открывает все постоянные соединения пула одновременно, чтобы они остались в пуле"""
+    async with AsyncExitStack() as stack:
+        for _ in range(db_engine.pool.size()):
+            conn = await stack.enter_async_context(db_engine.connect())
+            # Первый запрос asyncpg дополнительно загружает сведения о типах
+            await conn.execute(text("SELECT 1"))
+
+
+async def _step(name: str, coro) -> bool:
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(coro, settings.WARMUP_STEP_TIMEOUT_SECONDS)
+    except Exception:
+        logger.warning("Прогрев: шаг %s завершился ошибкой", name, exc_info=True)
+        return False
+    logger.info("Прогрев: %s за %.0f мс", name, (time.perf_counter() - started) * 1000)
+    return True
+
+
+async def _required_step(name: str, make_coro: Callable[[], Awaitable]) -> None:
+    """Шаг, без которого процесс не готов к трафику: повторяется до успеха"""
+    while not await _step(name, make_coro()):
+        await asyncio.sleep(REQUIRED_STEP_RETRY_SECONDS)
+
+
+async def warm_up(app: FastAPI) -> None:
+    """
+    Оплачивает ленивые затраты до первого запроса: пулы соединений,
+    разбор RSA ключей, потоки bcrypt, проверку реплик, список отозванных
+    токенов и схему OpenAPI.
+
+    Пул primary и загрузка списка отозванных токенов обязательны: пока они
+    не прошли, /health/ready отвечает 503. Остальные шаги только ускоряют
+    первые запросы, их ошибки не мешают готовности.
+    """
+    loop = asyncio.get_running_loop()
+    denylist = get_token_denylist()
+    await asyncio.gather(
+        _required_step("пул primary", lambda: _warm_up_pool(engine)),
+        _required_step("список отозванных токенов", denylist.loaded.wait),
+        *(
+            _step(f"пул replica{index}", _warm_up_pool(replica_engine))
+            for index, replica_engine in enumerate(replica_engines)
+        ),
+        _step("отставание реплик", replica_router.refresh()),
+        _step("ключи JWT", loop.run_in_executor(None, warm_up_jwt)),
+        _step("пул bcrypt", warm_up_bcrypt_pool()),
+        _step("схема OpenAPI", loop.run_in_executor(None, app.openapi)),
+    )
+    readiness.warmed_up = True
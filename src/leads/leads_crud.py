@@ -0,0 +1,220 @@
+from collections import Counter
+from datetime import date, timezone
+from typing import Sequence
+from uuid import UUID
+
+from sqlalchemy import Row, func, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.leads.leads_models import Lead, LeadStatDaily
+from src.leads.leads_schemas import LeadCreate, LeadStatsGroupBy
+from src.webhooks.webhooks_crud import enqueue_lead_events
+
+
+# asyncpg ограничивает число параметров в одном запросе (32767)
+BULK_INSERT_CHUNK_SIZE = 2000
+
+# Колонки для LeadResponse: списки читаются строками, без создания ORM объектов
+LEAD_RESPONSE_COLUMNS = (
+    Lead.id,
+    Lead.user_id,
+    Lead.chat_id,
+    Lead.message_id,
+    Lead.contact_type,
+    Lead.contact_value,
+    Lead.message_date,
+    Lead.country,
+    Lead.region,
+    Lead.operator,
+    Lead.created_at,
+)
+
+# Поля лида в событии webhook
+_LEAD_EVENT_COLUMNS = (
+    Lead.id,
+    Lead.chat_id,
+    Lead.message_id,
+    Lead.contact_type,
+    Lead.contact_value,
+    Lead.message_date,
+    Lead.country,
+    Lead.region,
+    Lead.operator,
+)
+
+_STATS_COLUMNS = {
+    LeadStatsGroupBy.chat: LeadStatDaily.chat_id,
+    LeadStatsGroupBy.day: LeadStatDaily.day,
+    LeadStatsGroupBy.contact_type: LeadStatDaily.contact_type,
+}
+
+
+async def bulk_create_leads(
+    db: AsyncSession,
+    leads: Sequence[LeadCreate],
+    user_id: UUID | None = None,
+    commit: bool = True
+) -> int:
+    """
+    Пакетная вставка лидов с обновлением статистики в той же транзакции
+
+    Дубликаты (тот же контакт из того же сообщения) пропускаются и в
+    статистику не попадают. Новые лиды пользователя кладутся в outbox его
+    webhook подписок - тоже в этой транзакции. С commit=False транзакцию завершает вызывающий
+    (например, вместе с чекпоинтом загрузки).
+
+    Returns:
+        Количество реально вставленных лидов
+    """
+    if not leads:
+        return 0
+
+    deltas: Counter[tuple[int, date, str]] = Counter()
+    events: list[dict] = []
+
+    for start in range(0, len(leads), BULK_INSERT_CHUNK_SIZE):
+        chunk = leads[start:start + BULK_INSERT_CHUNK_SIZE]
+        stmt = (
+            pg_insert(Lead)
+            .values([
+                {
+                    "user_id": user_id,
+                    "chat_id": lead.chat_id,
+                    "message_id": lead.message_id,
+                    "contact_type": lead.contact_type,
+                    "contact_value": lead.contact_value,
+                    "message_date": lead.message_date,
+                    "country": lead.country,
+                    "region": lead.region,
+                    "operator": lead.operator,
+                }
+                for lead in chunk
+            ])
+            .on_conflict_do_nothing(constraint="uq_leads_message_contact")
+            .returning(*_LEAD_EVENT_COLUMNS)
+        )
+        result = await db.execute(stmt)
+
+        for row in result:
+            day = row.message_date.astimezone(timezone.utc).date()
+            deltas[(row.chat_id, day, row.contact_type)] += 1
+            if user_id is not None:
+                events.append(_lead_event(row))
+
+    if deltas:
+        await _apply_stats_deltas(db, deltas)
+    if events:
+        await enqueue_lead_events(db, user_id, events)
+
+    if commit:
+        await db.commit()
+    return sum(deltas.values())
+
+
+def _lead_event(row: Row) -> dict:
+    event = dict(row._mapping)
+    event["id"] = str(event["id"])
+    event["message_date"] = event["message_date"].isoformat()
+    return event
+
+
+async def _apply_stats_deltas(
+    db: AsyncSession,
+    deltas: Counter[tuple[int, date, str]]
+) -> None:
+    """Применяет дельты к lead_stats_daily одним upsert"""
+    # Сортировка задаёт единый порядок блокировок строк между воркерами
+    stmt = pg_insert(LeadStatDaily).values([
+        {
+            "chat_id": chat_id,
+            "day": day,
+            "contact_type": contact_type,
+            "leads_count": count,
+        }
+        for (chat_id, day, contact_type), count in sorted(deltas.items())
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[
+            LeadStatDaily.chat_id,
+            LeadStatDaily.day,
+            LeadStatDaily.contact_type,
+        ],
+        set_={
+            "leads_count": LeadStatDaily.leads_count + stmt.excluded.leads_count,
+            "updated_at": func.now(),
+        }
+    )
+    await db.execute(stmt)
+
+
+async def get_leads(
+    db: AsyncSession,
+    chat_id: int | None = None,
+    contact_type: str | None = None,
+    skip: int = 0,
+    limit: int = 100
+) -> list[Row]:
+    query = select(*LEAD_RESPONSE_COLUMNS)
+
+    if chat_id is not None:
+        query = query.where(Lead.chat_id == chat_id)
+    if contact_type is not None:
+        query = query.where(Lead.contact_type == contact_type)
+
+    query = query.order_by(Lead.message_date.desc()).offset(skip).limit(limit)
+    result = await db.execute(query)
+    return list(result.all())
+
+
+async def get_lead_stats(
+    db: AsyncSession,
+    group_by: Sequence[LeadStatsGroupBy],
+    chat_id: int | None = None,
+    contact_type: str | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None
+) -> list[dict]:
+    """Агрегаты по предрассчитанной статистике, без сканирования таблицы leads"""
+    columns = [_STATS_COLUMNS[dimension] for dimension in group_by]
+    query = select(*columns, func.coalesce(func.sum(LeadStatDaily.leads_count), 0).label("leads_count"))
+
+    if chat_id is not None:
+        query = query.where(LeadStatDaily.chat_id == chat_id)
+    if contact_type is not None:
+        query = query.where(LeadStatDaily.contact_type == contact_type)
+    if date_from is not None:
+        query = query.where(LeadStatDaily.day >= date_from)
+    if date_to is not None:
+        query = query.where(LeadStatDaily.day <= date_to)
+
+    if columns:
+        query = query.group_by(*columns).order_by(*columns)
+
+    result = await db.execute(query)
+    return [dict(row._mapping) for row in result]
+
+
+async def get_unenriched_phone_leads(
+    db: AsyncSession,
+    after_id: UUID | None,
+    limit: int
+) -> list[Row]:
+    """Следующая пачка телефонов без страны по возрастанию id (keyset-пагинация)"""
+    query = (
+        select(Lead.id, Lead.contact_value)
+        .where(Lead.contact_type == "phone", Lead.country.is_(None))
+        .order_by(Lead.id)
+        .limit(limit)
+    )
+    if after_id is not None:
+        query = query.where(Lead.id > after_id)
+    result = await db.execute(query)
+    return list(result.all())
+
+
+async def update_leads_enrichment(db: AsyncSession, rows: Sequence[dict]) -> None:
+    """Пакетный UPDATE по первичному ключу: rows - словари id, country, region, operator"""
+    if rows:
+        await db.execute(update(Lead), list(rows))
+        await db.commit()
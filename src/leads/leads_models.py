@@ -0,0 +1,43 @@
+from datetime import date, datetime
+from uuid import UUID
+
+from sqlalchemy import BigInteger, Date, DateTime, ForeignKey, Text, UniqueConstraint
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.database.base import Base, BaseModel
+
+
+class Lead(BaseModel):
+    __tablename__ = "leads"
+    __table_args__ = (
+        UniqueConstraint(
+            "chat_id", "message_id", "contact_type", "contact_value",
+            name="uq_leads_message_contact"
+        ),
+    )
+
+    user_id: Mapped[UUID | None] = mapped_column(
+        ForeignKey("users.id", ondelete="SET NULL"),
+        nullable=True
+    )
+    chat_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    message_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    contact_type: Mapped[str] = mapped_column(Text, nullable=False)  # "email" или "phone"
+    contact_value: Mapped[str] = mapped_column(Text, nullable=False)
+    message_date: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    # Обогащение телефонов по таблице нумерации
+    country: Mapped[str | None] = mapped_column(Text, nullable=True)
+    region: Mapped[str | None] = mapped_column(Text, nullable=True)
+    operator: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default="NOW()")
+
+
+class LeadStatDaily(Base):
+    """Счётчик лидов в разрезе чат / день / тип контакта"""
+    __tablename__ = "lead_stats_daily"
+
+    chat_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    contact_type: Mapped[str] = mapped_column(Text, primary_key=True)
+    leads_count: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default="NOW()")
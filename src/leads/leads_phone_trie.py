@@ -0,0 +1,186 @@
+import csv
+import hashlib
+import json
+import logging
+import os
+import struct
+from array import array
+from collections import deque
+from pathlib import Path
+from typing import Iterable, NamedTuple
+
+
+logger = logging.getLogger(__name__)
+
+# Меняется при изменении формата кэша - старые файлы пересобираются
+CACHE_FORMAT_VERSION = 1
+_CACHE_MAGIC = b"PTRIE"
+_HEADER_LENGTH = struct.Struct("<I")
+
+
+class PhoneInfo(NamedTuple):
+    country: str
+    region: str | None
+    operator: str | None
+
+
+class PhonePrefixTrie:
+    """
+    Префиксное дерево по цифрам номера в плоских массивах
+
+    Узлы лежат в порядке обхода в ширину, дети узла - подряд. Для узла
+    хранятся 10-битная маска цифр, у которых есть ребёнок, индекс первого
+    ребёнка и индекс записи (-1, если префикс не задан). Ребёнок по
+    цифре d: first_child + число единиц маски ниже d. Это ~10 байт на
+    узел, а массивы читаются с диска без разбора.
+    """
+
+    def __init__(self, masks: array, first_child: array, values: array, records: list[PhoneInfo]):
+        self.masks = masks
+        self.first_child = first_child
+        self.values = values
+        self.records = records
+
+    @classmethod
+    def build(cls, plan: Iterable[tuple[str, PhoneInfo]]) -> "PhonePrefixTrie":
+        # Сначала словарное дерево, затем раскладка в массивы
+        root: dict = {}
+        records: list[PhoneInfo] = []
+        record_index: dict[PhoneInfo, int] = {}
+
+        for prefix, info in plan:
+            node = root
+            for digit in prefix:
+                node = node.setdefault(int(digit), {})
+            if info not in record_index:
+                record_index[info] = len(records)
+                records.append(info)
+            node[None] = record_index[info]
+
+        masks = array("H")
+        first_child = array("I")
+        values = array("i")
+        queue = deque([root])
+        next_index = 1
+        while queue:
+            node = queue.popleft()
+            digits = sorted(key for key in node if key is not None)
+            mask = 0
+            for digit in digits:
+                mask |= 1 << digit
+                queue.append(node[digit])
+            masks.append(mask)
+            first_child.append(next_index)
+            values.append(node.get(None, -1))
+            next_index += len(digits)
+
+        return cls(masks, first_child, values, records)
+
+    def lookup(self, phone: str) -> PhoneInfo | None:
+        """Самый длинный известный префикс номера (+ и прочие не-цифры пропускаются)"""
+        masks = self.masks
+        node = 0
+        found = self.values[0]
+        for char in phone:
+            if not "0" <= char <= "9":
+                continue
+            mask = masks[node]
+            bit = 1 << (ord(char) - 48)
+            if not mask & bit:
+                break
+            node = self.first_child[node] + (mask & (bit - 1)).bit_count()
+            value = self.values[node]
+            if value >= 0:
+                found = value
+        return self.records[found] if found >= 0 else None
+
+    def lookup_many(self, phones: Iterable[str]) -> list[PhoneInfo | None]:
+        """Пакетный поиск: повторяющиеся номера в пачке ищутся один раз"""
+        cache: dict[str, PhoneInfo | None] = {}
+        results = []
+        for phone in phones:
+            if phone not in cache:
+                cache[phone] = self.lookup(phone)
+            results.append(cache[phone])
+        return results
+
+    def __len__(self) -> int:
+        return len(self.masks)
+
+    def save(self, path: Path, source_hash: str) -> None:
+        header = json.dumps({
+            "version": CACHE_FORMAT_VERSION,
+            "source_hash": source_hash,
+            "nodes": len(self.masks),
+            "records": [list(record) for record in self.records],
+        }, ensure_ascii=False).encode("utf-8")
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp_path, "wb") as cache:
+            cache.write(_CACHE_MAGIC)
+            cache.write(_HEADER_LENGTH.pack(len(header)))
+            cache.write(header)
+            self.masks.tofile(cache)
+            self.first_child.tofile(cache)
+            self.values.tofile(cache)
+        # Атомарная замена: параллельно стартующие процессы не прочитают недописанный файл
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Path, source_hash: str) -> "PhonePrefixTrie | None":
+        """Кэш с диска; None, если его нет или он построен по другой таблице"""
+        try:
+            with open(path, "rb") as cache:
+                if cache.read(len(_CACHE_MAGIC)) != _CACHE_MAGIC:
+                    return None
+                (header_length,) = _HEADER_LENGTH.unpack(cache.read(_HEADER_LENGTH.size))
+                header = json.loads(cache.read(header_length))
+                if header["version"] != CACHE_FORMAT_VERSION or header["source_hash"] != source_hash:
+                    return None
+
+                nodes = header["nodes"]
+                masks, first_child, values = array("H"), array("I"), array("i")
+                masks.fromfile(cache, nodes)
+                first_child.fromfile(cache, nodes)
+                values.fromfile(cache, nodes)
+        except (OSError, EOFError, ValueError, KeyError):
+            return None
+
+        records = [PhoneInfo(*record) for record in header["records"]]
+        return cls(masks, first_child, values, records)
+
+
+def read_numbering_plan(path: Path) -> list[tuple[str, PhoneInfo]]:
+    """CSV с колонками prefix,country,region,operator; prefix - цифры с кодом страны"""
+    plan = []
+    with open(path, encoding="utf-8", newline="") as source:
+        for row in csv.DictReader(source):
+            prefix = row["prefix"].strip().lstrip("+")
+            if not prefix.isdigit():
+                continue
+            plan.append((
+                prefix,
+                PhoneInfo(
+                    row["country"].strip(),
+                    row.get("region", "").strip() or None,
+                    row.get("operator", "").strip() or None,
+                )
+            ))
+    return plan
+
+
+def load_phone_trie(plan_path: Path, cache_path: Path) -> PhonePrefixTrie:
+    """Дерево из кэша, а если таблица изменилась - строит заново и перезаписывает кэш"""
+    source_hash = hashlib.sha256(plan_path.read_bytes()).hexdigest()
+
+    trie = PhonePrefixTrie.load(cache_path, source_hash)
+    if trie is not None:
+        return trie
+
+    trie = PhonePrefixTrie.build(read_numbering_plan(plan_path))
+    try:
+        trie.save(cache_path, source_hash)
+    except OSError:
+        logger.warning("Не удалось сохранить кэш дерева префиксов в %s", cache_path, exc_info=True)
+    return trie
@@ -0,0 +1,49 @@
+from datetime import date
+
+from fastapi import APIRouter, Depends, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth.auth_dependencies import get_current_token_payload
+from src.database.dependencies import get_read_db
+from src.leads.leads_schemas import (
+    LEAD_LIST_ADAPTER,
+    ContactType,
+    LeadResponse,
+    LeadStatsBucket,
+    LeadStatsGroupBy,
+)
+from src.leads.services.lead_service import get_lead_stats_service, list_leads_service
+
+router = APIRouter(
+    prefix="/leads",
+    tags=["leads"],
+    dependencies=[Depends(get_current_token_payload)]
+)
+
+
+@router.get("", response_model=list[LeadResponse])
+async def list_leads(
+    chat_id: int | None = None,
+    contact_type: ContactType | None = None,
+    skip: int = 0,
+    limit: int = Query(100, le=1000),
+    include_archived: bool = Query(False, description="Включить лиды, перенесённые в архив"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    leads = await list_leads_service(db, chat_id, contact_type, skip, limit, include_archived)
+    return Response(content=LEAD_LIST_ADAPTER.dump_json(leads), media_type="application/json")
+
+
+@router.get("/stats", response_model=list[LeadStatsBucket])
+async def get_lead_stats(
+    group_by: list[LeadStatsGroupBy] = Query([LeadStatsGroupBy.day]),
+    chat_id: int | None = None,
+    contact_type: ContactType | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Количество лидов в разрезе чатов, дней и типов контактов"""
+    return await get_lead_stats_service(
+        db, group_by, chat_id, contact_type, date_from, date_to
+    )
@@ -0,0 +1,53 @@
+from datetime import date, datetime
+from enum import Enum
+from typing import Literal
+from uuid import UUID
+
+from pydantic import BaseModel, Field, TypeAdapter
+
+
+ContactType = Literal["email", "phone"]
+
+
+class LeadCreate(BaseModel):
+    chat_id: int
+    message_id: int
+    contact_type: ContactType
+    contact_value: str = Field(..., min_length=1)
+    message_date: datetime
+    country: str | None = None
+    region: str | None = None
+    operator: str | None = None
+
+
+class LeadResponse(BaseModel):
+    id: UUID
+    user_id: UUID | None
+    chat_id: int
+    message_id: int
+    contact_type: str
+    contact_value: str
+    message_date: datetime
+    country: str | None
+    region: str | None
+    operator: str | None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+LEAD_LIST_ADAPTER = TypeAdapter(list[LeadResponse])
+
+
+class LeadStatsGroupBy(str, Enum):
+    chat = "chat"
+    day = "day"
+    contact_type = "contact_type"
+
+
+class LeadStatsBucket(BaseModel):
+    chat_id: int | None = None
+    day: date | None = None
+    contact_type: str | None = None
+    leads_count: int
@@ -0,0 +1,69 @@
+import logging
+from functools import lru_cache
+from pathlib import Path
+from typing import Sequence
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import get_settings
+from src.leads.leads_crud import get_unenriched_phone_leads, update_leads_enrichment
+from src.leads.leads_phone_trie import PhonePrefixTrie, load_phone_trie
+from src.leads.leads_schemas import LeadCreate
+
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+BACKFILL_CHUNK_SIZE = 5000
+
+
+@lru_cache
+def get_phone_trie() -> PhonePrefixTrie:
+    """Дерево префиксов на процесс: с диска из кэша, пересборка только при смене таблицы"""
+    return load_phone_trie(
+        Path(settings.PHONE_NUMBERING_PLAN_PATH),
+        Path(settings.PHONE_TRIE_CACHE_PATH)
+    )
+
+
+def enrich_leads(leads: Sequence[LeadCreate]) -> None:
+    """Заполняет страну, регион и оператора у телефонных лидов пачки"""
+    phones = [lead for lead in leads if lead.contact_type == "phone"]
+    if not phones:
+        return
+
+    for lead, info in zip(phones, get_phone_trie().lookup_many(lead.contact_value for lead in phones)):
+        if info is not None:
+            lead.country, lead.region, lead.operator = info
+
+
+async def backfill_lead_enrichment(db: AsyncSession, chunk_size: int = BACKFILL_CHUNK_SIZE) -> int:
+    """
+    Обогащает уже сохранённые телефоны пачками, каждая пачка - своя транзакция
+
+    Номера без известного префикса остаются с country = NULL; проход
+    по возрастанию id гарантирует, что один запуск конечен.
+
+    Returns:
+        Количество обогащённых лидов
+    """
+    trie = get_phone_trie()
+    after_id = None
+    enriched = 0
+
+    while True:
+        rows = await get_unenriched_phone_leads(db, after_id, chunk_size)
+        if not rows:
+            return enriched
+
+        updates = [
+            {"id": row.id, "country": info.country, "region": info.region, "operator": info.operator}
+            for row, info in zip(rows, trie.lookup_many(row.contact_value for row in rows))
+            if info is not None
+        ]
+        await update_leads_enrichment(db, updates)
+
+        enriched += len(updates)
+        after_id = rows[-1].id
+        logger.info("Обогащение лидов: %s обновлено", enriched)
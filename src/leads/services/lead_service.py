@@ -0,0 +1,88 @@
+import asyncio
+import heapq
+from datetime import date
+
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.archive.archive_service import LEAD_KEY_FIELDS, get_archive_store, read_archived
+from src.leads.leads_crud import get_lead_stats, get_leads
+from src.leads.leads_schemas import (
+    LEAD_LIST_ADAPTER,
+    LeadResponse,
+    LeadStatsBucket,
+    LeadStatsGroupBy,
+)
+
+
+async def list_leads_service(
+    db: AsyncSession,
+    chat_id: int | None = None,
+    contact_type: str | None = None,
+    skip: int = 0,
+    limit: int = 100,
+    include_archived: bool = False
+) -> list[LeadResponse]:
+    """Сервис для получения списка лидов; с include_archived - вместе с архивом"""
+    if not include_archived:
+        rows = await get_leads(db, chat_id, contact_type, skip, limit)
+        return LEAD_LIST_ADAPTER.validate_python(rows, from_attributes=True)
+
+    # Из каждого источника достаточно первых skip + limit, дальше - слияние по дате
+    needed = skip + limit
+    rows = await get_leads(db, chat_id, contact_type, 0, needed)
+    hot = LEAD_LIST_ADAPTER.validate_python(rows, from_attributes=True)
+    archived = LEAD_LIST_ADAPTER.validate_python(
+        await asyncio.get_running_loop().run_in_executor(
+            None, _read_archived_leads, chat_id, contact_type, needed
+        )
+    )
+
+    merged = []
+    seen = set()
+    for lead in heapq.merge(hot, archived, key=lambda lead: lead.message_date, reverse=True):
+        # Во время архивации строка может быть и в таблице, и в архиве
+        key = (lead.chat_id, lead.message_id, lead.contact_type, lead.contact_value)
+        if key not in seen:
+            seen.add(key)
+            merged.append(lead)
+    return merged[skip:skip + limit]
+
+
+def _read_archived_leads(chat_id: int | None, contact_type: str | None, limit: int) -> list[dict]:
+    # Индекс лишь отбирает дни, где встречался чат: в тех же файлах лежат лиды других чатов
+    def predicate(row: dict) -> bool:
+        return (
+            (chat_id is None or row["chat_id"] == chat_id)
+            and (contact_type is None or row["contact_type"] == contact_type)
+        )
+
+    return read_archived(
+        get_archive_store("leads", "chat_id", LEAD_KEY_FIELDS),
+        "message_date",
+        limit,
+        predicate=predicate if chat_id is not None or contact_type is not None else None,
+        index_value=chat_id,
+    )
+
+
+async def get_lead_stats_service(
+    db: AsyncSession,
+    group_by: list[LeadStatsGroupBy],
+    chat_id: int | None = None,
+    contact_type: str | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None
+) -> list[LeadStatsBucket]:
+    """Сервис для получения статистики по лидам"""
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="date_from не может быть позже date_to"
+        )
+
+    # Убираем повторы, сохраняя порядок измерений
+    group_by = list(dict.fromkeys(group_by))
+
+    rows = await get_lead_stats(db, group_by, chat_id, contact_type, date_from, date_to)
+    return [LeadStatsBucket(**row) for row in rows]
@@ -1,22 +1,73 @@
+import asyncio
+
 from fastapi import FastAPI
-from contextlib import asynccontextmanager
+from fastapi.responses import ORJSONResponse
+from contextlib import asynccontextmanager, suppress
 
+from src.auth.auth_revocation import get_token_denylist
 from src.auth.auth_routes import router as auth_router
+from src.config import get_settings
+from src.database.engine import engine, replica_engines
 from src.database.init_db import init_db
+from src.health.health_routes import router as health_router
+from src.health.warmup import readiness, warm_up
+from src.leads.leads_routes import router as leads_router
+from src.metrics.metrics import instrument_engine
+from src.metrics.metrics_middleware import MetricsMiddleware
+from src.metrics.metrics_routes import router as metrics_router
+from src.middleware.load_shedding_middleware import LoadSheddingMiddleware
+from src.middleware.profiling_middleware import ProfilingMiddleware
+from src.parsing.parsing_routes import router as parsing_router
+from src.users.services.password_service import init_bcrypt_rounds
 from src.users.users_routes import router as users_router
+from src.webhooks.webhooks_routes import router as webhooks_router
+
+
+settings = get_settings()
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_db()
+    await init_bcrypt_rounds(
+        settings.BCRYPT_ROUNDS,
+        settings.BCRYPT_AUTO_CALIBRATE,
+        settings.BCRYPT_TARGET_MS
+    )
+    denylist = get_token_denylist()
+    await denylist.start()
+    # Прогрев идёт в фоне: /health/live уже отвечает, /health/ready - после прогрева
+    warmup_task = asyncio.create_task(warm_up(app))
     yield
+    readiness.shutting_down = True
+    warmup_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await warmup_task
+    await denylist.stop()
 
 
 app = FastAPI(
     title="Telegram Leads Collector",
     description="Парсер лидов из Telegram-чатов и каналов",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
+# Профилировщик - самый внутренний слой: ожидание в очереди сброса нагрузки в профиль не попадает
+if settings.PROFILER_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+app.add_middleware(LoadSheddingMiddleware)
+# Добавлен последним - внешний слой, учитывает и ответы 503 от сброса нагрузки
+app.add_middleware(MetricsMiddleware)
+
+instrument_engine(engine)
+for index, replica_engine in enumerate(replica_engines):
+    instrument_engine(replica_engine, f"replica{index}")
+
+app.include_router(health_router)
 app.include_router(auth_router)
 app.include_router(users_router)
+app.include_router(leads_router)
+app.include_router(parsing_router)
+app.include_router(webhooks_router)
+app.include_router(metrics_router)
@@ -0,0 +1,106 @@
+import time
+
+from prometheus_client import REGISTRY, Counter, Gauge, Histogram
+from prometheus_client.core import GaugeMetricFamily
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Длительность обработки HTTP запроса",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Количество обрабатываемых HTTP запросов",
+    ["method"],
+)
+LOAD_SHED_REJECTIONS = Counter(
+    "load_shed_rejections_total",
+    "Запросы, отклонённые сбросом нагрузки",
+    ["route_class"],
+)
+
+DB_QUERY_DURATION = Histogram(
+    "db_query_duration_seconds",
+    "Длительность SQL запроса по типу выражения",
+    ["engine", "statement"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+
+CRYPTO_DURATION = Histogram(
+    "auth_crypto_duration_seconds",
+    "Длительность криптографических операций авторизации",
+    ["operation"],  # bcrypt_hash, bcrypt_verify, jwt_sign, jwt_verify
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Обращения к кэшам",
+    ["cache", "result"],  # result: hit, miss
+)
+
+
+class _PoolCollector:
+    """Состояние пулов соединений всех движков (primary и реплики)"""
+
+    def __init__(self):
+        self.pools = {}
+
+    def collect(self):
+        checked_out = GaugeMetricFamily(
+            "db_pool_connections_checked_out", "Соединения, выданные из пула", labels=["engine"]
+        )
+        size = GaugeMetricFamily("db_pool_size", "Размер пула соединений", labels=["engine"])
+        overflow = GaugeMetricFamily("db_pool_overflow", "Соединения сверх размера пула", labels=["engine"])
+
+        for name, pool in self.pools.items():
+            checked_out.add_metric([name], pool.checkedout())
+            size.add_metric([name], pool.size())
+            overflow.add_metric([name], pool.overflow())
+
+        yield checked_out
+        yield size
+        yield overflow
+
+
+_pool_collector = _PoolCollector()
+REGISTRY.register(_pool_collector)
+
+_STATEMENT_TYPES = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH", "BEGIN", "COMMIT", "ROLLBACK"}
+
+
+def record_cache_access(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.labels(cache, "hit" if hit else "miss").inc()
+
+
+def _statement_type(statement: str) -> str:
+    keyword = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return keyword.lower() if keyword in _STATEMENT_TYPES else "other"
+
+
+def instrument_engine(engine: AsyncEngine, name: str = "primary") -> None:
+    """Подписывает метрики на события движка SQLAlchemy"""
+    sync_engine = engine.sync_engine
+    pool = sync_engine.pool
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info["query_start_time"].pop()
+        DB_QUERY_DURATION.labels(name, _statement_type(statement)).observe(time.perf_counter() - started)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _handle_error(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start_time"):
+            conn.info["query_start_time"].pop()
+
+    if hasattr(pool, "checkedout"):
+        _pool_collector.pools[name] = pool
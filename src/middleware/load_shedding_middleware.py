@@ -0,0 +1,198 @@
+import asyncio
+import json
+import math
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.config import get_settings
+from src.metrics.metrics import LOAD_SHED_REJECTIONS
+
+
+settings = get_settings()
+
+
+@dataclass
+class RouteClass:
+    """
+    Группа маршрутов с общим лимитом одновременных запросов
+
+    Запросы сверх лимита ждут не дольше queue_budget секунд. Если по
+    текущей очереди и среднему времени обслуживания ожидание заведомо
+    превысит бюджет, запрос отклоняется сразу, не занимая очередь.
+    """
+    name: str
+    concurrency: int
+    queue_budget: float
+    semaphore: asyncio.Semaphore = field(init=False)
+    waiting: int = field(default=0, init=False)
+    # Экспоненциальное среднее времени обслуживания запроса, секунды
+    avg_service_time: float = field(default=0.0, init=False)
+
+    def __post_init__(self):
+        self.semaphore = asyncio.Semaphore(self.concurrency)
+
+    def expected_wait(self) -> float:
+        return (self.waiting + 1) / self.concurrency * self.avg_service_time
+
+    def record_service_time(self, duration: float) -> None:
+        if self.avg_service_time == 0.0:
+            self.avg_service_time = duration
+        else:
+            self.avg_service_time = 0.8 * self.avg_service_time + 0.2 * duration
+
+    def retry_after(self) -> int:
+        return max(math.ceil(self.expected_wait()), 1)
+
+
+@dataclass(frozen=True)
+class RouteRule:
+    method: str
+    path: re.Pattern
+    route_class: RouteClass
+    # Дополнительная проверка по телу запроса (например, PATCH только со сменой пароля)
+    body_predicate: Callable[[bytes], bool] | None = None
+
+
+def _has_password(body: bytes) -> bool:
+    try:
+        data = json.loads(body or b"{}")
+    except ValueError:
+        return False
+    return isinstance(data, dict) and data.get("password") is not None
+
+
+def default_rules() -> list[RouteRule]:
+    """Маршруты с вычислением bcrypt"""
+    bcrypt_class = RouteClass(
+        name="bcrypt",
+        concurrency=settings.LOAD_SHED_BCRYPT_CONCURRENCY,
+        queue_budget=settings.LOAD_SHED_BCRYPT_QUEUE_BUDGET_MS / 1000,
+    )
+    # Массовое создание занимает весь отдельный пул bcrypt, поэтому выполняется по одному
+    bcrypt_bulk_class = RouteClass(
+        name="bcrypt_bulk",
+        concurrency=1,
+        queue_budget=settings.LOAD_SHED_BCRYPT_QUEUE_BUDGET_MS / 1000,
+    )
+    return [
+        RouteRule("POST", re.compile(r"^/auth/login$"), bcrypt_class),
+        RouteRule("POST", re.compile(r"^/users/bulk$"), bcrypt_bulk_class),
+        RouteRule("POST", re.compile(r"^/users$"), bcrypt_class),
+        RouteRule("PATCH", re.compile(r"^/users/[^/]+$"), bcrypt_class, _has_password),
+    ]
+
+
+class LoadSheddingMiddleware:
+    """
+    ASGI middleware: ограничивает конкурентность дорогих маршрутов
+    и отвечает 503 с Retry-After, когда очередь не укладывается в бюджет.
+    Остальные маршруты проходят без ограничений.
+    """
+
+    def __init__(self, app: ASGIApp, rules: list[RouteRule] | None = None):
+        self.app = app
+        self.rules = rules if rules is not None else default_rules()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route_class, receive = await self._classify(scope, receive)
+        if route_class is None:
+            await self.app(scope, receive, send)
+            return
+
+        if route_class.expected_wait() > route_class.queue_budget:
+            await self._reject(route_class, send)
+            return
+
+        # acquire выполняется в этой же задаче: wait_for в 3.11 мог потерять разрешение,
+        # если таймаут срабатывал сразу после его получения
+        route_class.waiting += 1
+        acquired = False
+        try:
+            async with asyncio.timeout(route_class.queue_budget):
+                await route_class.semaphore.acquire()
+                acquired = True
+        except TimeoutError:
+            pass
+        except BaseException:
+            # Отмена (например, клиент отключился) уже после получения разрешения
+            if acquired:
+                route_class.semaphore.release()
+            raise
+        finally:
+            route_class.waiting -= 1
+
+        if not acquired:
+            await self._reject(route_class, send)
+            return
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            route_class.semaphore.release()
+            route_class.record_service_time(time.perf_counter() - started)
+
+    async def _classify(self, scope: Scope, receive: Receive) -> tuple[RouteClass | None, Receive]:
+        method = scope["method"]
+        path = scope["path"]
+
+        for rule in self.rules:
+            if rule.method != method or not rule.path.match(path):
+                continue
+
+            if rule.body_predicate is None:
+                return rule.route_class, receive
+
+            body, receive = await _buffer_body(receive)
+            if rule.body_predicate(body):
+                return rule.route_class, receive
+
+        return None, receive
+
+    @staticmethod
+    async def _reject(route_class: RouteClass, send: Send) -> None:
+        LOAD_SHED_REJECTIONS.labels(route_class.name).inc()
+        body = json.dumps(
+            {"detail": "Сервис перегружен, повторите запрос позже"},
+            ensure_ascii=False
+        ).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(route_class.retry_after()).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+async def _buffer_body(receive: Receive) -> tuple[bytes, Receive]:
+    """Читает тело запроса целиком и возвращает receive, который отдаст его повторно"""
+    messages: list[Message] = []
+    chunks: list[bytes] = []
+
+    while True:
+        message = await receive()
+        messages.append(message)
+        if message["type"] != "http.request":
+            break
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            break
+
+    async def replay() -> Message:
+        if messages:
+            return messages.pop(0)
+        return await receive()
+
+    return b"".join(chunks), replay
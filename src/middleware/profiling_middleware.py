@@ -0,0 +1,208 @@
+import asyncio
+import json
+import os
+import random
+import re
+import secrets
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from pathlib import Path
+from types import FrameType
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.config import get_settings
+
+
+settings = get_settings()
+
+PROFILE_HEADER = b"x-profile-token"
+
+# Категории по имени файла; проверяются от самого глубокого кадра к корню
+_LOOP_CATEGORIES = (
+    ("bcrypt", ("bcrypt",)),
+    ("rsa_jwt", ("cryptography", f"{os.sep}jwt{os.sep}")),
+    ("db_driver", ("sqlalchemy", "asyncpg")),
+    ("serialization", ("json", "pydantic", f"fastapi{os.sep}encoders", f"starlette{os.sep}responses")),
+)
+_AWAIT_CATEGORIES = (
+    ("db", ("sqlalchemy", "asyncpg")),
+    ("bcrypt_threadpool", ("password_service",)),
+)
+
+
+def _classify(frames: list[FrameType], categories) -> str:
+    for frame in reversed(frames):
+        filename = frame.f_code.co_filename
+        for category, markers in categories:
+            if any(marker in filename for marker in markers):
+                return category
+    return "other"
+
+
+def _frame_label(frame: FrameType) -> str:
+    return f"{os.path.basename(frame.f_code.co_filename)}:{frame.f_code.co_name}"
+
+
+def _thread_stack(thread_id: int) -> list[FrameType]:
+    """Стек потока от корня к текущему кадру"""
+    frames = []
+    frame = sys._current_frames().get(thread_id)
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    frames.reverse()
+    return frames
+
+
+def _await_chain(task: asyncio.Task) -> list[FrameType]:
+    """Цепочка приостановленных корутин задачи от внешней к той, что ждёт"""
+    frames = []
+    coro = task.get_coro()
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is not None:
+            frames.append(frame)
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    return frames
+
+
+class RequestSampler(threading.Thread):
+    """
+    Сэмплирует выполнение одной задачи asyncio из отдельного потока
+
+    Если в момент сэмпла event loop выполняет эту задачу, снимается стек
+    потока loop (время, когда запрос занимает loop: bcrypt, RSA,
+    сериализация). Иначе записывается цепочка await, на которой задача
+    приостановлена (ожидание БД, пула bcrypt и т.д.).
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, task: asyncio.Task, interval: float):
+        super().__init__(name="request-profiler", daemon=True)
+        self.loop = loop
+        self.task = task
+        self.loop_thread_id = threading.get_ident()
+        self.interval = interval
+        self.stacks: Counter[str] = Counter()
+        self.categories: Counter[str] = Counter()
+        self.samples = 0
+        self._stopped = threading.Event()
+
+    def run(self) -> None:
+        last = time.perf_counter()
+        while not self._stopped.wait(self.interval):
+            now = time.perf_counter()
+            self._sample(now - last)
+            last = now
+
+    def stop(self) -> None:
+        self._stopped.set()
+        self.join()
+
+    def _sample(self, elapsed: float) -> None:
+        try:
+            if asyncio.current_task(self.loop) is self.task:
+                frames = _thread_stack(self.loop_thread_id)
+                category = "loop:" + _classify(frames, _LOOP_CATEGORIES)
+            else:
+                frames = _await_chain(self.task)
+                category = "await:" + _classify(frames, _AWAIT_CATEGORIES)
+        except (RuntimeError, ValueError):
+            # Стек изменился во время обхода - пропускаем сэмпл
+            return
+
+        self.stacks[";".join([category, *(_frame_label(frame) for frame in frames)])] += 1
+        self.categories[category] += elapsed
+        self.samples += 1
+
+
+def _write_profile(
+    output_dir: Path,
+    name: str,
+    sampler: RequestSampler,
+    summary: dict
+) -> None:
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    # Формат collapsed stacks: совместим с flamegraph.pl, speedscope, inferno
+    folded = "\n".join(f"{stack} {count}" for stack, count in sampler.stacks.most_common())
+    (output_dir / f"{name}.folded").write_text(folded + "\n", encoding="utf-8")
+    (output_dir / f"{name}.json").write_text(
+        json.dumps(summary, indent=2, ensure_ascii=False),
+        encoding="utf-8"
+    )
+
+    _enforce_retention(output_dir, settings.PROFILER_MAX_PROFILES)
+
+
+def _enforce_retention(output_dir: Path, max_profiles: int) -> None:
+    """Удаляет самые старые профили сверх лимита"""
+    summaries = sorted(output_dir.glob("*.json"), key=lambda path: path.stat().st_mtime)
+    for summary_path in summaries[:max(len(summaries) - max_profiles, 0)]:
+        summary_path.unlink(missing_ok=True)
+        summary_path.with_suffix(".folded").unlink(missing_ok=True)
+
+
+class ProfilingMiddleware:
+    """
+    ASGI middleware: профилирует долю запросов (PROFILER_SAMPLE_RATE)
+    или отдельный запрос с заголовком X-Profile-Token, равным PROFILER_TOKEN.
+    Профили сохраняются в PROFILER_OUTPUT_DIR, хранится не более
+    PROFILER_MAX_PROFILES последних.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+        self.output_dir = Path(settings.PROFILER_OUTPUT_DIR)
+        self.interval = settings.PROFILER_INTERVAL_MS / 1000
+
+    def _should_profile(self, scope: Scope) -> bool:
+        if settings.PROFILER_TOKEN:
+            for header, value in scope["headers"]:
+                if header == PROFILE_HEADER:
+                    return secrets.compare_digest(value, settings.PROFILER_TOKEN.encode())
+        return random.random() < settings.PROFILER_SAMPLE_RATE
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        loop = asyncio.get_running_loop()
+        sampler = RequestSampler(loop, asyncio.current_task(), self.interval)
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        started_at = datetime.now(timezone.utc)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - started
+            sampler.stop()
+
+            route = re.sub(r"[^A-Za-z0-9]+", "_", scope["path"]).strip("_") or "root"
+            name = f"{started_at.strftime('%Y%m%dT%H%M%S%f')}-{scope['method']}-{route}"[:150]
+            summary = {
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status_code,
+                "started_at": started_at.isoformat(),
+                "duration_ms": round(duration * 1000, 3),
+                "samples": sampler.samples,
+                "interval_ms": settings.PROFILER_INTERVAL_MS,
+                "categories_ms": {
+                    category: round(seconds * 1000, 3)
+                    for category, seconds in sampler.categories.most_common()
+                },
+            }
+            await loop.run_in_executor(None, _write_profile, self.output_dir, name, sampler, summary)
@@ -0,0 +1,218 @@
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import case, func, select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.parsing.parsing_models import ParseJob, ParseJobCheckpoint, UserParseQuota
+
+
+async def get_parse_job(db: AsyncSession, job_id: UUID) -> ParseJob | None:
+    result = await db.execute(select(ParseJob).where(ParseJob.id == job_id))
+    return result.scalar_one_or_none()
+
+
+async def get_user_parse_jobs(
+    db: AsyncSession,
+    user_id: UUID,
+    skip: int = 0,
+    limit: int = 100
+) -> list[ParseJob]:
+    query = (
+        select(ParseJob)
+        .where(ParseJob.user_id == user_id)
+        .order_by(ParseJob.created_at.desc())
+        .offset(skip)
+        .limit(limit)
+    )
+    result = await db.execute(query)
+    return list(result.scalars().all())
+
+
+async def get_user_parse_quota(db: AsyncSession, user_id: UUID) -> UserParseQuota | None:
+    result = await db.execute(select(UserParseQuota).where(UserParseQuota.user_id == user_id))
+    return result.scalar_one_or_none()
+
+
+async def get_user_parse_quotas(
+    db: AsyncSession,
+    user_ids: set[UUID]
+) -> dict[UUID, UserParseQuota]:
+    if not user_ids:
+        return {}
+    result = await db.execute(select(UserParseQuota).where(UserParseQuota.user_id.in_(user_ids)))
+    return {quota.user_id: quota for quota in result.scalars()}
+
+
+async def get_user_daily_messages(db: AsyncSession, user_id: UUID, since: datetime) -> int:
+    """
+    Сколько сообщений пользователь израсходовал из дневной квоты
+
+    Для завершённых задач учитывается фактическое число сообщений,
+    для остальных - оценка, с которой задача была принята.
+    """
+    used = case(
+        (ParseJob.status.in_(("done", "failed")), ParseJob.messages_processed),
+        else_=ParseJob.estimated_messages,
+    )
+    result = await db.execute(
+        select(func.coalesce(func.sum(used), 0))
+        .where(ParseJob.user_id == user_id, ParseJob.created_at >= since)
+    )
+    return int(result.scalar())
+
+
+async def get_user_last_virtual_finish(db: AsyncSession, user_id: UUID) -> float | None:
+    result = await db.execute(
+        select(func.max(ParseJob.virtual_finish))
+        .where(ParseJob.user_id == user_id, ParseJob.status.in_(("queued", "running")))
+    )
+    return result.scalar()
+
+
+async def get_scheduler_virtual_time(db: AsyncSession) -> float:
+    result = await db.execute(text("SELECT virtual_time FROM parse_scheduler_state WHERE id = 1"))
+    return result.scalar() or 0.0
+
+
+async def set_scheduler_virtual_time(db: AsyncSession, virtual_time: float) -> None:
+    await db.execute(
+        text(
+            "UPDATE parse_scheduler_state SET virtual_time = GREATEST(virtual_time, :value) "
+            "WHERE id = 1"
+        ),
+        {"value": virtual_time}
+    )
+
+
+async def get_running_job_counts(db: AsyncSession) -> list[tuple[UUID, bool, int]]:
+    """Количество выполняющихся задач по пользователям и типу задачи"""
+    result = await db.execute(
+        select(ParseJob.user_id, ParseJob.is_interactive, func.count())
+        .where(ParseJob.status == "running")
+        .group_by(ParseJob.user_id, ParseJob.is_interactive)
+    )
+    return [tuple(row) for row in result]
+
+
+async def get_queued_jobs(db: AsyncSession, limit: int) -> list[ParseJob]:
+    """Задачи в очереди: сначала интерактивные, затем по виртуальному времени окончания"""
+    query = (
+        select(ParseJob)
+        .where(ParseJob.status == "queued")
+        .order_by(
+            ParseJob.is_interactive.desc(),
+            ParseJob.virtual_finish,
+            ParseJob.created_at
+        )
+        .limit(limit)
+    )
+    result = await db.execute(query)
+    return list(result.scalars().all())
+
+
+async def create_parse_job(
+    db: AsyncSession,
+    user_id: UUID,
+    chats: list[str],
+    message_limit: int,
+    estimated_messages: int,
+    is_interactive: bool,
+    virtual_start: float,
+    virtual_finish: float
+) -> ParseJob:
+    """Создание задачи парсинга в статусе queued"""
+    job = ParseJob(
+        user_id=user_id,
+        chats=chats,
+        message_limit=message_limit,
+        estimated_messages=estimated_messages,
+        is_interactive=is_interactive,
+        virtual_start=virtual_start,
+        virtual_finish=virtual_finish,
+        status="queued"
+    )
+
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+    return job
+
+
+async def requeue_parse_job(db: AsyncSession, job_id: UUID) -> None:
+    """Возвращает задачу в очередь, если её не удалось передать воркерам"""
+    await db.execute(
+        update(ParseJob)
+        .where(ParseJob.id == job_id, ParseJob.status == "running")
+        .values(status="queued", started_at=None)
+    )
+    await db.commit()
+
+
+async def requeue_stale_parse_jobs(db: AsyncSession, started_before: datetime) -> list[UUID]:
+    """Возвращает в очередь задачи, выполняющиеся с момента раньше started_before"""
+    result = await db.execute(
+        update(ParseJob)
+        .where(ParseJob.status == "running", ParseJob.started_at < started_before)
+        .values(status="queued", started_at=None)
+        .returning(ParseJob.id)
+    )
+    job_ids = list(result.scalars())
+    await db.commit()
+    return job_ids
+
+
+async def finish_parse_job(
+    db: AsyncSession,
+    job: ParseJob,
+    messages_processed: int,
+    leads_found: int,
+    error: str | None = None
+) -> ParseJob:
+    job.status = "failed" if error else "done"
+    job.messages_processed = messages_processed
+    job.leads_found = leads_found
+    job.error = error
+    job.finished_at = func.now()
+
+    await db.commit()
+    await db.refresh(job)
+    return job
+
+
+async def get_parse_job_checkpoints(db: AsyncSession, job_id: UUID) -> dict[str, ParseJobCheckpoint]:
+    result = await db.execute(select(ParseJobCheckpoint).where(ParseJobCheckpoint.job_id == job_id))
+    return {checkpoint.chat: checkpoint for checkpoint in result.scalars()}
+
+
+async def save_parse_job_checkpoint(
+    db: AsyncSession,
+    job_id: UUID,
+    chat: str,
+    offset_id: int,
+    messages_processed: int,
+    leads_found: int,
+    completed: bool = False
+) -> None:
+    """Upsert прогресса по чату; коммит - вместе с пачкой лидов у вызывающего"""
+    stmt = pg_insert(ParseJobCheckpoint).values(
+        job_id=job_id,
+        chat=chat,
+        offset_id=offset_id,
+        messages_processed=messages_processed,
+        leads_found=leads_found,
+        completed=completed,
+    )
+    await db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=[ParseJobCheckpoint.job_id, ParseJobCheckpoint.chat],
+            set_={
+                "offset_id": stmt.excluded.offset_id,
+                "messages_processed": stmt.excluded.messages_processed,
+                "leads_found": stmt.excluded.leads_found,
+                "completed": stmt.excluded.completed,
+                "updated_at": func.now(),
+            }
+        )
+    )
@@ -0,0 +1,60 @@
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import BigInteger, Boolean, DateTime, Float, ForeignKey, Integer, Text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.database.base import Base, BaseModel
+
+
+class ParseJob(BaseModel):
+    __tablename__ = "parse_jobs"
+
+    user_id: Mapped[UUID] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"),
+        nullable=False
+    )
+    chats: Mapped[list[str]] = mapped_column(ARRAY(Text), nullable=False)
+    message_limit: Mapped[int] = mapped_column(Integer, nullable=False)
+    estimated_messages: Mapped[int] = mapped_column(Integer, nullable=False)
+    is_interactive: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    # Виртуальное время взвешенной справедливой очереди
+    virtual_start: Mapped[float] = mapped_column(Float, nullable=False)
+    virtual_finish: Mapped[float] = mapped_column(Float, nullable=False)
+    status: Mapped[str] = mapped_column(Text, nullable=False, default="queued")  # queued, running, done, failed
+    messages_processed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    leads_found: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    error: Mapped[str | None] = mapped_column(Text, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default="NOW()")
+    started_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class UserParseQuota(Base):
+    __tablename__ = "user_parse_quotas"
+
+    user_id: Mapped[UUID] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    weight: Mapped[float] = mapped_column(Float, nullable=False, default=1.0)
+    max_concurrent_jobs: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    daily_message_quota: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default="NOW()")
+
+
+class ParseJobCheckpoint(Base):
+    """Прогресс задачи по чату: сообщения с id < offset_id ещё не прочитаны (0 - чтение не начато)"""
+    __tablename__ = "parse_job_checkpoints"
+
+    job_id: Mapped[UUID] = mapped_column(
+        ForeignKey("parse_jobs.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    chat: Mapped[str] = mapped_column(Text, primary_key=True)
+    offset_id: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    messages_processed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    leads_found: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    completed: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default="NOW()")
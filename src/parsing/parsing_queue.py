@@ -0,0 +1,25 @@
+from arq import create_pool
+from arq.connections import ArqRedis, RedisSettings
+
+from src.config import get_settings
+
+
+settings = get_settings()
+
+_queue: ArqRedis | None = None
+
+
+def get_redis_settings() -> RedisSettings:
+    return RedisSettings(
+        host=settings.REDIS_HOST,
+        port=int(settings.REDIS_PORT),
+        password=settings.REDIS_PASSWORD
+    )
+
+
+async def get_parse_queue() -> ArqRedis:
+    """Dependency: пул подключений к очереди arq (создаётся один раз на процесс)"""
+    global _queue
+    if _queue is None:
+        _queue = await create_pool(get_redis_settings())
+    return _queue
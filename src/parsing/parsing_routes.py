@@ -0,0 +1,50 @@
+from uuid import UUID
+
+from arq.connections import ArqRedis
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth.auth_dependencies import get_current_user_id
+from src.database.dependencies import get_db
+from src.parsing.parsing_crud import get_parse_job, get_user_parse_jobs
+from src.parsing.parsing_queue import get_parse_queue
+from src.parsing.parsing_schemas import ParseJobCreate, ParseJobResponse
+from src.parsing.services.scheduler_service import submit_parse_job_service
+
+router = APIRouter(prefix="/parsing", tags=["parsing"])
+
+
+@router.post("/jobs", response_model=ParseJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_parse_job(
+    job_data: ParseJobCreate,
+    user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db),
+    queue: ArqRedis = Depends(get_parse_queue)
+):
+    """Постановка задачи парсинга в справедливую очередь"""
+    return await submit_parse_job_service(db, user_id, job_data, queue)
+
+
+@router.get("/jobs", response_model=list[ParseJobResponse])
+async def list_parse_jobs(
+    skip: int = 0,
+    limit: int = 100,
+    user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    return await get_user_parse_jobs(db, user_id, skip, limit)
+
+
+@router.get("/jobs/{job_id}", response_model=ParseJobResponse)
+async def get_parse_job_status(
+    job_id: UUID,
+    user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    job = await get_parse_job(db, job_id)
+    if job is None or job.user_id != user_id:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Задача не найдена"
+        )
+    return job
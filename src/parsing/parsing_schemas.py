@@ -0,0 +1,28 @@
+from datetime import datetime
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+
+class ParseJobCreate(BaseModel):
+    chats: list[str] = Field(..., min_length=1, max_length=50, description="Username или ссылки на чаты")
+    message_limit: int = Field(1000, ge=1, le=100_000, description="Максимум сообщений на чат")
+
+
+class ParseJobResponse(BaseModel):
+    id: UUID
+    user_id: UUID
+    chats: list[str]
+    message_limit: int
+    estimated_messages: int
+    is_interactive: bool
+    status: str
+    messages_processed: int
+    leads_found: int
+    error: str | None
+    created_at: datetime
+    started_at: datetime | None
+    finished_at: datetime | None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,202 @@
+import asyncio
+import json
+import random
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from pathlib import Path
+from typing import Any, AsyncIterator, NamedTuple
+
+from telethon import TelegramClient
+from telethon.errors import FloodWaitError
+
+
+class SourceMessage(NamedTuple):
+    chat_id: int
+    id: int
+    date: datetime
+    text: str | None
+
+
+class MessageSource(ABC):
+    """
+    Источник сообщений для загрузки лидов
+
+    Сообщения отдаются от новых к старым, как в Telegram. offset_id -
+    исключающая верхняя граница id (0 - с самого нового сообщения).
+    Ошибки источника (FloodWaitError, ConnectionError) обрабатывает
+    вызывающий код: после reconnect() чтение продолжается с offset_id.
+    """
+
+    @abstractmethod
+    async def connect(self) -> None:
+        ...
+
+    @abstractmethod
+    async def disconnect(self) -> None:
+        ...
+
+    async def reconnect(self) -> None:
+        await self.disconnect()
+        await self.connect()
+
+    @abstractmethod
+    async def resolve_chat(self, chat: str) -> Any:
+        """Объект чата, который принимает iter_messages"""
+
+    @abstractmethod
+    def iter_messages(self, chat: Any, limit: int, offset_id: int = 0) -> AsyncIterator[SourceMessage]:
+        ...
+
+
+class TelethonMessageSource(MessageSource):
+    def __init__(self, client: TelegramClient):
+        self.client = client
+
+    async def connect(self) -> None:
+        await self.client.connect()
+
+    async def disconnect(self) -> None:
+        await self.client.disconnect()
+
+    async def resolve_chat(self, chat: str) -> Any:
+        return await self.client.get_entity(chat)
+
+    async def iter_messages(self, chat: Any, limit: int, offset_id: int = 0) -> AsyncIterator[SourceMessage]:
+        async for message in self.client.iter_messages(chat, limit=limit, offset_id=offset_id):
+            yield SourceMessage(message.chat_id, message.id, message.date, message.message)
+
+
+def _message_to_json(message: SourceMessage) -> str:
+    return json.dumps(
+        {
+            "chat_id": message.chat_id,
+            "id": message.id,
+            "date": message.date.isoformat(),
+            "text": message.text,
+        },
+        ensure_ascii=False
+    )
+
+
+def _message_from_json(line: str) -> SourceMessage:
+    data = json.loads(line)
+    return SourceMessage(data["chat_id"], data["id"], datetime.fromisoformat(data["date"]), data["text"])
+
+
+def corpus_path(directory: Path, chat: str) -> Path:
+    """Файл корпуса чата: <directory>/<chat>.jsonl, по одному сообщению в строке"""
+    return directory / f"{chat.lstrip('@').replace('/', '_')}.jsonl"
+
+
+def read_corpus(directory: Path, chat: str) -> list[SourceMessage]:
+    path = corpus_path(directory, chat)
+    if not path.exists():
+        raise ValueError(f"Нет корпуса для чата {chat}: {path}")
+    with open(path, encoding="utf-8") as corpus:
+        return [_message_from_json(line) for line in corpus if line.strip()]
+
+
+def write_corpus(directory: Path, chat: str, messages: list[SourceMessage]) -> Path:
+    directory.mkdir(parents=True, exist_ok=True)
+    path = corpus_path(directory, chat)
+    with open(path, "w", encoding="utf-8") as corpus:
+        for message in messages:
+            corpus.write(_message_to_json(message) + "\n")
+    return path
+
+
+class ReplayMessageSource(MessageSource):
+    """
+    Воспроизведение записанного или синтетического корпуса из файлов
+
+    Имитирует Telegram: сообщения отдаются страницами по page_size, не
+    быстрее rate сообщений в секунду (0 - без ограничения). На каждой
+    странице с заданной вероятностью выбрасывается FloodWaitError или
+    происходит обрыв соединения: до reconnect() все вызовы падают с
+    ConnectionError. seed делает последовательность сбоев воспроизводимой.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        rate: float = 0.0,
+        page_size: int = 100,
+        flood_wait_rate: float = 0.0,
+        flood_wait_seconds: int = 1,
+        disconnect_rate: float = 0.0,
+        seed: int | None = None
+    ):
+        self.directory = Path(directory)
+        self.rate = rate
+        self.page_size = page_size
+        self.flood_wait_rate = flood_wait_rate
+        self.flood_wait_seconds = flood_wait_seconds
+        self.disconnect_rate = disconnect_rate
+        self._random = random.Random(seed)
+        self._corpora: dict[str, list[SourceMessage]] = {}
+        self._connected = False
+        # Счётчики внесённых сбоев - для бенчмарков и проверок
+        self.flood_waits = 0
+        self.disconnects = 0
+
+    async def connect(self) -> None:
+        self._connected = True
+
+    async def disconnect(self) -> None:
+        self._connected = False
+
+    def _ensure_connected(self) -> None:
+        if not self._connected:
+            raise ConnectionError("Источник сообщений отключён")
+
+    async def resolve_chat(self, chat: str) -> str:
+        self._ensure_connected()
+        if chat not in self._corpora:
+            messages = read_corpus(self.directory, chat)
+            messages.sort(key=lambda message: message.id, reverse=True)
+            self._corpora[chat] = messages
+        return chat
+
+    def _inject_faults(self) -> None:
+        if self._random.random() < self.disconnect_rate:
+            self.disconnects += 1
+            self._connected = False
+            raise ConnectionError("Соединение разорвано (имитация)")
+        if self._random.random() < self.flood_wait_rate:
+            self.flood_waits += 1
+            raise FloodWaitError(request=None, capture=self.flood_wait_seconds)
+
+    async def iter_messages(self, chat: str, limit: int, offset_id: int = 0) -> AsyncIterator[SourceMessage]:
+        messages = self._corpora[chat]
+        # Корпус отсортирован по убыванию id: первая позиция с id < offset_id
+        start = 0
+        if offset_id:
+            low, high = 0, len(messages)
+            while low < high:
+                middle = (low + high) // 2
+                if messages[middle].id >= offset_id:
+                    low = middle + 1
+                else:
+                    high = middle
+            start = low
+
+        end = min(start + limit, len(messages))
+        started = time.monotonic()
+        sent = 0
+        for page_start in range(start, end, self.page_size):
+            self._ensure_connected()
+            self._inject_faults()
+
+            page = messages[page_start:min(page_start + self.page_size, end)]
+            if self.rate > 0:
+                # Страница отдаётся не раньше, чем позволяет заданная скорость
+                delay = started + (sent + len(page)) / self.rate - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            else:
+                await asyncio.sleep(0)
+
+            for message in page:
+                yield message
+            sent += len(page)
@@ -0,0 +1,141 @@
+import time
+from uuid import UUID
+
+from arq import cron
+from telethon import TelegramClient
+from telethon.sessions import StringSession
+
+from src.archive.archive_service import run_retention
+from src.config import get_settings
+from src.database.engine import async_session
+from src.leads.services.enrichment_service import get_phone_trie
+from src.parsing.parsing_crud import (
+    finish_parse_job,
+    get_parse_job,
+    get_parse_job_checkpoints,
+    requeue_parse_job,
+)
+from src.parsing.parsing_queue import get_redis_settings
+from src.parsing.parsing_sources import MessageSource, ReplayMessageSource, TelethonMessageSource
+from src.parsing.services.ingestion_service import ingest_chat
+from src.parsing.services.scheduler_service import dispatch_parse_jobs, reclaim_stale_parse_jobs
+
+
+settings = get_settings()
+
+
+async def run_parse_job(ctx: dict, job_id: str) -> None:
+    """Выполняет задачу парсинга и освобождает её слот в планировщике"""
+    source: MessageSource = ctx["message_source"]
+    processed = 0
+    found = 0
+    error = None
+    started = time.monotonic()
+
+    async with async_session() as db:
+        job = await get_parse_job(db, UUID(job_id))
+        if job is None or job.status != "running":
+            return
+
+        # Если задачу уже начинали (прерванную задачу вернули в очередь), чаты продолжаются с чекпоинтов
+        checkpoints = await get_parse_job_checkpoints(db, job.id)
+
+        try:
+            for chat in job.chats:
+                chat_processed, chat_found = await ingest_chat(
+                    db, source, chat, job.message_limit, job.user_id,
+                    job_id=job.id,
+                    checkpoint=checkpoints.get(chat)
+                )
+                processed += chat_processed
+                found += chat_found
+        except Exception as e:
+            await db.rollback()
+            error = str(e) or e.__class__.__name__
+        except BaseException as e:
+            # CancelledError: без завершения задача навсегда заняла бы слот в планировщике
+            await db.rollback()
+            if time.monotonic() - started >= settings.PARSE_JOB_TIMEOUT_SECONDS:
+                await finish_parse_job(db, job, processed, found, f"Превышен таймаут задачи: {e.__class__.__name__}")
+                await dispatch_parse_jobs(db, ctx["redis"])
+            else:
+                # Остановка воркера: задача возвращается в очередь и продолжится с чекпоинтов
+                await requeue_parse_job(db, UUID(job_id))
+            raise
+
+        await finish_parse_job(db, job, processed, found, error)
+        await dispatch_parse_jobs(db, ctx["redis"])
+
+
+async def dispatch_tick(ctx: dict) -> None:
+    """Страховочная периодическая диспетчеризация; заодно возвращает в очередь потерянные задачи"""
+    async with async_session() as db:
+        await reclaim_stale_parse_jobs(db)
+        await dispatch_parse_jobs(db, ctx["redis"])
+
+
+def create_telethon_source() -> TelethonMessageSource:
+    """Источник из Telegram независимо от PARSE_MESSAGE_SOURCE"""
+    if not (settings.API_ID and settings.API_HASH and settings.TELEGRAM_SESSION):
+        raise RuntimeError("Для парсинга задайте API_ID, API_HASH и TELEGRAM_SESSION")
+
+    return TelethonMessageSource(TelegramClient(
+        StringSession(settings.TELEGRAM_SESSION),
+        settings.API_ID,
+        settings.API_HASH
+    ))
+
+
+def create_message_source() -> MessageSource:
+    """Источник сообщений по PARSE_MESSAGE_SOURCE"""
+    if settings.PARSE_MESSAGE_SOURCE == "replay":
+        if not settings.PARSE_REPLAY_DIR:
+            raise RuntimeError("Для PARSE_MESSAGE_SOURCE=replay задайте PARSE_REPLAY_DIR")
+        return ReplayMessageSource(
+            settings.PARSE_REPLAY_DIR,
+            rate=settings.PARSE_REPLAY_RATE,
+            flood_wait_rate=settings.PARSE_REPLAY_FLOOD_WAIT_RATE,
+            flood_wait_seconds=settings.PARSE_REPLAY_FLOOD_WAIT_SECONDS,
+            disconnect_rate=settings.PARSE_REPLAY_DISCONNECT_RATE,
+        )
+
+    if settings.PARSE_MESSAGE_SOURCE != "telethon":
+        raise RuntimeError(f"Неизвестный PARSE_MESSAGE_SOURCE: {settings.PARSE_MESSAGE_SOURCE}")
+    return create_telethon_source()
+
+
+async def archive_tick(ctx: dict) -> None:
+    """Ежесуточный перенос устаревших строк в холодный архив"""
+    async with async_session() as db:
+        await run_retention(db)
+
+
+async def startup(ctx: dict) -> None:
+    # Дерево префиксов грузится (или строится и кэшируется на диск) до первой задачи
+    get_phone_trie()
+    source = create_message_source()
+    await source.connect()
+    ctx["message_source"] = source
+
+
+async def shutdown(ctx: dict) -> None:
+    source: MessageSource | None = ctx.get("message_source")
+    if source is not None:
+        await source.disconnect()
+
+
+class WorkerSettings:
+    """Запуск: arq src.parsing.parsing_worker.WorkerSettings"""
+    functions = [run_parse_job]
+    cron_jobs = [
+        cron(dispatch_tick, second={0, 15, 30, 45}, run_at_startup=True),
+        # Архивация в часы наименьшей нагрузки; длинная, поэтому с отдельным таймаутом
+        cron(archive_tick, hour={3}, minute={0}, second={0}, timeout=6 * 60 * 60),
+    ]
+    on_startup = startup
+    on_shutdown = shutdown
+    redis_settings = get_redis_settings()
+    max_jobs = settings.PARSE_MAX_RUNNING_JOBS
+    # Задачи длинные: повтор по таймауту устроил бы двойной парсинг
+    job_timeout = settings.PARSE_JOB_TIMEOUT_SECONDS
+    max_tries = 1
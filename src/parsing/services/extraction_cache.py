@@ -0,0 +1,131 @@
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from typing import Sequence
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from src.config import get_settings
+from src.database.redis import get_redis
+from src.metrics.metrics import record_cache_access
+from src.parsing.services.extraction_service import extract_contacts
+
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# v2: ключ - хэш исходного текста (раньше - нормализованного)
+REDIS_KEY_PREFIX = "extract:v2:"
+
+Contacts = list[tuple[str, str]]
+
+
+def content_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class ExtractionCache:
+    """
+    Кэш результатов извлечения контактов по хэшу текста
+
+    Ключ - хэш ровно того текста, который разбирается регулярными
+    выражениями: пробелы и переносы влияют на найденные номера, поэтому
+    тексты, различающиеся только ими, кэшируются отдельно.
+
+    Локальный LRU на max_size записей и, если передан redis, общий для
+    всех воркеров слой с TTL. Кэшируются только контакты: чат и
+    сообщение каждого вхождения подставляет вызывающий код.
+    """
+
+    def __init__(self, max_size: int, redis: Redis | None = None, redis_ttl: int = 86400):
+        self.max_size = max_size
+        self.redis = redis
+        self.redis_ttl = redis_ttl
+        self._local: OrderedDict[str, Contacts] = OrderedDict()
+
+    def _get_local(self, key: str) -> Contacts | None:
+        contacts = self._local.get(key)
+        if contacts is not None:
+            self._local.move_to_end(key)
+        return contacts
+
+    def _put_local(self, key: str, contacts: Contacts) -> None:
+        self._local[key] = contacts
+        self._local.move_to_end(key)
+        if len(self._local) > self.max_size:
+            self._local.popitem(last=False)
+
+    async def extract_many(self, texts: Sequence[str]) -> list[Contacts]:
+        """Контакты для каждого текста; одинаковые тексты в пачке и в кэше не разбираются повторно"""
+        keys = []
+        text_by_key: dict[str, str] = {}
+        results: dict[str, Contacts] = {}
+
+        for text in texts:
+            key = content_hash(text)
+            keys.append(key)
+            if key in results or key in text_by_key:
+                continue
+
+            contacts = self._get_local(key)
+            record_cache_access("extraction_local", contacts is not None)
+            if contacts is not None:
+                results[key] = contacts
+            else:
+                text_by_key[key] = text
+
+        if text_by_key and self.redis is not None:
+            results.update(await self._get_shared(list(text_by_key)))
+            for key in results:
+                text_by_key.pop(key, None)
+
+        computed = {key: extract_contacts(text) for key, text in text_by_key.items()}
+        results.update(computed)
+        if computed and self.redis is not None:
+            await self._put_shared(computed)
+
+        for key in computed:
+            self._put_local(key, computed[key])
+        return [results[key] for key in keys]
+
+    async def _get_shared(self, keys: list[str]) -> dict[str, Contacts]:
+        try:
+            values = await self.redis.mget([REDIS_KEY_PREFIX + key for key in keys])
+        except RedisError:
+            logger.warning("Redis недоступен, общий кэш извлечения пропущен", exc_info=True)
+            return {}
+
+        found = {}
+        for key, value in zip(keys, values):
+            record_cache_access("extraction_redis", value is not None)
+            if value is not None:
+                contacts = [tuple(contact) for contact in json.loads(value)]
+                found[key] = contacts
+                self._put_local(key, contacts)
+        return found
+
+    async def _put_shared(self, computed: dict[str, Contacts]) -> None:
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for key, contacts in computed.items():
+                    pipe.set(REDIS_KEY_PREFIX + key, json.dumps(contacts, ensure_ascii=False), ex=self.redis_ttl)
+                await pipe.execute()
+        except RedisError:
+            logger.warning("Redis недоступен, результаты извлечения не сохранены в общий кэш", exc_info=True)
+
+
+_cache: ExtractionCache | None = None
+
+
+def get_extraction_cache() -> ExtractionCache:
+    global _cache
+    if _cache is None:
+        _cache = ExtractionCache(
+            max_size=settings.EXTRACTION_CACHE_SIZE,
+            redis=get_redis() if settings.EXTRACTION_CACHE_SHARED else None,
+            redis_ttl=settings.EXTRACTION_CACHE_TTL_SECONDS,
+        )
+    return _cache
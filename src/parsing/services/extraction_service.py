@@ -0,0 +1,73 @@
+import re
+from datetime import datetime
+
+from src.leads.leads_schemas import LeadCreate
+
+
+EMAIL_RE = re.compile(r"[A-Za-z0-9._%+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)*\.[A-Za-z]{2,}")
+PHONE_RE = re.compile(r"(?<![\d\w])\+?\d[\d\s().-]{8,18}\d(?!\d)")
+_NON_DIGITS_RE = re.compile(r"\D")
+
+
+def normalize_email(raw: str) -> str:
+    return raw.strip(".").lower()
+
+
+def normalize_phone(raw: str) -> str | None:
+    """Приводит телефон к виду +<код страны><номер>, None если это не телефон"""
+    digits = _NON_DIGITS_RE.sub("", raw)
+
+    # Российские номера часто пишут через 8 или без кода страны
+    if len(digits) == 11 and digits.startswith("8"):
+        digits = "7" + digits[1:]
+    elif len(digits) == 10 and digits.startswith("9"):
+        digits = "7" + digits
+
+    if not 11 <= len(digits) <= 15:
+        return None
+
+    return "+" + digits
+
+
+def extract_contacts(text: str) -> list[tuple[str, str]]:
+    """Извлекает уникальные контакты из текста в виде (тип, значение)"""
+    contacts: dict[tuple[str, str], None] = {}
+
+    for match in EMAIL_RE.finditer(text):
+        contacts[("email", normalize_email(match.group()))] = None
+
+    for match in PHONE_RE.finditer(text):
+        phone = normalize_phone(match.group())
+        if phone:
+            contacts[("phone", phone)] = None
+
+    return list(contacts)
+
+
+def extract_leads(
+    chat_id: int,
+    message_id: int,
+    message_date: datetime,
+    text: str
+) -> list[LeadCreate]:
+    """Извлекает лиды из текста одного сообщения"""
+    return leads_from_contacts(chat_id, message_id, message_date, extract_contacts(text))
+
+
+def leads_from_contacts(
+    chat_id: int,
+    message_id: int,
+    message_date: datetime,
+    contacts: list[tuple[str, str]]
+) -> list[LeadCreate]:
+    """Лиды конкретного сообщения из уже извлечённых контактов (например, из кэша)"""
+    return [
+        LeadCreate(
+            chat_id=chat_id,
+            message_id=message_id,
+            contact_type=contact_type,
+            contact_value=contact_value,
+            message_date=message_date,
+        )
+        for contact_type, contact_value in contacts
+    ]
@@ -0,0 +1,133 @@
+import asyncio
+import logging
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from telethon.errors import FloodWaitError
+
+from src.archive.archive_service import retention_cutoff
+from src.config import get_settings
+from src.leads.leads_crud import bulk_create_leads
+from src.leads.leads_schemas import LeadCreate
+from src.leads.services.enrichment_service import enrich_leads
+from src.parsing.parsing_crud import save_parse_job_checkpoint
+from src.parsing.parsing_models import ParseJobCheckpoint
+from src.parsing.parsing_sources import MessageSource, SourceMessage
+from src.parsing.services.extraction_cache import get_extraction_cache
+from src.parsing.services.extraction_service import leads_from_contacts
+
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# Размер пачки лидов для одной транзакции bulk-вставки
+INGEST_BATCH_SIZE = 500
+# Чекпоинт сохраняется не реже, чем раз в столько сообщений, даже без лидов
+INGEST_CHECKPOINT_MESSAGES = 2000
+RECONNECT_BASE_DELAY_SECONDS = 1.0
+# Сообщения извлекаются пачками: один запрос в общий кэш на пачку
+EXTRACT_CHUNK_SIZE = 100
+
+
+async def ingest_chat(
+    db: AsyncSession,
+    source: MessageSource,
+    chat: str,
+    message_limit: int,
+    user_id: UUID | None = None,
+    job_id: UUID | None = None,
+    checkpoint: ParseJobCheckpoint | None = None
+) -> tuple[int, int]:
+    """
+    Читает последние сообщения чата и сохраняет найденные лиды
+
+    Если задан job_id, прогресс сохраняется в parse_job_checkpoints в
+    одной транзакции с каждой пачкой лидов, а чтение продолжается с
+    checkpoint. FloodWaitError и обрывы соединения переживаются внутри:
+    после ожидания или переподключения чтение продолжается с последнего
+    прочитанного сообщения.
+
+    Сообщения старше срока хранения лидов не читаются: их лиды уже могли
+    уйти в архив, и повторная вставка прошла бы мимо уникального ключа.
+    Сообщения идут от новых к старым, поэтому чтение на первом таком
+    сообщении заканчивается.
+
+    Returns:
+        (число обработанных сообщений, число новых лидов) с учётом checkpoint
+    """
+    if checkpoint is not None and checkpoint.completed:
+        return checkpoint.messages_processed, checkpoint.leads_found
+
+    # id последнего прочитанного сообщения; в БД попадает только вместе с его лидами
+    offset_id = checkpoint.offset_id if checkpoint else 0
+    processed = checkpoint.messages_processed if checkpoint else 0
+    found = checkpoint.leads_found if checkpoint else 0
+    unflushed = 0
+    pending: list[SourceMessage] = []
+    batch: list[LeadCreate] = []
+    reconnects = 0
+    extraction_cache = get_extraction_cache()
+
+    async def extract_pending() -> None:
+        nonlocal pending
+        # Повторяющиеся тексты (репосты) берутся из кэша, лиды привязываются к каждому сообщению
+        contacts = await extraction_cache.extract_many([message.text for message in pending])
+        for message, message_contacts in zip(pending, contacts):
+            batch.extend(leads_from_contacts(message.chat_id, message.id, message.date, message_contacts))
+        pending = []
+
+    async def flush(completed: bool = False) -> None:
+        nonlocal batch, found, unflushed
+        await extract_pending()
+        enrich_leads(batch)
+        inserted = await bulk_create_leads(db, batch, user_id, commit=False)
+        if job_id is not None:
+            await save_parse_job_checkpoint(
+                db, job_id, chat, offset_id, processed, found + inserted, completed
+            )
+        # Лиды и чекпоинт - одна транзакция: после сбоя нет ни пропусков, ни двойного счёта
+        await db.commit()
+        found += inserted
+        batch = []
+        unflushed = 0
+
+    entity = None
+    while True:
+        try:
+            if entity is None:
+                entity = await source.resolve_chat(chat)
+
+            async for message in source.iter_messages(entity, message_limit - processed, offset_id):
+                # Граница считается на каждое сообщение: архивация могла пройти во время чтения
+                cutoff = retention_cutoff(settings.LEADS_RETENTION_DAYS)
+                if cutoff is not None and message.date < cutoff:
+                    break
+                processed += 1
+                unflushed += 1
+                offset_id = message.id
+                # Считаем только обрывы подряд, без прогресса между ними
+                reconnects = 0
+                if message.text:
+                    pending.append(message)
+                    if len(pending) >= EXTRACT_CHUNK_SIZE:
+                        await extract_pending()
+
+                if len(batch) >= INGEST_BATCH_SIZE or unflushed >= INGEST_CHECKPOINT_MESSAGES:
+                    await flush()
+            break
+        except FloodWaitError as e:
+            if e.seconds > settings.PARSE_MAX_FLOOD_WAIT_SECONDS:
+                raise
+            logger.info("FloodWait %s с на чате %s, продолжаем с id < %s", e.seconds, chat, offset_id)
+            await asyncio.sleep(e.seconds)
+        except ConnectionError:
+            reconnects += 1
+            if reconnects > settings.PARSE_MAX_RECONNECTS:
+                raise
+            logger.warning("Обрыв соединения на чате %s, переподключение %s", chat, reconnects)
+            await asyncio.sleep(RECONNECT_BASE_DELAY_SECONDS * 2 ** (reconnects - 1))
+            await source.reconnect()
+
+    await flush(completed=True)
+    return processed, found
@@ -0,0 +1,260 @@
+"""
+Планировщик задач парсинга перед очередью arq
+
+Задачи ставятся в очередь по схеме взвешенной справедливой очереди (WFQ):
+каждой задаче при постановке назначается виртуальное время окончания
+start + стоимость / вес пользователя, где start - максимум из системного
+виртуального времени и окончания последней задачи того же пользователя.
+Воркерам передаются задачи с наименьшим виртуальным временем окончания,
+поэтому большой бэкфилл одного пользователя не блокирует остальных.
+
+Небольшие (интерактивные) задачи идут отдельной приоритетной полосой, а для
+них резервируется часть слотов воркеров.
+"""
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from uuid import UUID
+
+from arq.connections import ArqRedis
+from fastapi import HTTPException, status
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import get_settings
+from src.parsing.parsing_crud import (
+    create_parse_job,
+    get_queued_jobs,
+    get_running_job_counts,
+    get_scheduler_virtual_time,
+    get_user_daily_messages,
+    get_user_last_virtual_finish,
+    get_user_parse_quota,
+    get_user_parse_quotas,
+    requeue_parse_job,
+    requeue_stale_parse_jobs,
+    set_scheduler_virtual_time,
+)
+from src.parsing.parsing_models import ParseJob, UserParseQuota
+from src.parsing.parsing_schemas import ParseJobCreate
+
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# Ключ advisory lock, сериализующий диспетчеризацию между процессами
+DISPATCH_LOCK_KEY = 740_027_001
+# Сколько задач из головы очереди просматривается за один проход
+DISPATCH_SCAN_LIMIT = 500
+# Единица стоимости задачи в сообщениях (чтобы виртуальное время не росло слишком быстро)
+COST_UNIT_MESSAGES = 1000
+
+
+@dataclass(frozen=True)
+class ResolvedQuota:
+    weight: float
+    max_concurrent_jobs: int
+    daily_message_quota: int
+
+
+def resolve_quota(quota: UserParseQuota | None) -> ResolvedQuota:
+    """Подставляет значения по умолчанию для незаданных полей квоты"""
+    if quota is None:
+        return ResolvedQuota(
+            weight=1.0,
+            max_concurrent_jobs=settings.PARSE_USER_MAX_CONCURRENT_JOBS,
+            daily_message_quota=settings.PARSE_USER_DAILY_MESSAGE_QUOTA,
+        )
+
+    return ResolvedQuota(
+        weight=quota.weight if quota.weight > 0 else 1.0,
+        max_concurrent_jobs=(
+            quota.max_concurrent_jobs
+            if quota.max_concurrent_jobs is not None
+            else settings.PARSE_USER_MAX_CONCURRENT_JOBS
+        ),
+        daily_message_quota=(
+            quota.daily_message_quota
+            if quota.daily_message_quota is not None
+            else settings.PARSE_USER_DAILY_MESSAGE_QUOTA
+        ),
+    )
+
+
+def select_jobs_for_dispatch(
+    queued: list[ParseJob],
+    running_by_user: dict[UUID, int],
+    running_bulk: int,
+    running_total: int,
+    quotas: dict[UUID, ResolvedQuota],
+    max_running: int,
+    reserved_interactive: int
+) -> list[ParseJob]:
+    """
+    Выбирает задачи для запуска
+
+    Args:
+        queued: Задачи в порядке приоритета (интерактивные, затем по virtual_finish)
+        running_by_user: Число выполняющихся задач каждого пользователя
+        running_bulk: Число выполняющихся неинтерактивных задач
+        running_total: Общее число выполняющихся задач
+        quotas: Квоты пользователей
+        max_running: Общий лимит одновременно выполняющихся задач
+        reserved_interactive: Слоты, недоступные для неинтерактивных задач
+    """
+    running_by_user = dict(running_by_user)
+    bulk_limit = max(max_running - reserved_interactive, 0)
+    selected: list[ParseJob] = []
+
+    for job in queued:
+        if running_total >= max_running:
+            break
+
+        quota = quotas[job.user_id]
+        if running_by_user.get(job.user_id, 0) >= quota.max_concurrent_jobs:
+            continue
+
+        if not job.is_interactive:
+            if running_bulk >= bulk_limit:
+                continue
+            running_bulk += 1
+
+        running_by_user[job.user_id] = running_by_user.get(job.user_id, 0) + 1
+        running_total += 1
+        selected.append(job)
+
+    return selected
+
+
+async def submit_parse_job_service(
+    db: AsyncSession,
+    user_id: UUID,
+    job_data: ParseJobCreate,
+    queue: ArqRedis
+) -> ParseJob:
+    """Проверяет квоты, ставит задачу в справедливую очередь и запускает диспетчеризацию"""
+    chats = list(dict.fromkeys(job_data.chats))
+    estimated_messages = len(chats) * job_data.message_limit
+    quota = resolve_quota(await get_user_parse_quota(db, user_id))
+
+    # Сериализуем постановку задач одного пользователя, чтобы квота не превышалась гонкой
+    await db.execute(
+        text("SELECT pg_advisory_xact_lock(hashtext(:key))"),
+        {"key": f"parse_jobs:{user_id}"}
+    )
+
+    day_start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+    used = await get_user_daily_messages(db, user_id, day_start)
+    if used + estimated_messages > quota.daily_message_quota:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=(
+                "Превышена дневная квота сообщений: "
+                f"использовано {used} из {quota.daily_message_quota}, "
+                f"задача требует {estimated_messages}"
+            )
+        )
+
+    virtual_time = await get_scheduler_virtual_time(db)
+    last_finish = await get_user_last_virtual_finish(db, user_id)
+    virtual_start = max(virtual_time, last_finish or 0.0)
+    virtual_finish = virtual_start + estimated_messages / COST_UNIT_MESSAGES / quota.weight
+
+    job = await create_parse_job(
+        db,
+        user_id=user_id,
+        chats=chats,
+        message_limit=job_data.message_limit,
+        estimated_messages=estimated_messages,
+        is_interactive=estimated_messages <= settings.PARSE_INTERACTIVE_MAX_MESSAGES,
+        virtual_start=virtual_start,
+        virtual_finish=virtual_finish,
+    )
+
+    await dispatch_parse_jobs(db, queue)
+    return job
+
+
+async def reclaim_stale_parse_jobs(db: AsyncSession) -> int:
+    """
+    Возвращает в очередь задачи, потерянные упавшим воркером
+
+    Задача, которая выполняется дольше таймаута воркера с запасом, уже не
+    может выполняться: её статус running только занимает слоты в лимитах
+    пользователя и PARSE_MAX_RUNNING_JOBS. При следующем запуске задача
+    продолжается с сохранённых чекпоинтов.
+    """
+    started_before = datetime.now(timezone.utc) - timedelta(
+        seconds=settings.PARSE_JOB_TIMEOUT_SECONDS + settings.PARSE_JOB_STALE_GRACE_SECONDS
+    )
+    job_ids = await requeue_stale_parse_jobs(db, started_before)
+    if job_ids:
+        logger.warning("Возвращены в очередь потерянные задачи парсинга: %s", ", ".join(map(str, job_ids)))
+    return len(job_ids)
+
+
+async def dispatch_parse_jobs(db: AsyncSession, queue: ArqRedis) -> int:
+    """
+    Передаёт воркерам задачи, для которых есть свободные слоты
+
+    Вызывается после постановки задачи, после завершения задачи воркером
+    и периодически по cron. Returns: число запущенных задач.
+    """
+    await db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": DISPATCH_LOCK_KEY})
+
+    running_by_user: dict[UUID, int] = {}
+    running_bulk = 0
+    running_total = 0
+    for user_id, is_interactive, count in await get_running_job_counts(db):
+        running_by_user[user_id] = running_by_user.get(user_id, 0) + count
+        running_total += count
+        if not is_interactive:
+            running_bulk += count
+
+    if running_total >= settings.PARSE_MAX_RUNNING_JOBS:
+        await db.commit()
+        return 0
+
+    queued = await get_queued_jobs(db, DISPATCH_SCAN_LIMIT)
+    stored_quotas = await get_user_parse_quotas(db, {job.user_id for job in queued})
+    quotas = {
+        job.user_id: resolve_quota(stored_quotas.get(job.user_id))
+        for job in queued
+    }
+
+    selected = select_jobs_for_dispatch(
+        queued,
+        running_by_user,
+        running_bulk,
+        running_total,
+        quotas,
+        max_running=settings.PARSE_MAX_RUNNING_JOBS,
+        reserved_interactive=settings.PARSE_INTERACTIVE_RESERVED_SLOTS,
+    )
+
+    if not selected:
+        await db.commit()
+        return 0
+
+    started_at = datetime.now(timezone.utc)
+    for job in selected:
+        job.status = "running"
+        job.started_at = started_at
+
+    await set_scheduler_virtual_time(db, max(job.virtual_start for job in selected))
+    await db.commit()
+
+    dispatched = 0
+    for job in selected:
+        try:
+            # id в arq - на каждый запуск: повторный запуск задачи, возвращённой в очередь,
+            # не должен отбрасываться как дубликат по оставшемуся результату прошлого запуска
+            await queue.enqueue_job(
+                "run_parse_job", str(job.id), _job_id=f"{job.id}:{started_at.timestamp():.0f}"
+            )
+            dispatched += 1
+        except Exception:
+            await requeue_parse_job(db, job.id)
+
+    return dispatched
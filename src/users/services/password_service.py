@@ -1,15 +1,133 @@
+import asyncio
+import math
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import bcrypt
 
+from src.metrics.metrics import CRYPTO_DURATION
+
 
 BCRYPT_ROUNDS = 12
+# Границы калибровки: ниже 10 bcrypt считается слабым, выше 16 - неприемлемо медленным для входа
+BCRYPT_MIN_ROUNDS = 10
+BCRYPT_MAX_ROUNDS = 16
+
+# Текущая стоимость новых хэшей; задаётся при старте (configure_bcrypt_rounds)
+_current_rounds = BCRYPT_ROUNDS
+
+# bcrypt отпускает GIL, поэтому хэширование в потоках не блокирует event loop
+_BCRYPT_THREADS = os.cpu_count() or 1
+_bcrypt_executor = ThreadPoolExecutor(
+    max_workers=_BCRYPT_THREADS,
+    thread_name_prefix="bcrypt"
+)
+# Массовое создание пользователей хэширует в отдельном пуле не больше чем на половине ядер:
+# очередь из сотен хэшей в общем пуле задержала бы каждый вход на всё время импорта
+_BULK_BCRYPT_THREADS = max(_BCRYPT_THREADS // 2, 1)
+_bulk_bcrypt_executor = ThreadPoolExecutor(
+    max_workers=_BULK_BCRYPT_THREADS,
+    thread_name_prefix="bcrypt-bulk"
+)
+
+
+def get_bcrypt_rounds() -> int:
+    return _current_rounds
+
+
+def configure_bcrypt_rounds(rounds: int) -> None:
+    global _current_rounds
+    if not 4 <= rounds <= 31:
+        raise ValueError(f"Недопустимая стоимость bcrypt: {rounds}")
+    _current_rounds = rounds
+
+
+def get_hash_rounds(hashed_password: str) -> int | None:
+    """Стоимость, закодированная в хэше: $2b$<rounds>$..."""
+    parts = hashed_password.split("$")
+    if len(parts) < 4 or not parts[2].isdigit():
+        return None
+    return int(parts[2])
+
+
+def needs_rehash(hashed_password: str) -> bool:
+    """
+    Хэш посчитан с меньшей стоимостью, чем настроена сейчас
+
+    Только повышение: узлы с разной калибровкой иначе перехэшировали бы
+    один и тот же пароль туда-обратно при каждом входе.
+    """
+    rounds = get_hash_rounds(hashed_password)
+    return rounds is None or rounds < _current_rounds
+
+
+def measure_bcrypt_ms(rounds: int, samples: int = 3) -> float:
+    """Медианное время одного хэширования с заданной стоимостью, мс"""
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        bcrypt.hashpw(b"calibration-password", bcrypt.gensalt(rounds=rounds))
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
 
+def calibrate_bcrypt_rounds(
+    target_ms: float,
+    min_rounds: int = BCRYPT_MIN_ROUNDS,
+    max_rounds: int = BCRYPT_MAX_ROUNDS
+) -> int:
+    """
+    Подбирает максимальную стоимость, при которой хэширование укладывается в target_ms
 
-def hash_password(password: str, rounds: int = BCRYPT_ROUNDS) -> str:
+    Каждый раунд удваивает время, поэтому достаточно замерить нижнюю
+    границу и проверить итоговое значение.
+    """
+    if target_ms <= 0:
+        raise ValueError(f"Целевое время bcrypt должно быть положительным: {target_ms}")
+
+    base_ms = measure_bcrypt_ms(min_rounds)
+    rounds = min_rounds + max(math.floor(math.log2(target_ms / base_ms)), 0)
+    rounds = min(rounds, max_rounds)
+
+    # Экстраполяция могла промахнуться из-за шума замеров
+    while rounds > min_rounds and measure_bcrypt_ms(rounds, samples=1) > target_ms * 1.25:
+        rounds -= 1
+
+    return rounds
+
+
+async def init_bcrypt_rounds(
+    rounds: int | None,
+    auto_calibrate: bool,
+    target_ms: float
+) -> int:
+    """Настраивает стоимость при старте: явное значение, калибровка или значение по умолчанию"""
+    if rounds is None and auto_calibrate:
+        loop = asyncio.get_running_loop()
+        rounds = await loop.run_in_executor(_bcrypt_executor, calibrate_bcrypt_rounds, target_ms)
+
+    configure_bcrypt_rounds(rounds or BCRYPT_ROUNDS)
+    return _current_rounds
+
+
+async def warm_up_bcrypt_pool() -> None:
+    """Запускает потоки пула bcrypt дешёвыми хэшами до первого входа"""
+    loop = asyncio.get_running_loop()
+    await asyncio.gather(*(
+        loop.run_in_executor(_bcrypt_executor, measure_bcrypt_ms, 4, 1)
+        for _ in range(_BCRYPT_THREADS)
+    ))
+
+
+def hash_password(password: str, rounds: int | None = None) -> str:
     if not password:
         raise ValueError("Пароль не может быть пустым")
     
-    salt = bcrypt.gensalt(rounds=rounds)
-    hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
+    salt = bcrypt.gensalt(rounds=rounds or _current_rounds)
+    with CRYPTO_DURATION.labels("bcrypt_hash").time():
+        hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 
 
@@ -18,9 +136,31 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         return False
     
     try:
-        return bcrypt.checkpw(
-            plain_password.encode('utf-8'),
-            hashed_password.encode('utf-8')
-        )
+        with CRYPTO_DURATION.labels("bcrypt_verify").time():
+            return bcrypt.checkpw(
+                plain_password.encode('utf-8'),
+                hashed_password.encode('utf-8')
+            )
     except (ValueError, TypeError):
         return False
+
+
+async def hash_password_async(password: str, rounds: int | None = None) -> str:
+    """hash_password в пуле потоков bcrypt"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_bcrypt_executor, hash_password, password, rounds)
+
+
+async def hash_passwords_bulk(passwords: list[str]) -> list[str]:
+    """Хэши для массовых операций: в отдельном пуле, не занимая потоки, нужные входу"""
+    loop = asyncio.get_running_loop()
+    return list(await asyncio.gather(*(
+        loop.run_in_executor(_bulk_bcrypt_executor, hash_password, password)
+        for password in passwords
+    )))
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password в пуле потоков bcrypt"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_bcrypt_executor, verify_password, plain_password, hashed_password)
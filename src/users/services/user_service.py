@@ -3,36 +3,61 @@ from uuid import UUID
 from fastapi import HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.auth.auth_revocation import get_token_denylist
 from src.users.users_crud import (
+    UserAlreadyExistsError,
     create_user, update_user, delete_user,
     activate_user, deactivate_user,
-    get_user, get_user_by_email, get_user_by_username,
-    get_users,
+    bulk_create_users, bulk_set_users_active,
+    get_taken_usernames_and_emails,
+    get_user, get_users,
 )
 from src.users.users_models import User
-from src.users.users_schemas import UserCreate, UserUpdate
-from src.users.services.password_service import hash_password
+from src.users.users_schemas import (
+    USER_LIST_ADAPTER,
+    UserBulkCreate,
+    UserBulkCreateError,
+    UserBulkCreateResponse,
+    UserBulkStatusResponse,
+    UserBulkStatusUpdate,
+    UserCreate,
+    UserResponse,
+    UserUpdate,
+)
+from src.users.services.password_service import hash_password_async, hash_passwords_bulk
+
+
+_CONFLICT_DETAILS = {
+    "username": "Пользователь с таким username уже существует",
+    "email": "Пользователь с таким email уже существует",
+}
+
+
+def _conflict_exception(error: UserAlreadyExistsError) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail=_CONFLICT_DETAILS[error.field]
+    )
+
+
+def _not_found_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Пользователь не найден"
+    )
 
 
 async def create_user_service(
     db: AsyncSession,
     user_data: UserCreate
 ) -> User:
-    if await get_user_by_username(db, user_data.username):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Пользователь с таким username уже существует"
-        )
-    
-    if await get_user_by_email(db, user_data.email):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Пользователь с таким email уже существует"
-        )
+    hashed_password = await hash_password_async(user_data.password)
     
-    hashed_password = hash_password(user_data.password)
-    
-    return await create_user(db, user_data, hashed_password)
+    # Уникальность username/email проверяет БД в том же INSERT
+    try:
+        return await create_user(db, user_data, hashed_password)
+    except UserAlreadyExistsError as e:
+        raise _conflict_exception(e)
 
 
 async def update_user_service(
@@ -40,42 +65,27 @@ async def update_user_service(
     user_id: UUID,
     user_data: UserUpdate
 ) -> User:
-    user = await get_user(db, user_id)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Пользователь не найден"
-        )
-    
     hashed_password = None
     if user_data.password:
-        hashed_password = hash_password(user_data.password)
+        hashed_password = await hash_password_async(user_data.password)
     
-    if user_data.username and user_data.username != user.username:
-        if await get_user_by_username(db, user_data.username):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Пользователь с таким username уже существует"
-            )
+    try:
+        user = await update_user(db, user_id, user_data, hashed_password)
+    except UserAlreadyExistsError as e:
+        raise _conflict_exception(e)
     
-    if user_data.email and user_data.email != user.email:
-        if await get_user_by_email(db, user_data.email):
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Пользователь с таким email уже существует"
-            )
-    
-    return await update_user(db, user, user_data, hashed_password)
+    if not user:
+        raise _not_found_exception()
+    if user_data.is_active is False:
+        await get_token_denylist().revoke_user(str(user_id))
+    return user
 
 
 async def get_user_service(db: AsyncSession, user_id: UUID) -> User:
     """Сервис для получения пользователя"""
     user = await get_user(db, user_id)
     if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Пользователь не найден"
-        )
+        raise _not_found_exception()
     return user
 
 
@@ -83,53 +93,128 @@ async def list_users_service(
     db: AsyncSession,
     skip: int = 0,
     limit: int = 100
-) -> list[User]:
+) -> list[UserResponse]:
     """Сервис для получения списка всех пользователей"""
-    return await get_users(db, skip, limit)
+    rows = await get_users(db, skip, limit)
+    return USER_LIST_ADAPTER.validate_python(rows, from_attributes=True)
 
 
 async def delete_user_service(db: AsyncSession, user_id: UUID) -> None:
     """Сервис для удаления пользователя"""
-    user = await get_user(db, user_id)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Пользователь не найден"
-        )
-    await delete_user(db, user_id)
+    if not await delete_user(db, user_id):
+        raise _not_found_exception()
+    await get_token_denylist().revoke_user(str(user_id))
 
 
 async def deactivate_user_service(db: AsyncSession, user_id: UUID) -> User:
     """Сервис для деактивации пользователя"""
-    user = await get_user(db, user_id)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Пользователь не найден"
-        )
+    user = await deactivate_user(db, user_id)
+    if user:
+        await get_token_denylist().revoke_user(str(user_id))
+        return user
     
-    if not user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Пользователь уже деактивирован"
-        )
+    # Запрос не изменил строк: выясняем причину (только на пути ошибки)
+    if not await get_user(db, user_id):
+        raise _not_found_exception()
     
-    return await deactivate_user(db, user)
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Пользователь уже деактивирован"
+    )
 
 
 async def activate_user_service(db: AsyncSession, user_id: UUID) -> User:
     """Сервис для активации пользователя"""
-    user = await get_user(db, user_id)
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Пользователь не найден"
-        )
+    user = await activate_user(db, user_id)
+    if user:
+        return user
     
-    if user.is_active:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Пользователь уже активирован"
-        )
+    if not await get_user(db, user_id):
+        raise _not_found_exception()
     
-    return await activate_user(db, user)
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Пользователь уже активирован"
+    )
+
+
+async def bulk_create_users_service(
+    db: AsyncSession,
+    bulk_data: UserBulkCreate
+) -> UserBulkCreateResponse:
+    """Сервис для массового создания пользователей с отчётом по каждой строке"""
+    users = bulk_data.users
+    errors: list[UserBulkCreateError] = []
+
+    def reject(index: int, field: str) -> None:
+        errors.append(UserBulkCreateError(
+            index=index,
+            username=users[index].username,
+            email=users[index].email,
+            detail=_CONFLICT_DETAILS[field],
+        ))
+
+    # Занятые username/email отсеиваем до bcrypt, чтобы не хэшировать заведомо лишнее
+    taken_usernames, taken_emails = await get_taken_usernames_and_emails(
+        db,
+        [user.username for user in users],
+        [user.email for user in users]
+    )
+
+    accepted: list[int] = []
+    for index, user in enumerate(users):
+        if user.username in taken_usernames:
+            reject(index, "username")
+        elif user.email in taken_emails:
+            reject(index, "email")
+        else:
+            # Повторы внутри запроса: побеждает первое вхождение
+            taken_usernames.add(user.username)
+            taken_emails.add(user.email)
+            accepted.append(index)
+
+    # Хэши считаются параллельно в отдельном пуле: общий пул bcrypt остаётся для входа
+    hashes = await hash_passwords_bulk([users[index].password for index in accepted])
+
+    rows = await bulk_create_users(
+        db,
+        [(users[index], hashed) for index, hashed in zip(accepted, hashes)]
+    )
+
+    # Строки, которые успел занять параллельный запрос, INSERT пропустил
+    created_usernames = {row.username for row in rows}
+    skipped = [index for index in accepted if users[index].username not in created_usernames]
+    if skipped:
+        raced_usernames, _ = await get_taken_usernames_and_emails(
+            db,
+            [users[index].username for index in skipped],
+            []
+        )
+        for index in skipped:
+            reject(index, "username" if users[index].username in raced_usernames else "email")
+
+    errors.sort(key=lambda error: error.index)
+    return UserBulkCreateResponse(
+        created=USER_LIST_ADAPTER.validate_python(rows, from_attributes=True),
+        errors=errors,
+    )
+
+
+async def bulk_set_users_status_service(
+    db: AsyncSession,
+    status_data: UserBulkStatusUpdate
+) -> UserBulkStatusResponse:
+    """Сервис для массовой активации/деактивации пользователей"""
+    user_ids = list(dict.fromkeys(status_data.user_ids))
+    updated = await bulk_set_users_active(db, user_ids, status_data.is_active)
+
+    if not status_data.is_active:
+        denylist = get_token_denylist()
+        for user_id in updated:
+            await denylist.revoke_user(str(user_id))
+
+    updated_set = set(updated)
+    return UserBulkStatusResponse(
+        updated=updated,
+        unchanged=[user_id for user_id in user_ids if user_id not in updated_set],
+    )
@@ -1,13 +1,73 @@
-from datetime import datetime, timezone
 from uuid import UUID
 
-from sqlalchemy import delete, select
+from sqlalchemy import Row, delete, func, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.users.users_models import User
 from src.users.users_schemas import UserCreate, UserUpdate
 
 
+# Колонки для UserResponse: списки читаются строками, без создания ORM объектов и без пароля
+USER_RESPONSE_COLUMNS = (
+    User.id,
+    User.username,
+    User.email,
+    User.phone_number,
+    User.is_active,
+    User.created_at,
+    User.updated_at,
+)
+
+# Порядок страниц списка: без него offset/limit выбирают произвольные строки, и ETag страницы
+# (get_users_page_versions) мог бы описывать не те строки, что отданы в теле
+USERS_PAGE_ORDER = (User.created_at, User.id)
+
+# Уникальные ограничения таблицы users (имена по умолчанию PostgreSQL)
+_UNIQUE_CONSTRAINT_FIELDS = {
+    "users_username_key": "username",
+    "users_email_key": "email",
+}
+
+
+class UserAlreadyExistsError(Exception):
+    """Нарушено уникальное ограничение username или email"""
+
+    def __init__(self, field: str):
+        super().__init__(field)
+        self.field = field
+
+
+def _conflicting_field(error: IntegrityError) -> str | None:
+    # asyncpg кладёт исходное исключение с constraint_name в __cause__
+    cause = getattr(error.orig, "__cause__", None)
+    constraint = getattr(cause, "constraint_name", None)
+    if constraint in _UNIQUE_CONSTRAINT_FIELDS:
+        return _UNIQUE_CONSTRAINT_FIELDS[constraint]
+
+    message = str(error.orig)
+    for constraint_name, field in _UNIQUE_CONSTRAINT_FIELDS.items():
+        if constraint_name in message:
+            return field
+    return None
+
+
+async def _execute_write(db: AsyncSession, stmt) -> User | None:
+    """Выполняет INSERT/UPDATE ... RETURNING и коммитит; конфликты уникальности -> UserAlreadyExistsError"""
+    try:
+        result = await db.execute(stmt, execution_options={"populate_existing": True})
+        user = result.scalar_one_or_none()
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        field = _conflicting_field(e)
+        if field is None:
+            raise
+        raise UserAlreadyExistsError(field) from e
+    return user
+
+
 async def get_user(db: AsyncSession, user_id: UUID) -> User | None:
     result = await db.execute(select(User).where(User.id == user_id))
     return result.scalar_one_or_none()
@@ -27,68 +87,201 @@ async def get_users(
     db: AsyncSession,
     skip: int = 0,
     limit: int = 100
-) -> list[User]:
-    query = select(User).offset(skip).limit(limit)
+) -> list[Row]:
+    query = select(*USER_RESPONSE_COLUMNS).order_by(*USERS_PAGE_ORDER).offset(skip).limit(limit)
     result = await db.execute(query)
-    return list(result.scalars().all())
+    return list(result.all())
+
+
+async def get_user_version(db: AsyncSession, user_id: UUID) -> Row | None:
+    """id и updated_at пользователя - для проверки If-None-Match без чтения всей строки"""
+    result = await db.execute(select(User.id, User.updated_at).where(User.id == user_id))
+    return result.one_or_none()
+
+
+async def get_users_page_versions(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100
+) -> list[Row]:
+    """id и updated_at страницы списка; выборка та же, что в get_users"""
+    result = await db.execute(
+        select(User.id, User.updated_at).order_by(*USERS_PAGE_ORDER).offset(skip).limit(limit)
+    )
+    return list(result.all())
 
 
 async def create_user(db: AsyncSession, user_data: UserCreate, hashed_password: str) -> User:
-    """Создание нового пользователя"""
-    new_user = User(
-        username=user_data.username,
-        password=hashed_password,
-        email=user_data.email,
-        phone_number=user_data.phone_number,
-        is_active=True
+    """
+    Создание нового пользователя одним INSERT ... RETURNING
+
+    Raises:
+        UserAlreadyExistsError: username или email уже заняты
+    """
+    stmt = (
+        insert(User)
+        .values(
+            username=user_data.username,
+            password=hashed_password,
+            email=user_data.email,
+            phone_number=user_data.phone_number,
+            is_active=True
+        )
+        .returning(User)
     )
-    
-    db.add(new_user)
-    await db.commit()
-    await db.refresh(new_user)
-    return new_user
+    return await _execute_write(db, stmt)
 
 
 async def update_user(
     db: AsyncSession,
-    user: User,
+    user_id: UUID,
     user_data: UserUpdate,
     hashed_password: str | None = None
-) -> User:
-    """Обновление пользователя"""
+) -> User | None:
+    """
+    Обновление пользователя одним UPDATE ... RETURNING
+
+    Returns:
+        Обновлённый пользователь или None, если его нет
+
+    Raises:
+        UserAlreadyExistsError: username или email уже заняты
+    """
     update_data = user_data.model_dump(exclude_unset=True)
+    update_data.pop("password", None)
     
     if hashed_password:
         update_data["password"] = hashed_password
     
-    for field, value in update_data.items():
-        setattr(user, field, value)
-    
-    user.updated_at = datetime.now(timezone.utc)
+    update_data["updated_at"] = func.now()
     
-    await db.commit()
-    await db.refresh(user)
-    return user
+    stmt = (
+        update(User)
+        .where(User.id == user_id)
+        .values(**update_data)
+        .returning(User)
+    )
+    return await _execute_write(db, stmt)
 
 
-async def delete_user(db: AsyncSession, user_id: UUID) -> None:
-    await db.execute(delete(User).where(User.id == user_id))
+async def get_taken_usernames_and_emails(
+    db: AsyncSession,
+    usernames: list[str],
+    emails: list[str]
+) -> tuple[set[str], set[str]]:
+    """Какие из переданных username и email уже заняты (один запрос)"""
+    result = await db.execute(
+        select(User.username, User.email)
+        .where(User.username.in_(usernames) | User.email.in_(emails))
+    )
+    taken_usernames: set[str] = set()
+    taken_emails: set[str] = set()
+    for username, email in result:
+        taken_usernames.add(username)
+        taken_emails.add(email)
+    return taken_usernames, taken_emails
+
+
+async def bulk_create_users(
+    db: AsyncSession,
+    users: list[tuple[UserCreate, str]]
+) -> list[Row]:
+    """
+    Создание пользователей одним многострочным INSERT
+
+    Строки, конфликтующие по username или email, пропускаются.
+
+    Args:
+        users: Пары (данные пользователя, хэш пароля)
+
+    Returns:
+        Созданные пользователи (колонки USER_RESPONSE_COLUMNS)
+    """
+    if not users:
+        return []
+
+    stmt = (
+        insert(User)
+        .values([
+            {
+                "username": user_data.username,
+                "password": hashed_password,
+                "email": user_data.email,
+                "phone_number": user_data.phone_number,
+                "is_active": True,
+            }
+            for user_data, hashed_password in users
+        ])
+        .on_conflict_do_nothing()
+        .returning(*USER_RESPONSE_COLUMNS)
+    )
+    result = await db.execute(stmt)
+    rows = list(result.all())
     await db.commit()
+    return rows
 
 
-async def deactivate_user(db: AsyncSession, user: User) -> User:
-    user.is_active = False
-    user.updated_at = datetime.now(timezone.utc)
-    
+async def bulk_set_users_active(
+    db: AsyncSession,
+    user_ids: list[UUID],
+    is_active: bool
+) -> list[UUID]:
+    """Меняет статус пользователей одним UPDATE; возвращает id реально изменённых"""
+    result = await db.execute(
+        update(User)
+        .where(User.id.in_(user_ids), User.is_active != is_active)
+        .values(is_active=is_active, updated_at=func.now())
+        .returning(User.id)
+    )
+    updated = list(result.scalars().all())
     await db.commit()
-    await db.refresh(user)
-    return user
+    return updated
 
 
-async def activate_user(db: AsyncSession, user: User) -> User:
-    user.is_active = True
-    user.updated_at = datetime.now(timezone.utc)
-    
+async def update_user_password_hash(
+    db: AsyncSession,
+    user_id: UUID,
+    old_hash: str,
+    new_hash: str
+) -> None:
+    """
+    Заменяет хэш пароля тем же паролем с новой стоимостью bcrypt
+
+    Обновляет только если хэш не поменялся с момента чтения; updated_at
+    не трогает - для пользователя данные не изменились. Коммит - за вызывающим.
+    """
+    await db.execute(
+        update(User)
+        .where(User.id == user_id, User.password == old_hash)
+        .values(password=new_hash)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def delete_user(db: AsyncSession, user_id: UUID) -> bool:
+    """Удаляет пользователя; False, если его не было"""
+    result = await db.execute(
+        delete(User).where(User.id == user_id).returning(User.id)
+    )
+    deleted = result.scalar_one_or_none() is not None
     await db.commit()
-    await db.refresh(user)
-    return user
+    return deleted
+
+
+async def _set_user_active(db: AsyncSession, user_id: UUID, is_active: bool) -> User | None:
+    # Условие на текущий статус: None, если пользователя нет или статус уже такой
+    stmt = (
+        update(User)
+        .where(User.id == user_id, User.is_active != is_active)
+        .values(is_active=is_active, updated_at=func.now())
+        .returning(User)
+    )
+    return await _execute_write(db, stmt)
+
+
+async def deactivate_user(db: AsyncSession, user_id: UUID) -> User | None:
+    return await _set_user_active(db, user_id, False)
+
+
+async def activate_user(db: AsyncSession, user_id: UUID) -> User | None:
+    return await _set_user_active(db, user_id, True)
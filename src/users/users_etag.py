@@ -0,0 +1,54 @@
+import hashlib
+from datetime import datetime
+from typing import Iterable
+from uuid import UUID
+
+from fastapi import Request, Response, status
+
+from src.config import get_settings
+
+
+settings = get_settings()
+
+# Ответ кэшируется только браузером клиента и перепроверяется через If-None-Match
+CACHE_CONTROL = f"private, max-age={settings.ETAG_MAX_AGE_SECONDS}, must-revalidate"
+
+
+def weak_etag(*parts: object) -> str:
+    """Слабый ETag: одинаковое представление при одинаковых id и updated_at"""
+    digest = hashlib.blake2b("|".join(map(str, parts)).encode(), digest_size=16).hexdigest()
+    return f'W/"{digest}"'
+
+
+def user_etag(user_id: UUID, updated_at: datetime) -> str:
+    return weak_etag(user_id, updated_at.isoformat())
+
+
+def users_page_etag(skip: int, limit: int, versions: Iterable) -> str:
+    """ETag страницы списка: меняется при изменении, добавлении или удалении пользователя на странице"""
+    return weak_etag(skip, limit, *(f"{row.id}:{row.updated_at.isoformat()}" for row in versions))
+
+
+def if_none_match(request: Request) -> str | None:
+    return request.headers.get("if-none-match")
+
+
+def etag_matches(header: str | None, etag: str) -> bool:
+    """Слабое сравнение (RFC 9110): префикс W/ не учитывается"""
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in header.split(","))
+
+
+def set_cache_headers(response: Response, etag: str) -> None:
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+
+def not_modified(etag: str) -> Response:
+    response = Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    set_cache_headers(response, etag)
+    return response
@@ -1,12 +1,32 @@
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Request, Response, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database.dependencies import get_db
-from src.users.users_schemas import UserCreate, UserResponse, UserUpdate
+from src.database.dependencies import get_db, get_read_db
+from src.users.users_crud import get_user_version, get_users_page_versions
+from src.users.users_etag import (
+    etag_matches,
+    if_none_match,
+    not_modified,
+    set_cache_headers,
+    user_etag,
+    users_page_etag,
+)
+from src.users.users_schemas import (
+    USER_LIST_ADAPTER,
+    UserBulkCreate,
+    UserBulkCreateResponse,
+    UserBulkStatusResponse,
+    UserBulkStatusUpdate,
+    UserCreate,
+    UserResponse,
+    UserUpdate,
+)
 from src.users.services.user_service import (
     activate_user_service,
+    bulk_create_users_service,
+    bulk_set_users_status_service,
     create_user_service,
     deactivate_user_service,
     delete_user_service,
@@ -26,21 +46,63 @@ async def create_user(
     return await create_user_service(db, user_data)
 
 
+@router.post("/bulk", response_model=UserBulkCreateResponse)
+async def bulk_create_users(
+    bulk_data: UserBulkCreate,
+    db: AsyncSession = Depends(get_db)
+):
+    """Массовое создание пользователей; конфликты возвращаются построчно в errors"""
+    return await bulk_create_users_service(db, bulk_data)
+
+
+@router.patch("/bulk/status", response_model=UserBulkStatusResponse)
+async def bulk_set_users_status(
+    status_data: UserBulkStatusUpdate,
+    db: AsyncSession = Depends(get_db)
+):
+    """Массовая активация или деактивация пользователей одним запросом"""
+    return await bulk_set_users_status_service(db, status_data)
+
+
 @router.get("/{user_id}", response_model=UserResponse)
 async def get_user(
     user_id: UUID,
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db)
 ):
-    return await get_user_service(db, user_id)
+    """С If-None-Match сначала сверяется только версия (id, updated_at): совпала - 304 без тела"""
+    header = if_none_match(request)
+    if header:
+        version = await get_user_version(db, user_id)
+        if version is not None:
+            etag = user_etag(version.id, version.updated_at)
+            if etag_matches(header, etag):
+                return not_modified(etag)
+
+    user = await get_user_service(db, user_id)
+    set_cache_headers(response, user_etag(user.id, user.updated_at))
+    return user
 
 
 @router.get("", response_model=list[UserResponse])
 async def list_users(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    return await list_users_service(db, skip, limit)
+    header = if_none_match(request)
+    if header:
+        etag = users_page_etag(skip, limit, await get_users_page_versions(db, skip, limit))
+        if etag_matches(header, etag):
+            return not_modified(etag)
+
+    users = await list_users_service(db, skip, limit)
+    # Уже провалидированный список сериализуется в pydantic-core, минуя повторную проверку response_model
+    response = Response(content=USER_LIST_ADAPTER.dump_json(users), media_type="application/json")
+    set_cache_headers(response, users_page_etag(skip, limit, users))
+    return response
 
 
 @router.patch("/{user_id}", response_model=UserResponse)
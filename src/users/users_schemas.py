@@ -1,7 +1,7 @@
 from datetime import datetime
 from uuid import UUID
 
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, EmailStr, Field, TypeAdapter
 
 
 class UserCreate(BaseModel):
@@ -22,7 +22,8 @@ class UserUpdate(BaseModel):
 class UserResponse(BaseModel):
     id: UUID
     username: str
-    email: EmailStr
+    # Email проверяется при записи; повторная проверка EmailStr на выдаче - основная часть стоимости строки
+    email: str
     phone_number: str | None
     is_active: bool
     created_at: datetime
@@ -31,3 +32,33 @@ class UserResponse(BaseModel):
     class Config:
         from_attributes = True
 
+
+class UserBulkCreate(BaseModel):
+    users: list[UserCreate] = Field(..., min_length=1, max_length=500)
+
+
+class UserBulkCreateError(BaseModel):
+    index: int = Field(..., description="Позиция пользователя в запросе")
+    username: str
+    email: str
+    detail: str
+
+
+class UserBulkCreateResponse(BaseModel):
+    created: list[UserResponse]
+    errors: list[UserBulkCreateError]
+
+
+class UserBulkStatusUpdate(BaseModel):
+    user_ids: list[UUID] = Field(..., min_length=1, max_length=1000)
+    is_active: bool
+
+
+class UserBulkStatusResponse(BaseModel):
+    updated: list[UUID]
+    # Не найдены или уже в нужном статусе
+    unchanged: list[UUID]
+
+
+# Схема валидации списка строится один раз, а не на каждый запрос
+USER_LIST_ADAPTER = TypeAdapter(list[UserResponse])
@@ -0,0 +1,203 @@
+import asyncio
+import hashlib
+import hmac
+import logging
+import random
+from uuid import UUID
+
+import httpx
+import orjson
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.config import get_settings
+from src.webhooks.services.url_guard import UnsafeWebhookURLError, resolve_public_address
+from src.webhooks.webhooks_crud import (
+    claim_outbox_batch,
+    delete_delivered,
+    get_due_subscription_ids,
+    get_subscriptions_by_ids,
+    reschedule_failed,
+)
+from src.webhooks.webhooks_models import WebhookSubscription
+
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+# Сколько подписок с готовыми событиями разбирается за один опрос outbox
+DUE_SUBSCRIPTIONS_LIMIT = 500
+
+
+def sign_payload(secret: str, body: bytes) -> str:
+    """Значение X-Webhook-Signature: HMAC-SHA256 тела запроса"""
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+def backoff_delay(attempts: int, base: float, maximum: float) -> float:
+    """Экспоненциальная задержка перед попыткой attempts + 1, случайная в пределах [d/2, d]"""
+    delay = min(maximum, base * 2 ** attempts)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class WebhookDeliveryWorker:
+    """
+    Доставка событий из webhook_outbox пачками
+
+    Один пул HTTP соединений на все подписки. Для каждой подписки
+    одновременно выполняется не больше max_concurrency запросов - лимит
+    проверяется в БД при аренде пачки и общий для всех процессов
+    доставки; каждый запрос забирает из outbox до max_batch_size событий. Неудачная пачка
+    откладывается с экспоненциальной задержкой, после max_attempts попыток
+    события остаются в outbox со статусом dead до ручного повтора.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        client: httpx.AsyncClient,
+        max_attempts: int | None = None,
+        poll_interval: float | None = None
+    ):
+        self.session_factory = session_factory
+        self.client = client
+        self.max_attempts = max_attempts or settings.WEBHOOK_MAX_ATTEMPTS
+        self.poll_interval = poll_interval or settings.WEBHOOK_POLL_INTERVAL_SECONDS
+        self._in_flight: dict[UUID, int] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self._secrets: dict[UUID, str] = {}
+        self._wake = asyncio.Event()
+        self._stopping = False
+
+    def _secret(self, subscription: WebhookSubscription) -> str:
+        secret = self._secrets.get(subscription.id)
+        if secret is None:
+            secret = settings.cipher.decrypt(subscription.secret_encrypted.encode()).decode()
+            self._secrets[subscription.id] = secret
+        return secret
+
+    async def run(self) -> None:
+        """Опрашивает outbox до вызова stop(), затем дожидается начатых доставок"""
+        while not self._stopping:
+            # Сбрасывается до опроса: доставка, завершившаяся во время опроса, не теряет пробуждение
+            self._wake.clear()
+            try:
+                await self._dispatch()
+            except Exception:
+                logger.exception("Ошибка опроса webhook outbox")
+
+            # Следующий опрос - после доставки хотя бы одной пачки или по интервалу:
+            # если свободных слотов нет (их заняли другие процессы), outbox не опрашивается вхолостую
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def stop(self) -> None:
+        self._stopping = True
+        self._wake.set()
+
+    async def _dispatch(self) -> int:
+        """Запускает доставки для подписок со свободными слотами; возвращает число запущенных"""
+        async with self.session_factory() as db:
+            subscription_ids = await get_due_subscription_ids(db, DUE_SUBSCRIPTIONS_LIMIT)
+            subscriptions = await get_subscriptions_by_ids(db, subscription_ids)
+
+        started = 0
+        for subscription in subscriptions.values():
+            if not subscription.is_active:
+                continue
+            free = subscription.max_concurrency - self._in_flight.get(subscription.id, 0)
+            for _ in range(free):
+                self._in_flight[subscription.id] = self._in_flight.get(subscription.id, 0) + 1
+                task = asyncio.create_task(self._deliver(subscription))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+                started += 1
+        return started
+
+    def _release(self, subscription_id: UUID, delivered: bool) -> None:
+        self._in_flight[subscription_id] -= 1
+        if not self._in_flight[subscription_id]:
+            del self._in_flight[subscription_id]
+        if delivered:
+            self._wake.set()
+
+    async def _deliver(self, subscription: WebhookSubscription) -> None:
+        # Слоты процесса - лишь верхняя граница числа задач; сам лимит проверяется в claim_outbox_batch
+        claimed = False
+        try:
+            async with self.session_factory() as db:
+                delivery_id, rows = await claim_outbox_batch(
+                    db,
+                    subscription.id,
+                    subscription.max_concurrency,
+                    subscription.max_batch_size,
+                    settings.WEBHOOK_LEASE_SECONDS
+                )
+                if not rows:
+                    return
+                claimed = True
+
+                ids = [row.id for row in rows]
+                error = await self._post(subscription, delivery_id, [row.payload for row in rows])
+                if error is None:
+                    await delete_delivered(db, ids)
+                    return
+
+                attempts = max(row.attempts for row in rows)
+                delay = backoff_delay(
+                    attempts, settings.WEBHOOK_BACKOFF_BASE_SECONDS, settings.WEBHOOK_BACKOFF_MAX_SECONDS
+                )
+                dead = await reschedule_failed(db, ids, delay, error, self.max_attempts)
+                logger.warning(
+                    "Webhook %s: пачка из %s не доставлена (%s), повтор через %.1f с, в dead letter: %s",
+                    subscription.id, len(ids), error, delay, dead
+                )
+        except Exception:
+            logger.exception("Ошибка доставки webhook %s", subscription.id)
+        finally:
+            self._release(subscription.id, claimed)
+
+    async def _post(self, subscription: WebhookSubscription, delivery_id: str, leads: list[dict]) -> str | None:
+        """
+        Отправляет пачку; возвращает описание ошибки или None при успехе (2xx)
+
+        X-Webhook-Delivery одинаков при всех повторах пачки: получатель может
+        отбрасывать повторную доставку, если ответ на прошлую до нас не дошёл.
+
+        Хост разрешается и проверяется перед каждой отправкой, а соединение
+        открывается с проверенным адресом: DNS подписки мог начать указывать
+        во внутреннюю сеть уже после её создания. Редиректы не выполняются.
+        """
+        try:
+            address = await resolve_public_address(subscription.url)
+        except UnsafeWebhookURLError as e:
+            return str(e)
+
+        url = httpx.URL(subscription.url)
+        body = orjson.dumps({"leads": leads})
+        headers = {
+            "Host": url.netloc.decode("ascii"),
+            "Content-Type": "application/json",
+            "X-Webhook-Delivery": delivery_id,
+            "X-Webhook-Signature": sign_payload(self._secret(subscription), body),
+        }
+        # Сертификат проверяется по имени хоста из подписки, а не по адресу
+        extensions = {"sni_hostname": url.host} if url.scheme == "https" else None
+        try:
+            response = await self.client.post(
+                url.copy_with(host=f"[{address}]" if ":" in address else address),
+                content=body,
+                headers=headers,
+                extensions=extensions,
+            )
+        except httpx.HTTPError as e:
+            return f"{e.__class__.__name__}: {e}"
+
+        if response.is_success:
+            return None
+        return f"HTTP {response.status_code}: {response.text[:200]}"
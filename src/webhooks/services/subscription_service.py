@@ -0,0 +1,98 @@
+import secrets
+from uuid import UUID
+
+from fastapi import HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import get_settings
+from src.webhooks.services.url_guard import UnsafeWebhookURLError, resolve_public_address
+from src.webhooks.webhooks_crud import (
+    create_subscription,
+    delete_subscription,
+    get_dead_letters,
+    get_user_subscription,
+    requeue_dead_letters,
+)
+from src.webhooks.webhooks_models import WebhookOutbox, WebhookSubscription
+from src.webhooks.webhooks_schemas import (
+    WebhookRetryResponse,
+    WebhookSubscriptionCreate,
+    WebhookSubscriptionCreated,
+)
+
+
+settings = get_settings()
+
+
+async def create_subscription_service(
+    db: AsyncSession,
+    user_id: UUID,
+    data: WebhookSubscriptionCreate
+) -> WebhookSubscriptionCreated:
+    try:
+        await resolve_public_address(str(data.url))
+    except UnsafeWebhookURLError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Недопустимый адрес webhook: {e}"
+        )
+
+    secret = data.secret or secrets.token_urlsafe(32)
+    subscription = await create_subscription(
+        db,
+        user_id=user_id,
+        url=str(data.url),
+        secret_encrypted=settings.cipher.encrypt(secret.encode()).decode(),
+        max_concurrency=data.max_concurrency,
+        max_batch_size=data.max_batch_size,
+    )
+    return WebhookSubscriptionCreated(
+        id=subscription.id,
+        url=subscription.url,
+        is_active=subscription.is_active,
+        max_concurrency=subscription.max_concurrency,
+        max_batch_size=subscription.max_batch_size,
+        created_at=subscription.created_at,
+        secret=secret,
+    )
+
+
+async def _get_own_subscription(
+    db: AsyncSession,
+    user_id: UUID,
+    subscription_id: UUID
+) -> WebhookSubscription:
+    subscription = await get_user_subscription(db, user_id, subscription_id)
+    if subscription is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Подписка не найдена"
+        )
+    return subscription
+
+
+async def delete_subscription_service(db: AsyncSession, user_id: UUID, subscription_id: UUID) -> None:
+    if not await delete_subscription(db, user_id, subscription_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Подписка не найдена"
+        )
+
+
+async def list_dead_letters_service(
+    db: AsyncSession,
+    user_id: UUID,
+    subscription_id: UUID,
+    limit: int
+) -> list[WebhookOutbox]:
+    subscription = await _get_own_subscription(db, user_id, subscription_id)
+    return await get_dead_letters(db, subscription.id, limit)
+
+
+async def retry_dead_letters_service(
+    db: AsyncSession,
+    user_id: UUID,
+    subscription_id: UUID
+) -> WebhookRetryResponse:
+    subscription = await _get_own_subscription(db, user_id, subscription_id)
+    return WebhookRetryResponse(requeued=await requeue_dead_letters(db, subscription.id))
@@ -0,0 +1,54 @@
+import asyncio
+import ipaddress
+import socket
+from urllib.parse import urlsplit
+
+from src.config import get_settings
+
+
+settings = get_settings()
+
+
+class UnsafeWebhookURLError(Exception):
+    """Адрес webhook ведёт во внутреннюю сеть или не разрешается"""
+
+
+def is_public_address(address: str) -> bool:
+    """Только глобально маршрутизируемые адреса: без loopback, RFC1918, link-local (169.254.169.254) и т.п."""
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+async def resolve_public_address(url: str) -> str:
+    """
+    Разрешает хост webhook и проверяет, что все его адреса публичные
+
+    Returns:
+        Адрес, к которому нужно подключаться: повторное разрешение при
+        отправке могло бы вернуть уже другой (внутренний) адрес
+
+    Raises:
+        UnsafeWebhookURLError: Хост не разрешается или хотя бы один адрес внутренний
+    """
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise UnsafeWebhookURLError("Поддерживаются только адреса http и https")
+
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    try:
+        infos = await asyncio.get_running_loop().getaddrinfo(
+            parts.hostname, port, type=socket.SOCK_STREAM
+        )
+    except (socket.gaierror, UnicodeError) as e:
+        raise UnsafeWebhookURLError(f"Не удалось разрешить {parts.hostname}: {e}") from e
+
+    addresses = list(dict.fromkeys(info[4][0] for info in infos))
+    if not addresses:
+        raise UnsafeWebhookURLError(f"Не удалось разрешить {parts.hostname}")
+    if not settings.WEBHOOK_ALLOW_PRIVATE_TARGETS:
+        for address in addresses:
+            if not is_public_address(address):
+                raise UnsafeWebhookURLError(f"{parts.hostname} указывает на внутренний адрес {address}")
+    return addresses[0]
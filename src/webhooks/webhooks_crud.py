@@ -0,0 +1,261 @@
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import Sequence
+from uuid import UUID
+
+from sqlalchemy import Row, case, delete, func, or_, select, text, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.webhooks.webhooks_models import WebhookOutbox, WebhookSubscription
+
+
+async def create_subscription(
+    db: AsyncSession,
+    user_id: UUID,
+    url: str,
+    secret_encrypted: str,
+    max_concurrency: int,
+    max_batch_size: int
+) -> WebhookSubscription:
+    subscription = WebhookSubscription(
+        user_id=user_id,
+        url=url,
+        secret_encrypted=secret_encrypted,
+        max_concurrency=max_concurrency,
+        max_batch_size=max_batch_size,
+    )
+    db.add(subscription)
+    await db.commit()
+    await db.refresh(subscription)
+    return subscription
+
+
+async def get_user_subscriptions(db: AsyncSession, user_id: UUID) -> list[WebhookSubscription]:
+    result = await db.execute(
+        select(WebhookSubscription)
+        .where(WebhookSubscription.user_id == user_id)
+        .order_by(WebhookSubscription.created_at)
+    )
+    return list(result.scalars().all())
+
+
+async def get_user_subscription(
+    db: AsyncSession,
+    user_id: UUID,
+    subscription_id: UUID
+) -> WebhookSubscription | None:
+    result = await db.execute(
+        select(WebhookSubscription)
+        .where(WebhookSubscription.id == subscription_id, WebhookSubscription.user_id == user_id)
+    )
+    return result.scalar_one_or_none()
+
+
+async def get_subscriptions_by_ids(
+    db: AsyncSession,
+    subscription_ids: Sequence[UUID]
+) -> dict[UUID, WebhookSubscription]:
+    if not subscription_ids:
+        return {}
+    result = await db.execute(
+        select(WebhookSubscription).where(WebhookSubscription.id.in_(subscription_ids))
+    )
+    return {subscription.id: subscription for subscription in result.scalars()}
+
+
+async def delete_subscription(db: AsyncSession, user_id: UUID, subscription_id: UUID) -> bool:
+    result = await db.execute(
+        delete(WebhookSubscription)
+        .where(WebhookSubscription.id == subscription_id, WebhookSubscription.user_id == user_id)
+    )
+    await db.commit()
+    return result.rowcount > 0
+
+
+async def enqueue_lead_events(db: AsyncSession, user_id: UUID, payloads: Sequence[dict]) -> int:
+    """
+    Кладёт новые лиды в outbox каждой активной подписки пользователя
+
+    Не коммитит: вызывается в транзакции вставки лидов, поэтому событие
+    появляется тогда и только тогда, когда лид сохранён.
+    """
+    if not payloads:
+        return 0
+
+    result = await db.execute(
+        select(WebhookSubscription.id)
+        .where(WebhookSubscription.user_id == user_id, WebhookSubscription.is_active)
+    )
+    subscription_ids = list(result.scalars())
+    if not subscription_ids:
+        return 0
+
+    await db.execute(
+        pg_insert(WebhookOutbox),
+        [
+            {"subscription_id": subscription_id, "payload": payload}
+            for subscription_id in subscription_ids
+            for payload in payloads
+        ]
+    )
+    return len(subscription_ids) * len(payloads)
+
+
+async def get_due_subscription_ids(db: AsyncSession, limit: int) -> list[UUID]:
+    """Подписки, у которых есть события к отправке"""
+    result = await db.execute(
+        select(WebhookOutbox.subscription_id)
+        .where(*_due_conditions())
+        .group_by(WebhookOutbox.subscription_id)
+        .limit(limit)
+    )
+    return list(result.scalars())
+
+
+def _due_conditions() -> tuple:
+    return (
+        WebhookOutbox.status == "pending",
+        WebhookOutbox.next_attempt_at <= func.now(),
+        or_(WebhookOutbox.leased_until.is_(None), WebhookOutbox.leased_until <= func.now()),
+    )
+
+
+def outbox_delivery_id(outbox_ids: Sequence[int]) -> str:
+    """Идентификатор пачки по id её событий: одинаковый при каждом повторе той же пачки"""
+    joined = ",".join(map(str, sorted(outbox_ids)))
+    return hashlib.blake2b(joined.encode(), digest_size=16).hexdigest()
+
+
+async def claim_outbox_batch(
+    db: AsyncSession,
+    subscription_id: UUID,
+    max_concurrency: int,
+    batch_size: int,
+    lease_seconds: float
+) -> tuple[str | None, list[Row]]:
+    """
+    Арендует пачку событий подписки, если у её endpoint есть свободный слот
+
+    Захват сериализуется блокировкой строки подписки, поэтому лимит
+    max_concurrency общий для всех процессов доставки: в полёте не больше
+    max_concurrency пачек с неистёкшей арендой. Если процесс упадёт, не
+    завершив доставку, пачка снова станет доступна по истечении аренды.
+    Пачка, отправка которой не удалась, повторяется целиком, с тем же
+    delivery_id; новые события собираются в новую пачку.
+
+    Returns:
+        (delivery_id, события) или (None, []), если слотов или событий нет
+    """
+    subscription = await db.execute(
+        select(WebhookSubscription.id)
+        .where(WebhookSubscription.id == subscription_id, WebhookSubscription.is_active)
+        .with_for_update()
+    )
+    if subscription.scalar_one_or_none() is None:
+        await db.commit()
+        return None, []
+
+    in_flight = await db.execute(
+        select(func.count(func.distinct(WebhookOutbox.delivery_id)))
+        .where(WebhookOutbox.subscription_id == subscription_id, WebhookOutbox.leased_until > func.now())
+    )
+    if in_flight.scalar() >= max_concurrency:
+        await db.commit()
+        return None, []
+
+    due = (WebhookOutbox.subscription_id == subscription_id, *_due_conditions())
+    first = (await db.execute(
+        select(WebhookOutbox.delivery_id).where(*due).order_by(WebhookOutbox.id).limit(1)
+    )).one_or_none()
+    if first is None:
+        await db.commit()
+        return None, []
+
+    if first.delivery_id is not None:
+        ids_query = select(WebhookOutbox.id).where(*due, WebhookOutbox.delivery_id == first.delivery_id)
+    else:
+        ids_query = (
+            select(WebhookOutbox.id)
+            .where(*due, WebhookOutbox.delivery_id.is_(None))
+            .order_by(WebhookOutbox.id)
+            .limit(batch_size)
+        )
+    ids = list((await db.execute(ids_query)).scalars())
+    delivery_id = first.delivery_id or outbox_delivery_id(ids)
+
+    result = await db.execute(
+        update(WebhookOutbox)
+        .where(WebhookOutbox.id.in_(ids))
+        .values(
+            delivery_id=delivery_id,
+            leased_until=func.now() + text(f"interval '{float(lease_seconds)} seconds'"),
+        )
+        .returning(WebhookOutbox.id, WebhookOutbox.payload, WebhookOutbox.attempts)
+    )
+    rows = sorted(result.all(), key=lambda row: row.id)
+    await db.commit()
+    return delivery_id, rows
+
+
+async def delete_delivered(db: AsyncSession, outbox_ids: Sequence[int]) -> None:
+    await db.execute(delete(WebhookOutbox).where(WebhookOutbox.id.in_(outbox_ids)))
+    await db.commit()
+
+
+async def reschedule_failed(
+    db: AsyncSession,
+    outbox_ids: Sequence[int],
+    delay_seconds: float,
+    error: str,
+    max_attempts: int
+) -> int:
+    """
+    Увеличивает счётчик попыток; исчерпавшие лимит переводятся в dead
+
+    Returns:
+        Сколько событий стало dead
+    """
+    next_attempt_at = datetime.now(timezone.utc) + timedelta(seconds=delay_seconds)
+    result = await db.execute(
+        update(WebhookOutbox)
+        .where(WebhookOutbox.id.in_(outbox_ids))
+        .values(
+            attempts=WebhookOutbox.attempts + 1,
+            status=case((WebhookOutbox.attempts + 1 >= max_attempts, "dead"), else_="pending"),
+            next_attempt_at=next_attempt_at,
+            leased_until=None,
+            last_error=error[:1000],
+        )
+        .returning(WebhookOutbox.status)
+    )
+    dead = sum(1 for (status,) in result if status == "dead")
+    await db.commit()
+    return dead
+
+
+async def get_dead_letters(db: AsyncSession, subscription_id: UUID, limit: int) -> list[WebhookOutbox]:
+    result = await db.execute(
+        select(WebhookOutbox)
+        .where(WebhookOutbox.subscription_id == subscription_id, WebhookOutbox.status == "dead")
+        .order_by(WebhookOutbox.id)
+        .limit(limit)
+    )
+    return list(result.scalars().all())
+
+
+async def requeue_dead_letters(db: AsyncSession, subscription_id: UUID) -> int:
+    result = await db.execute(
+        update(WebhookOutbox)
+        .where(WebhookOutbox.subscription_id == subscription_id, WebhookOutbox.status == "dead")
+        .values(
+            status="pending",
+            attempts=0,
+            next_attempt_at=func.now(),
+            last_error=None,
+            delivery_id=None,
+            leased_until=None,
+        )
+    )
+    await db.commit()
+    return result.rowcount
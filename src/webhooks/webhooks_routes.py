@@ -0,0 +1,73 @@
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.auth.auth_dependencies import get_current_user_id
+from src.database.dependencies import get_db
+from src.webhooks.services.subscription_service import (
+    create_subscription_service,
+    delete_subscription_service,
+    list_dead_letters_service,
+    retry_dead_letters_service,
+)
+from src.webhooks.webhooks_crud import get_user_subscriptions
+from src.webhooks.webhooks_schemas import (
+    WebhookDeadLetter,
+    WebhookRetryResponse,
+    WebhookSubscriptionCreate,
+    WebhookSubscriptionCreated,
+    WebhookSubscriptionResponse,
+)
+
+router = APIRouter(prefix="/webhooks", tags=["webhooks"])
+
+
+@router.post("", response_model=WebhookSubscriptionCreated, status_code=status.HTTP_201_CREATED)
+async def create_webhook(
+    data: WebhookSubscriptionCreate,
+    user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """Подписка на новые лиды; секрет подписи возвращается только в этом ответе"""
+    return await create_subscription_service(db, user_id, data)
+
+
+@router.get("", response_model=list[WebhookSubscriptionResponse])
+async def list_webhooks(
+    user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    return await get_user_subscriptions(db, user_id)
+
+
+@router.delete("/{subscription_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_webhook(
+    subscription_id: UUID,
+    user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """Удаление подписки вместе с недоставленными событиями"""
+    await delete_subscription_service(db, user_id, subscription_id)
+    return None
+
+
+@router.get("/{subscription_id}/dead-letters", response_model=list[WebhookDeadLetter])
+async def list_dead_letters(
+    subscription_id: UUID,
+    limit: int = Query(100, le=1000),
+    user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """События, которые не удалось доставить за WEBHOOK_MAX_ATTEMPTS попыток"""
+    return await list_dead_letters_service(db, user_id, subscription_id, limit)
+
+
+@router.post("/{subscription_id}/dead-letters/retry", response_model=WebhookRetryResponse)
+async def retry_dead_letters(
+    subscription_id: UUID,
+    user_id: UUID = Depends(get_current_user_id),
+    db: AsyncSession = Depends(get_db)
+):
+    """Возвращает dead letter события в очередь доставки с обнулённым счётчиком попыток"""
+    return await retry_dead_letters_service(db, user_id, subscription_id)
@@ -0,0 +1,47 @@
+from datetime import datetime
+from typing import Any
+from uuid import UUID
+
+from pydantic import AnyHttpUrl, BaseModel, Field
+
+
+class WebhookSubscriptionCreate(BaseModel):
+    url: AnyHttpUrl
+    secret: str | None = Field(
+        None, min_length=16, max_length=256,
+        description="Секрет подписи X-Webhook-Signature; если не задан, будет сгенерирован"
+    )
+    max_concurrency: int = Field(2, ge=1, le=16, description="Одновременных запросов к endpoint")
+    max_batch_size: int = Field(100, ge=1, le=1000, description="Лидов в одном запросе")
+
+
+class WebhookSubscriptionResponse(BaseModel):
+    id: UUID
+    url: str
+    is_active: bool
+    max_concurrency: int
+    max_batch_size: int
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class WebhookSubscriptionCreated(WebhookSubscriptionResponse):
+    # Показывается один раз, при создании
+    secret: str
+
+
+class WebhookDeadLetter(BaseModel):
+    id: int
+    payload: dict[str, Any]
+    attempts: int
+    last_error: str | None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class WebhookRetryResponse(BaseModel):
+    requeued: int
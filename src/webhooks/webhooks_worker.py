@@ -0,0 +1,42 @@
+import asyncio
+import logging
+import signal
+
+import httpx
+
+from src.config import get_settings
+from src.database.engine import async_session, engine
+from src.webhooks.services.delivery_service import WebhookDeliveryWorker
+
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+
+
+async def run() -> None:
+    limits = httpx.Limits(
+        max_connections=settings.WEBHOOK_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.WEBHOOK_MAX_CONNECTIONS
+    )
+    async with httpx.AsyncClient(timeout=settings.WEBHOOK_TIMEOUT_SECONDS, limits=limits) as client:
+        worker = WebhookDeliveryWorker(async_session, client)
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, worker.stop)
+
+        logger.info("Доставка webhook запущена")
+        await worker.run()
+        logger.info("Доставка webhook остановлена")
+
+    await engine.dispose()
+
+
+def main():
+    """Запуск: python -m src.webhooks.webhooks_worker"""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()